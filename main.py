@@ -3,43 +3,528 @@
 # Created on: 2025-08-17
 # ------------------------------------------------------------
 # Libs:
-from src.data_loader import load_all_data
-from src.data_processor import process_data
-from src.calculation_engine import run_calculations
-from src.output_generator import generate_report
+import os
+import re
+import argparse
+import datetime
+from src import config
+
+# Os módulos do pipeline (pandas, openpyxl, LangChain e provedores de LLM) são
+# importados dentro de cada comando: `--help` e os subcomandos que não usam o
+# agente não pagam o custo de importação deles (ver `python -m src.benchmark --imports`).
 
 # ------------------------------------------------------------
-def main():
+def _add_load_args(parser):
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignora o cache dos arquivos de entrada e relê todas as planilhas.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Número de processos para ler as planilhas em paralelo (padrão: config.LOAD_WORKERS).",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Lê as planilhas grandes em modo streaming, apenas com as colunas utilizadas.",
+    )
+    _add_competencia_arg(parser)
+
+def _add_competencia_arg(parser):
+    parser.add_argument(
+        "--competencia",
+        default=None,
+        help="Competência (AAAA-MM) a calcular; define o período de apuração (padrão: config.PERIODO_*).",
+    )
+
+def _add_engine_args(parser):
+    parser.add_argument(
+        "--engine",
+        choices=["native", "agent", "sql"],
+        default="agent",
+        help="Motor de cálculo: 'native' (pandas/NumPy, determinístico), 'agent' (LLM) ou 'sql' (DuckDB, consolidação, exclusões e cálculo em um único plano).",
+    )
+    parser.add_argument(
+        "--sql-parquet",
+        nargs="?",
+        const=config.SQL_PARQUET_DIR,
+        default=None,
+        metavar="DIRETORIO",
+        help="Com --engine sql, grava as bases em Parquet e o DuckDB as lê do disco (padrão: config.SQL_PARQUET_DIR).",
+    )
+    parser.add_argument(
+        "--no-agent-cache",
+        action="store_true",
+        help="Não reaproveita resultados/completions do agente em cache.",
+    )
+    parser.add_argument(
+        "--replay-session",
+        default=None,
+        help="Reproduz uma sessão gravada do agente (arquivo .jsonl) com um LLM local, sem rede.",
+    )
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Modo compile do agente: reexecuta o script gerado em uma sessão anterior quando o esquema não mudou.",
+    )
+    parser.add_argument(
+        "--in-process-repl",
+        action="store_true",
+        help="Executa o código do agente no processo principal, sem o worker isolado e os seus limites (config.AGENT_REPL_ISOLADO).",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Agente em N shards simultâneos (sessões independentes, resultados verificados e combinados).",
+    )
+    parser.add_argument(
+        "--shard-by",
+        default=config.AGENT_SHARD_COL,
+        metavar="COLUNA",
+        help="Coluna de 'funcionarios' usada para agrupar os shards (padrão: config.AGENT_SHARD_COL).",
+    )
+    parser.add_argument(
+        "--agent-concurrency",
+        type=int,
+        default=config.AGENT_SHARD_CONCURRENCY,
+        metavar="N",
+        help="Máximo de sessões do agente ao mesmo tempo com --shards (padrão: config.AGENT_SHARD_CONCURRENCY).",
+    )
+    parser.add_argument(
+        "--agent-rps",
+        type=float,
+        default=config.AGENT_REQUESTS_POR_SEGUNDO,
+        metavar="RPS",
+        help="Limite de chamadas ao LLM por segundo, somando os shards (padrão: config.AGENT_REQUESTS_POR_SEGUNDO; sem limite se vazio).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reaproveita a última execução da competência e recalcula só as matrículas alteradas (motor nativo).",
+    )
+
+def _add_output_format_arg(parser):
+    parser.add_argument(
+        "--output-format",
+        nargs="+",
+        choices=["xlsx", "csv", "parquet"],
+        default=None,
+        help="Formatos do relatório final (padrão: config.OUTPUT_FORMATS).",
+    )
+
+def _add_profile_args(parser):
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=config.PROFILE_DIR,
+        default=None,
+        metavar="DIRETORIO",
+        help="Grava o perfil da execução (tempo, memória, linhas e tokens por etapa) em JSON e trace-event (padrão: config.PROFILE_DIR).",
+    )
+    parser.add_argument(
+        "--cprofile",
+        action="store_true",
+        help="Com --profile, grava também um dump do cProfile (.prof) da execução.",
+    )
+
+def _add_tolerance_args(parser):
+    parser.add_argument(
+        "--tolerancia",
+        nargs="+",
+        default=None,
+        metavar="COLUNA=VALOR",
+        help="Tolerância absoluta da conciliação por coluna, ex: VALOR_TOTAL_VR=1 (padrão: config.RECONCILIACAO_TOLERANCIAS).",
+    )
+    parser.add_argument(
+        "--tolerancia-relativa",
+        type=float,
+        default=None,
+        metavar="FRACAO",
+        help="Diferença aceita como fração do valor de referência, ex: 0.05 (padrão: config.RECONCILIACAO_TOLERANCIA_RELATIVA).",
+    )
+
+def _add_run_args(parser):
+    """Opções do pipeline completo (também aceitas sem subcomando, como antes da CLI)."""
+    _add_engine_args(parser)
+    _add_load_args(parser)
+    _add_output_format_arg(parser)
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="AAAA-MM=DIRETORIO",
+        default=None,
+        help="Modo lote: recalcula várias competências, cada uma com o seu diretório de entrada (motor nativo).",
+    )
+    parser.add_argument(
+        "--batch-workers",
+        type=int,
+        default=None,
+        help="Número de processos do modo lote (padrão: uma competência por núcleo).",
+    )
+    parser.add_argument(
+        "--reconcile",
+        nargs="?",
+        const=config.FILE_PATHS["template_vr"],
+        default=None,
+        metavar="ARQUIVO",
+        help="Após o cálculo, concilia o resultado com a compra anterior (padrão: o VR MENSAL de data/input).",
+    )
+    _add_tolerance_args(parser)
+    _add_profile_args(parser)
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Cálculo automatizado de Vale Refeição (VR).",
+        epilog="Sem subcomando, executa o pipeline completo (equivalente a `run`).",
+    )
+    _add_run_args(parser)
+    parser.set_defaults(func=cmd_run)
+    subparsers = parser.add_subparsers(title="comandos", metavar="COMANDO")
+
+    run = subparsers.add_parser("run", help="Pipeline completo: carga, processamento, cálculo e relatório.")
+    _add_run_args(run)
+    run.set_defaults(func=cmd_run)
+
+    load = subparsers.add_parser("load", aliases=["inspect"], help="Carrega as planilhas e mostra linhas, colunas, memória e tipos de cada base.")
+    _add_load_args(load)
+    load.add_argument("--source", nargs="+", default=None, metavar="BASE", help="Bases a detalhar (padrão: todas).")
+    load.add_argument("--head", type=int, default=0, metavar="N", help="Mostra as N primeiras linhas de cada base.")
+    _add_profile_args(load)
+    load.set_defaults(func=cmd_load)
+
+    process = subparsers.add_parser("process", help="Carrega, consolida e aplica as exclusões; grava as bases processadas.")
+    _add_load_args(process)
+    process.add_argument("--output", default=None, help="Arquivo .pkl das bases processadas (padrão: config.STAGES_DIR/processados[_AAAA-MM].pkl).")
+    _add_profile_args(process)
+    process.set_defaults(func=cmd_process)
+
+    calculate = subparsers.add_parser("calculate", help="Calcula o VR (motor nativo, agente ou SQL); grava o resultado.")
+    _add_engine_args(calculate)
+    _add_load_args(calculate)
+    calculate.add_argument("--input", default=None, help="Bases processadas gravadas por `process` (padrão: recarrega e processa as planilhas).")
+    calculate.add_argument("--output", default=None, help="Arquivo .pkl do resultado (padrão: config.STAGES_DIR/resultado[_AAAA-MM].pkl).")
+    _add_profile_args(calculate)
+    calculate.set_defaults(func=cmd_calculate)
+
+    report = subparsers.add_parser("report", help="Gera o relatório final a partir do resultado gravado por `calculate`.")
+    _add_competencia_arg(report)
+    report.add_argument("--input", default=None, help="Resultado gravado por `calculate` (padrão: config.STAGES_DIR/resultado[_AAAA-MM].pkl).")
+    report.add_argument("--output-file", default=None, help="Arquivo do relatório (padrão: config.OUTPUT_FILE).")
+    _add_output_format_arg(report)
+    _add_profile_args(report)
+    report.set_defaults(func=cmd_report)
+
+    reconcile = subparsers.add_parser("reconcile", help="Concilia o resultado gravado por `calculate` com a compra anterior ou outro motor.")
+    _add_load_args(reconcile)
+    reconcile.add_argument("--input", default=None, help="Resultado gravado por `calculate` (padrão: config.STAGES_DIR/resultado[_AAAA-MM].pkl).")
+    referencia = reconcile.add_mutually_exclusive_group()
+    referencia.add_argument("--contra", default=None, metavar="ARQUIVO", help="Compra de referência: VR MENSAL (.xlsx), relatório (.csv/.parquet) ou resultado (.pkl) (padrão: o VR MENSAL de data/input).")
+    referencia.add_argument("--contra-engine", choices=["native", "sql"], default=None, help="Usa como referência o resultado de outro motor, calculado sobre as bases de `process` (ou das planilhas).")
+    reconcile.add_argument("--output", default=None, help="CSV das discrepâncias (padrão: config.RECONCILIACAO_FILE).")
+    _add_tolerance_args(reconcile)
+    _add_profile_args(reconcile)
+    reconcile.set_defaults(func=cmd_reconcile)
+
+    serve = subparsers.add_parser("serve", help="Serviço HTTP/JSON local com as bases em memória e recarga dos arquivos alterados.")
+    serve.add_argument("--host", default=None, help="Endereço (padrão: config.SERVICE_HOST).")
+    serve.add_argument("--port", type=int, default=None, help="Porta (padrão: config.SERVICE_PORT).")
+    serve.add_argument("--no-cache", action="store_true", help="Ignora o cache dos arquivos de entrada na primeira carga.")
+    serve.add_argument("--no-watch", action="store_true", help="Não verifica alterações em data/input (use POST /recarregar).")
+    serve.add_argument("--competencia", nargs="+", default=None, metavar="AAAA-MM", help="Competências pré-calculadas na subida (padrão: a configurada).")
+    serve.set_defaults(func=cmd_serve, profile=None, cprofile=False)
+
+    # Opções repetidas nos subcomandos não têm padrão próprio: sem isso, o
+    # padrão do subcomando sobrescreveria o valor dado antes dele
+    # (ex: `main.py --engine native run`)
+    globais = {action.dest for action in parser._actions}
+    for subparser in set(subparsers.choices.values()):
+        for action in subparser._actions:
+            if action.dest in globais and action.dest != "help":
+                action.default = argparse.SUPPRESS
+    return parser
+
+def parse_args(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.cprofile and not args.profile:
+        args.profile = config.PROFILE_DIR
+    if getattr(args, "batch", None) and args.engine != "native":
+        parser.error("o modo --batch usa apenas o motor nativo (--engine native).")
+    if getattr(args, "incremental", False) and args.engine != "native":
+        parser.error("o modo --incremental usa apenas o motor nativo (--engine native).")
+    if getattr(args, "shards", None) is not None and args.shards < 1:
+        parser.error("--shards deve ser maior ou igual a 1.")
+    if getattr(args, "shards", None) and (args.replay_session or args.compile):
+        parser.error("--shards não combina com --replay-session nem com --compile (as sessões são por shard).")
+    if getattr(args, "incremental", False) and getattr(args, "input", None):
+        parser.error("o modo --incremental parte das planilhas e não aceita --input.")
+    if getattr(args, "batch", None) and args.reconcile:
+        parser.error("--reconcile não se aplica ao modo --batch (use `reconcile` por competência).")
+    if getattr(args, "batch", None):
+        meses = {}
+        for item in args.batch:
+            competencia, _, diretorio = item.partition("=")
+            if not re.fullmatch(r"\d{4}-\d{2}", competencia.strip()) or not diretorio.strip():
+                parser.error(f"--batch inválido: '{item}' (use AAAA-MM=DIRETORIO).")
+            meses[competencia.strip()] = diretorio.strip()
+        args.batch = meses
+    if getattr(args, "tolerancia", None):
+        from src.reconciliation import VALORES_CONCILIADOS
+        tolerancias = {}
+        for item in args.tolerancia:
+            coluna, _, valor = item.partition("=")
+            try:
+                tolerancias[coluna.strip().upper()] = float(valor)
+            except ValueError:
+                parser.error(f"--tolerancia inválida: '{item}' (use COLUNA=VALOR).")
+        desconhecidas = sorted(set(tolerancias) - set(VALORES_CONCILIADOS))
+        if desconhecidas:
+            parser.error(f"--tolerancia: coluna(s) {', '.join(desconhecidas)} fora de {', '.join(VALORES_CONCILIADOS)}.")
+        args.tolerancia = tolerancias
+    return args
+
+def main(argv=None):
     """
     Função principal que orquestra todo o processo de cálculo de VR.
     """
-    print("--- Iniciando processo de cálculo de VR ---")
-    
-    # 1. Carregar todos os dados
-    all_dataframes = load_all_data()
-    
-    # 2. Consolidar, limpar e aplicar exclusões
-    processed_dfs = process_data(all_dataframes)
+    args = parse_args(argv)
+    if not args.profile:
+        args.func(args)
+        return
+
+    # Execução instrumentada: perfil por etapa (+ cProfile opcional)
+    from src import instrumentation
+    comando = args.func.__name__.removeprefix("cmd_")
+    instrumentation.start_run(f"vr_{comando}", engine=getattr(args, "engine", None), competencia=args.competencia, incremental=getattr(args, "incremental", False))
+    profiler = None
+    if args.cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        with instrumentation.stage("main"):
+            args.func(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        profile = instrumentation.stop_run()
+        prefixo = f"{args.profile}/{comando}_{datetime.datetime.now():%Y%m%d_%H%M%S}"
+        print("--- Perfil da execução ---")
+        print(profile.summary().to_string(index=False))
+        print(f"Perfil gravado em '{profile.write_json(f'{prefixo}_profile.json')}' e '{profile.write_trace(f'{prefixo}_trace.json')}'.")
+        if profiler is not None:
+            profiler.dump_stats(f"{prefixo}.prof")
+            print(f"cProfile gravado em '{prefixo}.prof'.")
+
+# ------------------------------------------------------------
+def _periodo(args):
+    from src.periodo import periodo_da_competencia
+    return periodo_da_competencia(args.competencia) if args.competencia else None
+
+def _stage_file(nome, competencia=None):
+    """Caminho padrão da saída intermediária `nome` (por competência, se informada)."""
+    sufixo = f"_{competencia}" if competencia else ""
+    return os.path.join(config.STAGES_DIR, f"{nome}{sufixo}.pkl")
+
+def _save_stage(valor, path):
+    import pandas as pd
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    pd.to_pickle(valor, f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+    return path
+
+def _load_stage(path, comando):
+    import pandas as pd
+    if not os.path.exists(path):
+        print(f"ERRO: Arquivo '{path}' não encontrado. Execute antes o comando `{comando}`.")
+        return None
+    return pd.read_pickle(path)
+
+def _load(args):
+    """Registro das bases de entrada: cada planilha é lida no primeiro acesso (ver src/data_registry.py)."""
+    from src.data_registry import DataRegistry
+    dataframes = DataRegistry(use_cache=not args.no_cache, streaming=args.streaming)
+    workers = config.LOAD_WORKERS if args.workers is None else args.workers
+    if workers > 1:
+        # Leitura paralela só compensa lendo as bases de uma vez
+        dataframes.preload(workers=workers)
+    return dataframes
+
+def _isolated(args):
+    """Ferramenta Python do agente em processo separado, salvo com --in-process-repl."""
+    return False if args.in_process_repl else None
+
+def _calculate(args, processed_dfs, periodo):
+    """Executa os cálculos de negócio (motor nativo ou agente) sobre as bases processadas."""
+    if args.engine == "native":
+        from src.native_engine import run_calculations_native
+        return run_calculations_native(processed_dfs, periodo)
+    if args.engine == "sql":
+        from src.sql_engine import run_calculations_sql
+        return run_calculations_sql(processed_dfs, periodo, parquet_dir=args.sql_parquet)
 
-    print(f"all_dataframes: {all_dataframes.keys()}")
-    print(f"processed_df: {processed_dfs.keys()}")
+    # Só o caminho do agente importa LangChain e os provedores de LLM
+    from src.calculation_engine import run_calculations, run_calculations_sharded
+    from src.agent_llm import replay_llm
 
-    # 3. Executar os cálculos de negócio com o agente
     with open("llm_prompt.txt", "r", encoding="utf-8") as f:
         llm_prompt = f.read()
 
+    if args.shards:
+        return run_calculations_sharded(
+            processed_dfs, llm_prompt, args.shards, shard_col=args.shard_by,
+            concurrency=args.agent_concurrency, requests_per_second=args.agent_rps,
+            use_cache=not args.no_agent_cache, periodo=periodo, isolated=_isolated(args),
+        )
+
+    llm = replay_llm(args.replay_session) if args.replay_session else None
+
     # O agente receberá os dataframes já processados
-    final_df = run_calculations(processed_dfs, llm_prompt)
-    
-    # 4. Gerar o relatório final
+    return run_calculations(processed_dfs, llm_prompt, llm=llm, use_cache=not args.no_agent_cache, compile_mode=args.compile, periodo=periodo, isolated=_isolated(args))
+
+def _compute(args, periodo):
+    """Carrega as planilhas e calcula o resultado (completo ou incremental)."""
+    # 1. Carregar todos os dados
+    all_dataframes = _load(args)
+
+    if args.incremental:
+        # 2. e 3. Reaproveita a última execução: só as matrículas alteradas são reprocessadas
+        from src.incremental import run_incremental
+        return run_incremental(all_dataframes, periodo)
+
+    if args.engine == "sql":
+        # 2. e 3. Consolidação, exclusões e cálculo em um único plano SQL
+        from src.sql_engine import run_calculations_sql
+        return run_calculations_sql(all_dataframes, periodo, parquet_dir=args.sql_parquet)
+
+    # 2. Consolidar, limpar e aplicar exclusões
+    from src.data_processor import process_data
+    processed_dfs = process_data(all_dataframes, periodo)
+
+    print(f"all_dataframes: {list(all_dataframes)}")
+    print(f"processed_df: {list(processed_dfs)}")
+
+    # 3. Executar os cálculos de negócio (motor nativo ou agente)
+    return _calculate(args, processed_dfs, periodo)
+
+def _report(final_df, formats=None, output_file=None):
+    from src.output_generator import generate_report
     if final_df is not None and not final_df.empty:
         print("--- Gerando relatório final ---")
         print(final_df.head())
-        generate_report(final_df)
-    else:
-        print("--- Não foi possível gerar o relatório final, pois o dataframe resultante está vazio ou ocorreu um erro. ---")
-    
+        generate_report(final_df, formats=formats, output_file=output_file)
+        return True
+    print("--- Não foi possível gerar o relatório final, pois o dataframe resultante está vazio ou ocorreu um erro. ---")
+    return False
+
+# ------------------------------------------------------------
+def cmd_run(args):
+    """Pipeline completo (ou modo lote com --batch)."""
+    if args.batch:
+        from src.batch import run_batch
+        run_batch(args.batch, workers=args.batch_workers, use_cache=not args.no_cache, streaming=args.streaming, formats=args.output_format)
+        return
+    run_pipeline(args)
+
+def run_pipeline(args):
+    """Executa o cálculo de VR de uma competência (carga, processamento, cálculo e relatório)."""
+    print("--- Iniciando processo de cálculo de VR ---")
+    final_df = _compute(args, _periodo(args))
+
+    # 4. Gerar o relatório final
+    gerado = _report(final_df, formats=args.output_format)
+
+    # 5. Conciliar com a compra anterior (opcional)
+    if gerado and args.reconcile:
+        from src.reconciliation import run_reconciliation
+        run_reconciliation(final_df, args.reconcile, args.tolerancia, args.tolerancia_relativa)
+
     print("\n--- Processo finalizado ---")
 
+def cmd_load(args):
+    """Carrega as planilhas e mostra o formato de cada base."""
+    from src.data_loader import describe_dataframes
+    dataframes = _load(args)
+    if args.source:
+        desconhecidas = sorted(set(args.source) - set(dataframes))
+        if desconhecidas:
+            print(f"AVISO: Bases desconhecidas ignoradas: {', '.join(desconhecidas)}.")
+        # Só as bases pedidas são lidas
+        dataframes = {name: dataframes[name] for name in dataframes if name in args.source}
+
+    resumo = describe_dataframes(dataframes)
+    print("--- Bases carregadas ---")
+    print(resumo.drop(columns="tipos").to_string(index=False))
+    for name, df in dataframes.items():
+        print(f"\n--- {name} ({len(df)} linhas) ---")
+        for col, dtype in df.dtypes.astype(str).items():
+            print(f"  - {col}: {dtype}")
+        if args.head and not df.empty:
+            print(df.head(args.head).to_string(index=False))
+
+def cmd_process(args):
+    """Carrega e processa as planilhas, gravando as bases processadas."""
+    from src.data_loader import describe_dataframes
+    from src.data_processor import process_data
+    processed_dfs = process_data(_load(args), _periodo(args))
+    print(describe_dataframes(processed_dfs).drop(columns="tipos").to_string(index=False))
+    path = _save_stage(dict(processed_dfs), args.output or _stage_file("processados", args.competencia))
+    print(f"Bases processadas gravadas em '{path}'.")
+
+def cmd_calculate(args):
+    """Calcula o VR (a partir das planilhas ou das bases de `process`) e grava o resultado."""
+    periodo = _periodo(args)
+    if args.input:
+        processed_dfs = _load_stage(args.input, "process")
+        if processed_dfs is None:
+            return
+        final_df = _calculate(args, processed_dfs, periodo)
+    else:
+        final_df = _compute(args, periodo)
+
+    if final_df is None or final_df.empty:
+        print("ERRO: O cálculo não produziu resultado; nada foi gravado.")
+        return
+    print(final_df.head())
+    path = _save_stage(final_df, args.output or _stage_file("resultado", args.competencia))
+    print(f"Resultado ({len(final_df)} linhas) gravado em '{path}'.")
+
+def cmd_report(args):
+    """Gera o relatório final a partir do resultado gravado por `calculate`."""
+    final_df = _load_stage(args.input or _stage_file("resultado", args.competencia), "calculate")
+    if final_df is not None:
+        _report(final_df, formats=args.output_format, output_file=args.output_file)
+
+def cmd_reconcile(args):
+    """Concilia o resultado gravado por `calculate` com a compra anterior ou com outro motor."""
+    from src.reconciliation import run_reconciliation
+    final_df = _load_stage(args.input or _stage_file("resultado", args.competencia), "calculate")
+    if final_df is None:
+        return
+    referencia = args.contra or config.FILE_PATHS["template_vr"]
+    if args.contra_engine:
+        periodo = _periodo(args)
+        processados = _stage_file("processados", args.competencia)
+        if os.path.exists(processados):
+            processed_dfs = _load_stage(processados, "process")
+        else:
+            from src.data_processor import process_data
+            processed_dfs = process_data(_load(args), periodo)
+        print(f"Calculando a referência com o motor '{args.contra_engine}'...")
+        referencia = _calculate(argparse.Namespace(engine=args.contra_engine, sql_parquet=None), processed_dfs, periodo)
+    run_reconciliation(final_df, referencia, args.tolerancia, args.tolerancia_relativa, args.output)
+
+def cmd_serve(args):
+    """Sobe o serviço local de cálculo (ver src/service.py)."""
+    from src.service import serve
+    # `main.py --competencia AAAA-MM serve` chega como texto único
+    competencias = [args.competencia] if isinstance(args.competencia, str) else args.competencia
+    serve(args.host, args.port, use_cache=not args.no_cache, competencias=competencias, watch=not args.no_watch)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
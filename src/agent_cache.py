@@ -0,0 +1,68 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import os
+import json
+import hashlib
+import pandas as pd
+from src import config
+
+# ------------------------------------------------------------
+def frames_fingerprint(dataframes):
+    """
+    Impressão digital determinística de um dicionário de DataFrames: nomes,
+    colunas, tipos e o hash de todas as linhas.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(dataframes):
+        df = dataframes[name]
+        digest.update(f"{name}|{list(map(str, df.columns))}|{[str(t) for t in df.dtypes]}|{len(df)}".encode("utf-8"))
+        if not df.empty:
+            digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def agent_cache_key(processed_dfs, llm_prompt, model):
+    """Chave do cache do agente: dados de entrada + prompt + modelo."""
+    digest = hashlib.sha256()
+    digest.update(frames_fingerprint(processed_dfs).encode("utf-8"))
+    digest.update(llm_prompt.encode("utf-8"))
+    digest.update(str(model).encode("utf-8"))
+    return digest.hexdigest()
+
+def _results_dir():
+    return os.path.join(config.AGENT_CACHE_DIR, "results")
+
+def _sessions_dir():
+    return os.path.join(config.AGENT_CACHE_DIR, "sessions")
+
+def load_cached_result(key):
+    """Retorna o `final_df` em cache para a chave, ou None."""
+    path = os.path.join(_results_dir(), f"{key}.pkl")
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_pickle(path)
+    except Exception as e:
+        print(f"AVISO: Cache do agente corrompido ({path}): {e}")
+        return None
+
+def store_result(key, df):
+    """Grava o `final_df` produzido pelo agente no cache."""
+    try:
+        os.makedirs(_results_dir(), exist_ok=True)
+        path = os.path.join(_results_dir(), f"{key}.pkl")
+        df.to_pickle(f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+    except Exception as e:
+        print(f"AVISO: Não foi possível gravar o cache do agente: {e}")
+
+def session_path(key):
+    """Caminho da sessão gravada (respostas do LLM, em ordem) para a chave."""
+    return os.path.join(_sessions_dir(), f"{key}.jsonl")
+
+def load_session(path):
+    """Lê as respostas do LLM gravadas em uma sessão (uma por linha)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line)["text"] for line in f if line.strip()]
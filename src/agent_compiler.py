@@ -0,0 +1,193 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import os
+import re
+import ast
+import json
+import hashlib
+import datetime
+import numpy as np
+import pandas as pd
+from src import config
+
+# Métodos de inspeção cujo resultado o agente só "olha"; chamadas soltas a
+# eles não alteram o estado e são removidas do script compilado.
+INSPECTION_METHODS = {
+    "head", "tail", "info", "describe", "value_counts", "unique", "nunique",
+    "sample", "to_string", "to_markdown", "isna", "notna", "sum", "count",
+}
+
+# ------------------------------------------------------------
+def schema_fingerprint(dataframes):
+    """
+    Impressão digital apenas do esquema (nomes das bases, colunas e tipos),
+    sem os dados: meses diferentes com o mesmo layout compartilham o script.
+    """
+    schema = {name: [[str(c), str(t)] for c, t in df.dtypes.items()] for name, df in sorted(dataframes.items())}
+    return hashlib.sha256(json.dumps(schema, sort_keys=True).encode("utf-8")).hexdigest()
+
+def sanitize_code(code):
+    """Remove crases e o prefixo 'python' do código (igual ao PythonAstREPLTool)."""
+    code = re.sub(r"^(\s|`)*(?i:python)?\s*", "", code)
+    return re.sub(r"(\s|`)*$", "", code)
+
+def _is_inspection(node):
+    """True para instruções soltas que só exibem dados (print, df.head()...)."""
+    if not isinstance(node, ast.Expr):
+        return False
+    value = node.value
+    if isinstance(value, (ast.Name, ast.Attribute, ast.Subscript, ast.Constant)):
+        return True
+    if isinstance(value, ast.Call):
+        func = value.func
+        if isinstance(func, ast.Name) and func.id in ("print", "display", "len", "type"):
+            return True
+        if isinstance(func, ast.Attribute) and func.attr in INSPECTION_METHODS:
+            return True
+    return False
+
+class _LocalRunner:
+    """Execução no processo principal (--in-process-repl), sem limites, sobre cópias das bases + pd/np."""
+
+    def __init__(self, dataframes):
+        self.namespace = {"pd": pd, "np": np}
+        self.namespace.update({name: df.copy() for name, df in dataframes.items()})
+
+    def execute(self, code):
+        exec(compile(code, "<agent>", "exec"), self.namespace)
+
+    def variable(self, nome):
+        return self.namespace.get(nome)
+
+    def close(self):
+        self.namespace.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _runner(dataframes, isolated=None):
+    """
+    Onde o código gerado pelo agente é executado: o worker isolado, com os
+    limites de CPU, memória e saída (`src/repl_worker.py`), ou o processo
+    principal. Padrão: `config.AGENT_REPL_ISOLADO`.
+    """
+    isolated = config.AGENT_REPL_ISOLADO if isolated is None else isolated
+    if isolated:
+        from src.repl_worker import ReplWorker
+        return ReplWorker(dataframes)
+    return _LocalRunner(dataframes)
+
+def compile_session(code_blocks, dataframes, expected_df=None, isolated=None):
+    """
+    Converte os `Action Input` executados pelo agente em um único script.
+
+    Os blocos são reexecutados em ordem sobre cópias de `dataframes` (no
+    worker isolado, salvo com `isolated=False`); blocos que falham
+    (tentativas que o agente corrigiu depois) e instruções de inspeção são
+    descartados. Retorna o código do script, ou None se a reexecução não
+    produzir um `final_df` igual a `expected_df`.
+    """
+    kept = []
+    with _runner(dataframes, isolated) as runner:
+        for code in code_blocks:
+            try:
+                tree = ast.parse(sanitize_code(code))
+            except SyntaxError:
+                continue
+            tree.body = [node for node in tree.body if not _is_inspection(node)]
+            if not tree.body:
+                continue
+            source = ast.unparse(tree)
+            try:
+                runner.execute(source)
+            except Exception:
+                continue
+            kept.append(source)
+        final_df = runner.variable("final_df")
+
+    if not isinstance(final_df, pd.DataFrame):
+        print("AVISO: O script compilado não produz a variável 'final_df'.")
+        return None
+    if expected_df is not None:
+        try:
+            pd.testing.assert_frame_equal(
+                final_df.reset_index(drop=True), expected_df.reset_index(drop=True), check_dtype=False
+            )
+        except AssertionError as e:
+            print(f"AVISO: O script compilado diverge do resultado do agente: {e}")
+            return None
+    return "\n\n".join(kept)
+
+def _manifest_path():
+    return os.path.join(config.COMPILED_DIR, "manifest.json")
+
+def _read_manifest():
+    try:
+        with open(_manifest_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_compiled(code, dataframes, model, prompt):
+    """
+    Grava o script como uma nova versão para o esquema atual e atualiza o
+    manifesto (esquema -> versão mais recente). Retorna o caminho gravado.
+    """
+    os.makedirs(config.COMPILED_DIR, exist_ok=True)
+    fingerprint = schema_fingerprint(dataframes)
+    manifest = _read_manifest()
+    versions = manifest.get(fingerprint, [])
+    version = len(versions) + 1
+    path = os.path.join(config.COMPILED_DIR, f"vr_pipeline_{fingerprint[:12]}_v{version}.py")
+
+    header = [
+        "# ------------------------------------------------------------",
+        "# Script gerado automaticamente a partir de uma execução do agente",
+        "# (modo compile). Executado por agent_compiler.run_compiled com as",
+        "# bases processadas, `pd` e `np` no namespace; deve definir `final_df`.",
+        f"# Esquema: {fingerprint}",
+        f"# Versão: {version}",
+        f"# Modelo: {str(model).splitlines()[0][:80]}",
+        f"# Prompt (sha256): {hashlib.sha256(prompt.encode('utf-8')).hexdigest()}",
+        f"# Gerado em: {datetime.datetime.now().isoformat(timespec='seconds')}",
+        "# ------------------------------------------------------------",
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(header) + "\n" + code + "\n")
+
+    versions.append(os.path.basename(path))
+    manifest[fingerprint] = versions
+    with open(_manifest_path(), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+def find_compiled(dataframes):
+    """Caminho do script mais recente para o esquema de `dataframes`, ou None."""
+    versions = _read_manifest().get(schema_fingerprint(dataframes))
+    if not versions:
+        return None
+    path = os.path.join(config.COMPILED_DIR, versions[-1])
+    return path if os.path.exists(path) else None
+
+def run_compiled(path, dataframes, isolated=None):
+    """
+    Executa um script compilado sobre cópias de `dataframes`, sem LLM (no
+    worker isolado, salvo com `isolated=False`). Retorna o `final_df`
+    produzido, ou None em caso de falha.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    with _runner(dataframes, isolated) as runner:
+        try:
+            runner.execute(source)
+            final_df = runner.variable("final_df")
+        except Exception as e:
+            print(f"AVISO: Falha ao executar o script compilado '{path}': {e}")
+            return None
+    return final_df if isinstance(final_df, pd.DataFrame) else None
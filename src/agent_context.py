@@ -0,0 +1,166 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import os
+import json
+import hashlib
+import pandas as pd
+from src import config
+
+# Versão do formato dos resumos (muda a chave do cache em disco)
+CONTEXT_VERSION = 1
+
+# Níveis de detalhe de um resumo, do mais completo ao mais curto
+NIVEL_COMPLETO, NIVEL_ESQUEMA, NIVEL_NOMES = 2, 1, 0
+
+# Codificador do tiktoken (None = ainda não carregado, False = indisponível)
+_ENCODER = None
+
+# Resumos já calculados nesta execução: (hash da base, nome, nível) -> texto
+_MEMORIA = {}
+
+# ------------------------------------------------------------
+def _encoder():
+    global _ENCODER
+    if _ENCODER is None:
+        try:
+            import tiktoken
+            _ENCODER = tiktoken.encoding_for_model(config.AGENT_MODEL)
+        except Exception:
+            # tiktoken ausente, modelo desconhecido ou sem rede para baixar o vocabulário
+            _ENCODER = False
+    return _ENCODER
+
+def count_tokens(text):
+    """
+    Número de tokens de `text` no modelo do agente (tiktoken, se disponível;
+    senão, estimativa por `config.AGENT_CONTEXT_CHARS_POR_TOKEN`).
+    """
+    encoder = _encoder()
+    if encoder:
+        return len(encoder.encode(text))
+    return -(-len(text) // config.AGENT_CONTEXT_CHARS_POR_TOKEN)
+
+def _frame_hash(df):
+    """Hash das colunas, tipos e linhas de uma base (chave do cache de resumos)."""
+    digest = hashlib.sha256(f"{list(map(str, df.columns))}|{[str(t) for t in df.dtypes]}|{len(df)}".encode("utf-8"))
+    if not df.empty:
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def _valor(valor):
+    texto = str(valor)
+    limite = config.AGENT_CONTEXT_MAX_CHARS_VALOR
+    return texto if len(texto) <= limite else texto[: limite - 1] + "…"
+
+def _is_key_column(col, serie):
+    if col in config.AGENT_CONTEXT_COLUNAS_CHAVE or isinstance(serie.dtype, pd.CategoricalDtype):
+        return True
+    # Textos de baixa cardinalidade (ex: COMUNICADO_DE_DESLIGAMENTO) também são amostrados
+    return pd.api.types.is_string_dtype(serie.dtype) and serie.nunique(dropna=True) <= config.AGENT_CONTEXT_AMOSTRAS
+
+def _describe_column(col, serie, nivel):
+    """Uma linha do resumo: tipo, nulos, distintos e amostra/intervalo de valores."""
+    nulos = int(serie.isna().sum())
+    linha = f"- {col} ({serie.dtype}, nulos={nulos}"
+    if nivel < NIVEL_COMPLETO:
+        return linha + ")"
+    linha += f", distintos={serie.nunique(dropna=True)})"
+    validos = serie.dropna()
+    if validos.empty:
+        return linha
+    if _is_key_column(col, serie):
+        contagem = validos.value_counts().head(config.AGENT_CONTEXT_AMOSTRAS)
+        contagem = contagem[contagem > 0]
+        return linha + ": " + "; ".join(f"{_valor(v)} ({n})" for v, n in contagem.items())
+    if pd.api.types.is_numeric_dtype(serie.dtype) or pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return linha + f": min={_valor(validos.min())}, max={_valor(validos.max())}"
+    return linha + ": ex: " + "; ".join(_valor(v) for v in validos.unique()[:3])
+
+def summarize_frame(name, df, nivel=NIVEL_COMPLETO):
+    """
+    Resumo de uma base para o prompt do agente, com tamanho independente do
+    número de linhas:
+    - NIVEL_COMPLETO: esquema, nulos, distintos, valores mais frequentes das
+      colunas-chave (SINDICATO, cargos, situação...) e min/max das numéricas;
+    - NIVEL_ESQUEMA: só colunas, tipos e nulos;
+    - NIVEL_NOMES: uma linha com as colunas.
+    """
+    cabecalho = f"### {name} ({len(df)} linhas, {len(df.columns)} colunas)"
+    if df.empty:
+        return f"{cabecalho}\nDATAFRAME VAZIO"
+    if nivel == NIVEL_NOMES:
+        return f"{cabecalho}: {', '.join(map(str, df.columns))}"
+    linhas = [cabecalho] + [_describe_column(col, df[col], nivel) for col in df.columns]
+    return "\n".join(linhas)
+
+def _cache_path(chave):
+    return os.path.join(config.AGENT_CACHE_DIR, "context", f"{chave}.json")
+
+def cached_summary(name, df, nivel=NIVEL_COMPLETO, use_cache=True):
+    """
+    `summarize_frame` com cache em memória e em disco (chave: conteúdo da
+    base, nome, nível e `CONTEXT_VERSION`), para que a mesma base não seja
+    resumida de novo a cada execução ou nível testado.
+    """
+    if not use_cache:
+        return summarize_frame(name, df, nivel)
+    chave = hashlib.sha256(f"{CONTEXT_VERSION}|{name}|{nivel}|{_frame_hash(df)}".encode("utf-8")).hexdigest()
+    if chave in _MEMORIA:
+        return _MEMORIA[chave]
+    path = _cache_path(chave)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            texto = json.load(f)["resumo"]
+    except (OSError, ValueError, KeyError):
+        texto = summarize_frame(name, df, nivel)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                json.dump({"base": name, "nivel": nivel, "resumo": texto}, f, ensure_ascii=False)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            print(f"AVISO: Não foi possível gravar o resumo da base '{name}' em cache: {e}")
+    _MEMORIA[chave] = texto
+    return texto
+
+def build_context(dataframes, max_tokens=None, use_cache=True):
+    """
+    Monta o contexto das bases para o prompt do agente dentro de um limite
+    rígido de tokens (padrão: `config.AGENT_CONTEXT_MAX_TOKENS`).
+
+    Todas as bases começam no nível completo; enquanto o total passar do
+    limite, a base com o maior resumo desce um nível. Se nem com todas no
+    nível mínimo o texto couber, ele é truncado.
+
+    Returns:
+        Tupla (texto do contexto, número de tokens).
+    """
+    max_tokens = config.AGENT_CONTEXT_MAX_TOKENS if max_tokens is None else max_tokens
+    niveis = {name: NIVEL_COMPLETO for name in dataframes}
+
+    def resumo(name):
+        return cached_summary(name, dataframes[name], niveis[name], use_cache)
+
+    tokens = {name: count_tokens(resumo(name)) for name in dataframes}
+    while sum(tokens.values()) + len(tokens) > max_tokens:
+        redutiveis = [name for name in dataframes if niveis[name] > NIVEL_NOMES]
+        if not redutiveis:
+            break
+        maior = max(redutiveis, key=tokens.get)
+        niveis[maior] -= 1
+        tokens[maior] = count_tokens(resumo(maior))
+
+    texto = "\n\n".join(resumo(name) for name in dataframes)
+    total = count_tokens(texto)
+    if total > max_tokens:
+        marcador = "\n... (contexto truncado pelo limite de tokens)"
+        # Corte proporcional, repetido até caber (a razão caracteres/token varia)
+        while total > max_tokens and texto:
+            texto = texto[: int(len(texto) * max_tokens / total * 0.95)]
+            total = count_tokens(texto + marcador)
+        texto += marcador
+        total = count_tokens(texto)
+    return texto, total
@@ -0,0 +1,151 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import os
+import json
+import time
+import pickle
+import hashlib
+from langchain_core.caches import BaseCache
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import FakeListChatModel
+from src import config
+from src import instrumentation
+from src.agent_cache import load_session
+
+# Peças do agente que dependem do LangChain (cache de completions, replay e
+# perfil das chamadas), fora de `agent_cache` para que o cache de resultados
+# e o modo compile não importem o LangChain.
+
+# ------------------------------------------------------------
+def replay_llm(path):
+    """
+    LLM local que reproduz, em ordem, as respostas gravadas em uma sessão.
+    Permite rodar o agente em testes/CI sem rede.
+    """
+    return FakeListChatModel(responses=load_session(path))
+
+class DiskLLMCache(BaseCache):
+    """
+    Cache persistente de completions do LLM (um arquivo por prompt +
+    configuração do modelo). Opcionalmente grava, em ordem, todas as
+    respostas da execução em `session_file` para replay posterior.
+    """
+
+    def __init__(self, cache_dir=None, session_file=None):
+        self.cache_dir = cache_dir or os.path.join(config.AGENT_CACHE_DIR, "llm")
+        self.session_file = session_file
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if session_file:
+            os.makedirs(os.path.dirname(session_file) or ".", exist_ok=True)
+            open(session_file, "w", encoding="utf-8").close()
+
+    def _path(self, prompt, llm_string):
+        key = hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _record(self, return_val):
+        if not self.session_file:
+            return
+        with open(self.session_file, "a", encoding="utf-8") as f:
+            for generation in return_val:
+                f.write(json.dumps({"text": generation.text}, ensure_ascii=False) + "\n")
+
+    def lookup(self, prompt, llm_string):
+        path = self._path(prompt, llm_string)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                return_val = pickle.load(f)
+        except Exception:
+            return None
+        self._record(return_val)
+        return return_val
+
+    def update(self, prompt, llm_string, return_val):
+        path = self._path(prompt, llm_string)
+        with open(f"{path}.tmp", "wb") as f:
+            pickle.dump(return_val, f)
+        os.replace(f"{path}.tmp", path)
+        self._record(return_val)
+
+    def clear(self, **kwargs):
+        for entry in os.listdir(self.cache_dir):
+            if entry.endswith(".pkl"):
+                os.remove(os.path.join(self.cache_dir, entry))
+
+def _token_usage(response):
+    """(tokens de entrada, de saída, total) de uma resposta do LLM, se informados."""
+    for geracoes in response.generations:
+        for geracao in geracoes:
+            uso = getattr(getattr(geracao, "message", None), "usage_metadata", None)
+            if uso:
+                return uso.get("input_tokens"), uso.get("output_tokens"), uso.get("total_tokens")
+    uso = (response.llm_output or {}).get("token_usage") or {}
+    return uso.get("prompt_tokens"), uso.get("completion_tokens"), uso.get("total_tokens")
+
+class ProfilingCallbackHandler(BaseCallbackHandler):
+    """
+    Registra no perfil de execução (src.instrumentation) cada chamada ao LLM
+    (latência e tokens) e cada chamada de ferramenta do agente, numeradas
+    pela iteração do loop ReAct em que ocorreram.
+    """
+
+    def __init__(self, tid=None):
+        # tid: linha do trace-event (ex: um por shard do agente); None = thread atual
+        self.tid = tid
+        self.iteracao = 0
+        self.totais = {"llm_calls": 0, "tool_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        self._inicio = {}
+
+    def _start(self, run_id):
+        self._inicio[run_id] = (time.time(), time.perf_counter())
+
+    def _stop(self, run_id):
+        inicio, t0 = self._inicio.pop(run_id, (time.time(), time.perf_counter()))
+        return inicio, time.perf_counter() - t0
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        inicio, duracao = self._stop(run_id)
+        entrada, saida, total = _token_usage(response)
+        self.totais["llm_calls"] += 1
+        for chave, valor in (("prompt_tokens", entrada), ("completion_tokens", saida), ("total_tokens", total)):
+            self.totais[chave] += valor or 0
+        instrumentation.record(
+            "llm_call", inicio, duracao, "agente", tid=self.tid, iteracao=self.iteracao,
+            prompt_tokens=entrada, completion_tokens=saida, total_tokens=total,
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        inicio, duracao = self._stop(run_id)
+        instrumentation.record("llm_call", inicio, duracao, "agente", tid=self.tid, iteracao=self.iteracao, erro=str(error))
+
+    def on_agent_action(self, action, *, run_id, **kwargs):
+        self.iteracao += 1
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id)
+        self._inicio[(run_id, "nome")] = (serialized or {}).get("name", "tool")
+        self._inicio[(run_id, "entrada")] = len(input_str or "")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._record_tool(run_id, saida_chars=len(str(output)))
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._record_tool(run_id, erro=str(error))
+
+    def _record_tool(self, run_id, **attrs):
+        nome = self._inicio.pop((run_id, "nome"), "tool")
+        entrada = self._inicio.pop((run_id, "entrada"), None)
+        inicio, duracao = self._stop(run_id)
+        self.totais["tool_calls"] += 1
+        instrumentation.record(f"tool:{nome}", inicio, duracao, "agente", tid=self.tid, iteracao=self.iteracao, entrada_chars=entrada, **attrs)
@@ -0,0 +1,152 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import unicodedata
+import numpy as np
+import pandas as pd
+from src import config
+
+# ------------------------------------------------------------
+def _normalize_name(nome):
+    texto = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode("ascii")
+    return texto.strip().upper().replace(" ", "_")
+
+def matricula_column(df):
+    """Coluna de matrícula de um DataFrame (o agente pode usar outro nome/caixa), ou None."""
+    if config.MATRICULA_COL in df.columns:
+        return config.MATRICULA_COL
+    for col in df.columns:
+        if _normalize_name(col) == config.MATRICULA_COL:
+            return col
+    return None
+
+def _matriculas(df):
+    col = matricula_column(df)
+    if col is None:
+        return None
+    return pd.to_numeric(df[col], errors="coerce").astype("Int64")
+
+def _exemplos(matriculas, n=5):
+    return [int(m) for m in sorted(matriculas)[:n]]
+
+def _pieces(funcionarios, coluna, n_shards):
+    """
+    Grupos de colaboradores a distribuir entre os shards: um por valor de
+    `coluna`. Grupos maiores que o tamanho-alvo (total / n_shards) são
+    quebrados em blocos de matrículas, para que um sindicato grande não
+    limite o paralelismo.
+    """
+    if coluna in funcionarios.columns:
+        chaves = funcionarios[coluna].astype("object").where(funcionarios[coluna].notna(), "(vazio)").to_numpy()
+    else:
+        print(f"AVISO: Coluna '{coluna}' não encontrada em 'funcionarios'. Dividindo os shards por matrícula.")
+        chaves = np.zeros(len(funcionarios), dtype=np.int64)
+    alvo = max(1, -(-len(funcionarios) // n_shards))
+    pecas = []
+    for _, posicoes in pd.Series(np.arange(len(funcionarios))).groupby(chaves, sort=True):
+        posicoes = posicoes.to_numpy()
+        for inicio in range(0, len(posicoes), alvo):
+            pecas.append(posicoes[inicio:inicio + alvo])
+    return pecas
+
+def assign_shards(funcionarios, n_shards, coluna=None):
+    """
+    Número do shard (0..n-1) de cada linha de `funcionarios`. Colaboradores
+    com o mesmo valor de `coluna` (padrão: `config.AGENT_SHARD_COL`) ficam
+    no mesmo shard sempre que possível; os grupos são distribuídos do maior
+    para o menor, cada um no shard com menos linhas.
+    """
+    coluna = coluna or config.AGENT_SHARD_COL
+    n_shards = max(1, min(int(n_shards), len(funcionarios)))
+    shard = np.zeros(len(funcionarios), dtype=np.int64)
+    carga = np.zeros(n_shards, dtype=np.int64)
+    for posicoes in sorted(_pieces(funcionarios, coluna, n_shards), key=len, reverse=True):
+        destino = int(np.argmin(carga))
+        shard[posicoes] = destino
+        carga[destino] += len(posicoes)
+    return shard
+
+def partition_frames(processed_dfs, n_shards, coluna=None):
+    """
+    Divide as bases processadas em shards independentes para o agente.
+
+    `funcionarios` é particionado por `assign_shards`; as demais bases com
+    coluna de matrícula (férias, desligados, excluídos...) são filtradas
+    para as matrículas de cada shard, e as bases de referência (sindicatos,
+    dias úteis) vão inteiras para todos.
+
+    Returns:
+        Lista de dicionários de bases, um por shard não vazio.
+    """
+    funcionarios = processed_dfs["funcionarios"]
+    shard = assign_shards(funcionarios, n_shards, coluna)
+    matriculas = _matriculas(funcionarios)
+    shards = []
+    for numero in np.unique(shard):
+        linhas = shard == numero
+        selecionadas = pd.Index(matriculas[linhas].dropna().unique())
+        bases = {}
+        for name, df in processed_dfs.items():
+            if name == "funcionarios":
+                bases[name] = funcionarios[linhas].reset_index(drop=True)
+                continue
+            chaves = _matriculas(df) if isinstance(df, pd.DataFrame) else None
+            bases[name] = df if chaves is None else df[chaves.isin(selecionadas).to_numpy(dtype=bool, na_value=False)].reset_index(drop=True)
+        shards.append(bases)
+    return shards
+
+def check_shard_result(shard_dfs, final_df):
+    """
+    Verifica o resultado de um shard contra as suas entradas: colaboradores
+    de fora do shard ou repetidos invalidam o resultado; colaboradores do
+    shard ausentes no resultado só geram aviso.
+
+    Returns:
+        Tupla (lista de erros, lista de avisos).
+    """
+    erros, avisos = [], []
+    if final_df is None or final_df.empty:
+        return ["resultado vazio"], avisos
+    resultado = _matriculas(final_df)
+    if resultado is None:
+        return [f"coluna '{config.MATRICULA_COL}' ausente no resultado"], avisos
+    entrada = set(_matriculas(shard_dfs["funcionarios"]).dropna())
+    obtidas = resultado.dropna()
+    fora = set(obtidas) - entrada
+    if fora:
+        erros.append(f"{len(fora)} matrícula(s) de fora do shard (ex: {_exemplos(fora)})")
+    repetidas = obtidas[obtidas.duplicated()].unique()
+    if len(repetidas):
+        erros.append(f"{len(repetidas)} matrícula(s) repetida(s) (ex: {_exemplos(repetidas)})")
+    ausentes = entrada - set(obtidas)
+    if ausentes:
+        avisos.append(f"{len(ausentes)} matrícula(s) do shard sem linha no resultado (ex: {_exemplos(ausentes)})")
+    return erros, avisos
+
+def merge_shard_results(resultados):
+    """
+    Junta os `final_df` dos shards (na ordem dos shards). Todos devem ter as
+    mesmas colunas do primeiro; a ordem das colunas segue a dele.
+
+    Returns:
+        Tupla (DataFrame combinado, lista de erros). Com erros, o DataFrame é vazio.
+    """
+    if not resultados:
+        return pd.DataFrame(), ["nenhum shard calculado"]
+    colunas = list(resultados[0].columns)
+    erros = []
+    for numero, df in enumerate(resultados[1:], start=1):
+        faltando = [c for c in colunas if c not in df.columns]
+        extras = [c for c in df.columns if c not in colunas]
+        if faltando or extras:
+            erros.append(f"shard {numero}: colunas diferentes do shard 0 (faltando: {faltando}, extras: {extras})")
+    if erros:
+        return pd.DataFrame(), erros
+    final_df = pd.concat([df[colunas] for df in resultados], ignore_index=True)
+    matriculas = _matriculas(final_df).dropna()
+    repetidas = matriculas[matriculas.duplicated()].unique()
+    if len(repetidas):
+        return pd.DataFrame(), [f"{len(repetidas)} matrícula(s) em mais de um shard (ex: {_exemplos(repetidas)})"]
+    return final_df, erros
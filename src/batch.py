@@ -0,0 +1,108 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import io
+import os
+import glob
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from src import config
+from src.data_loader import load_all_data
+from src.data_registry import DataRegistry
+from src.data_processor import process_data
+from src.native_engine import run_calculations_native
+from src.output_generator import generate_report
+from src.periodo import periodo_da_competencia
+
+# ------------------------------------------------------------
+def resolve_file_paths(input_dir):
+    """
+    Localiza a planilha de cada base no diretório de uma competência pelos
+    padrões de `config.FILE_PATTERNS`. Bases sem arquivo correspondente
+    recebem o nome padrão (e serão tratadas como ausentes pelo loader).
+    """
+    paths = {}
+    for name, default_path in config.FILE_PATHS.items():
+        pattern = config.FILE_PATTERNS.get(name, os.path.basename(default_path))
+        matches = sorted(glob.glob(os.path.join(glob.escape(input_dir), pattern)))
+        paths[name] = matches[0] if matches else os.path.join(input_dir, os.path.basename(default_path))
+    return paths
+
+def load_shared_references(use_cache=True):
+    """Carrega uma única vez as bases de referência comuns a todos os meses."""
+    paths = {name: config.FILE_PATHS[name] for name in config.SHARED_SOURCES}
+    return load_all_data(use_cache=use_cache, workers=1, file_paths=paths)
+
+def run_month(competencia, input_dir, shared, use_cache=True, streaming=False, formats=None):
+    """
+    Calcula uma competência com o motor nativo e gera o seu relatório.
+
+    As bases de `shared` são usadas, a menos que o diretório do mês tenha a
+    sua própria planilha. A saída do processamento é capturada e devolvida
+    em "log" para ser exibida em ordem pelo processo principal.
+    """
+    log = io.StringIO()
+    result = {"competencia": competencia, "diretorio": input_dir}
+    with contextlib.redirect_stdout(log):
+        try:
+            periodo = periodo_da_competencia(competencia)
+            paths = resolve_file_paths(input_dir)
+            month_paths = {name: path for name, path in paths.items() if name not in shared or os.path.exists(path)}
+
+            # Só as bases usadas pelo cálculo são lidas (ver DataRegistry)
+            dataframes = DataRegistry(month_paths, use_cache=use_cache, streaming=streaming)
+            dataframes = dataframes.derive(**{name: df for name, df in shared.items() if name not in dataframes})
+
+            processed_dfs = process_data(dataframes, periodo)
+            final_df = run_calculations_native(processed_dfs, periodo)
+
+            output_file = os.path.join(config.OUTPUT_DIR, f"VR_compra_calculado_{competencia}.xlsx")
+            if not final_df.empty:
+                generate_report(final_df, formats=formats, output_file=output_file)
+            result.update({
+                "colaboradores": len(final_df),
+                "valor_total": float(final_df["VALOR_TOTAL_VR"].sum()) if not final_df.empty else 0.0,
+                "arquivo": output_file if not final_df.empty else None,
+            })
+        except Exception as e:
+            print(f"ERRO: Falha ao calcular a competência {competencia}: {e}")
+            result["erro"] = str(e)
+    result["log"] = log.getvalue()
+    return result
+
+def run_batch(meses, workers=None, use_cache=True, streaming=False, formats=None):
+    """
+    Recalcula várias competências de uma vez.
+
+    Args:
+        meses: Dicionário competência ("AAAA-MM") -> diretório de entrada.
+        workers: Número de processos (padrão: um por competência, limitado
+            ao número de núcleos).
+
+    Returns:
+        Lista com o resumo de cada competência, na ordem de `meses`.
+    """
+    print(f"--- Iniciando processamento em lote de {len(meses)} competência(s) ---")
+    shared = load_shared_references(use_cache=use_cache)
+
+    workers = workers or min(len(meses), os.cpu_count() or 1)
+    args = [(competencia, input_dir, shared, use_cache, streaming, formats) for competencia, input_dir in meses.items()]
+    if workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run_month, *zip(*args)))
+    else:
+        results = [run_month(*a) for a in args]
+
+    for result in results:
+        print(f"\n=== Competência {result['competencia']} ({result['diretorio']}) ===")
+        print(result["log"], end="")
+    print("\n--- Resumo do lote ---")
+    for result in results:
+        if "erro" in result:
+            print(f"{result['competencia']}: ERRO - {result['erro']}")
+        else:
+            print(f"{result['competencia']}: {result['colaboradores']} colaboradores, "
+                  f"R$ {result['valor_total']:,.2f} -> {result['arquivo']}")
+    return results
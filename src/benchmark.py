@@ -0,0 +1,284 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import datetime
+import subprocess
+import contextlib
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from src import config
+from src.data_loader import load_all_data
+from src.data_processor import normalize_dataframes, consolidate_data, flag_exclusions, apply_exclusions
+from src.native_engine import run_calculations_native
+from src.output_generator import generate_report
+from src.synthetic import ensure_dataset
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Etapas medidas, na ordem do pipeline
+STAGES = ["load_all_data", "normalize", "consolidate_data", "apply_exclusions", "calculate", "generate_report"]
+
+# Inicialização a frio medida por `--imports` (cada comando em um processo novo)
+IMPORT_TARGETS = {
+    "main.py --help": ["main.py", "--help"],
+    "import main": ["-c", "import main"],
+    "import src.native_engine": ["-c", "import src.native_engine"],
+    "import src.calculation_engine": ["-c", "import src.calculation_engine"],
+}
+
+# Pacotes que só podem ser importados quando o motor do agente é usado
+AGENT_PACKAGES = {"langchain", "langchain_core", "langchain_openai", "langchain_google_genai", "langchain_experimental", "openai", "dotenv"}
+
+# ------------------------------------------------------------
+def _rss_max_mb():
+    """Pico de memória residente do processo (MB), se disponível."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _measure(nome, func, resultados, memoria):
+    """Executa uma etapa, registrando tempo, pico de alocação e RSS."""
+    if memoria:
+        tracemalloc.reset_peak()
+    inicio = time.perf_counter()
+    valor = func()
+    resultados[nome] = {"segundos": round(time.perf_counter() - inicio, 4)}
+    if memoria:
+        resultados[nome]["pico_alocado_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+    resultados[nome]["rss_max_mb"] = _rss_max_mb()
+    return valor
+
+def benchmark_size(n_employees, base_dir=None, memoria=True, seed=0, streaming=False, workers=1):
+    """
+    Mede cada etapa do pipeline (motor nativo) para um conjunto sintético de
+    `n_employees` colaboradores. A saída do pipeline é suprimida; o relatório
+    é gravado em um diretório temporário dentro do conjunto.
+
+    Returns:
+        Dicionário com as medições por etapa e o número de linhas processadas.
+    """
+    paths = ensure_dataset(n_employees, base_dir, seed)
+    output_file = os.path.join(os.path.dirname(paths["ativos"]), "output", "VR_compra_calculado.xlsx")
+    etapas = {}
+    if memoria:
+        tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            dataframes = _measure("load_all_data", lambda: load_all_data(use_cache=False, workers=workers, streaming=streaming, file_paths=paths), etapas, memoria)
+            dataframes = _measure("normalize", lambda: normalize_dataframes(dataframes), etapas, memoria)
+            consolidado = _measure("consolidate_data", lambda: consolidate_data(dataframes), etapas, memoria)
+            funcionarios = _measure("apply_exclusions", lambda: apply_exclusions(flag_exclusions(consolidado, dataframes), dataframes), etapas, memoria)
+            processed = {k: v for k, v in dataframes.items() if k not in ("ativos", "admissoes")}
+            processed["funcionarios"] = funcionarios
+            final_df = _measure("calculate", lambda: run_calculations_native(processed), etapas, memoria)
+            _measure("generate_report", lambda: generate_report(final_df, formats=["xlsx"], output_file=output_file), etapas, memoria)
+    finally:
+        if memoria:
+            tracemalloc.stop()
+
+    return {
+        "colaboradores": n_employees,
+        "linhas_consolidadas": len(consolidado),
+        "linhas_resultado": len(final_df),
+        "segundos_total": round(sum(e["segundos"] for e in etapas.values()), 4),
+        "etapas": etapas,
+    }
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(sizes=None, output_file=None, base_dir=None, memoria=True, seed=0, streaming=False, workers=1):
+    """
+    Executa `benchmark_size` para cada tamanho, cada um em um processo novo
+    (memória e caches isolados), e grava os resultados em JSON junto com o
+    commit e o ambiente, para comparação entre versões.
+
+    Returns:
+        O caminho do JSON gravado.
+    """
+    sizes = sizes or config.BENCHMARK_SIZES
+    commit = _git_commit()
+    resultado = {
+        "commit": commit,
+        "data": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "opcoes": {"memoria": memoria, "seed": seed, "streaming": streaming, "workers": workers},
+        "tamanhos": [],
+    }
+    for n in sizes:
+        print(f"--- Benchmark com {n} colaboradores ---")
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            medicao = executor.submit(benchmark_size, n, base_dir, memoria, seed, streaming, workers).result()
+        for etapa, valores in medicao["etapas"].items():
+            extra = f", pico {valores['pico_alocado_mb']} MB" if "pico_alocado_mb" in valores else ""
+            print(f"  - {etapa}: {valores['segundos']:.3f}s{extra}")
+        resultado["tamanhos"].append(medicao)
+
+    output_file = output_file or os.path.join(
+        config.BENCHMARK_DIR, f"bench_{commit or 'local'}_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em '{output_file}'.")
+    return output_file
+
+def compare_results(base_file, novo_file, tolerancia=0.2):
+    """
+    Compara dois JSON de benchmark, etapa a etapa e tamanho a tamanho, e
+    retorna um DataFrame com a variação relativa de tempo e memória. Linhas
+    com piora acima de `tolerancia` são marcadas como REGRESSAO.
+    """
+    with open(base_file, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(novo_file, "r", encoding="utf-8") as f:
+        novo = json.load(f)
+
+    if base.get("opcoes") != novo.get("opcoes"):
+        # tracemalloc, por exemplo, deixa as etapas várias vezes mais lentas
+        print(f"AVISO: Benchmarks com opções diferentes ({base.get('opcoes')} x {novo.get('opcoes')}); a comparação pode não ser válida.")
+    base_por_tamanho = {t["colaboradores"]: t for t in base["tamanhos"]}
+    linhas = []
+    for medicao in novo["tamanhos"]:
+        anterior = base_por_tamanho.get(medicao["colaboradores"])
+        if anterior is None:
+            continue
+        for etapa, valores in medicao["etapas"].items():
+            antes = anterior["etapas"].get(etapa)
+            if antes is None:
+                continue
+            linha = {"colaboradores": medicao["colaboradores"], "etapa": etapa,
+                     "segundos_base": antes["segundos"], "segundos_novo": valores["segundos"]}
+            linha["variacao_tempo"] = (valores["segundos"] / antes["segundos"] - 1) if antes["segundos"] else None
+            if "pico_alocado_mb" in valores and antes.get("pico_alocado_mb"):
+                linha["variacao_memoria"] = valores["pico_alocado_mb"] / antes["pico_alocado_mb"] - 1
+            else:
+                linha["variacao_memoria"] = None
+            piora = max(v for v in (linha["variacao_tempo"], linha["variacao_memoria"], 0) if v is not None)
+            linha["status"] = "REGRESSAO" if piora > tolerancia else "OK"
+            linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+def measure_startup(args, repeticoes=5):
+    """
+    Menor tempo de parede (s) de `python <args>` em `repeticoes` processos
+    novos: o mínimo descarta o ruído do sistema e mede a inicialização a frio
+    do interpretador mais as importações.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        tempos.append(time.perf_counter() - inicio)
+    return round(min(tempos), 4)
+
+def import_profile(modulo, top=10):
+    """
+    Pacotes de maior tempo cumulativo de importação de `modulo`, segundo
+    `python -X importtime` (apenas os de primeiro nível).
+    """
+    saida = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"], capture_output=True, text=True, check=True).stderr
+    linhas = []
+    for linha in saida.splitlines():
+        partes = linha.removeprefix("import time:").split("|")
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+        nome = partes[2].rstrip()
+        # Nível 1 de aninhamento (3 espaços): importações feitas diretamente pelo módulo
+        if nome.startswith("   ") and not nome.startswith("     "):
+            linhas.append({"pacote": nome.strip(), "segundos": int(partes[1]) / 1e6})
+    df = pd.DataFrame(linhas, columns=["pacote", "segundos"])
+    return df.sort_values("segundos", ascending=False, ignore_index=True).head(top)
+
+def agent_packages_loaded():
+    """
+    Pacotes do agente (LangChain, provedores de LLM) carregados ao importar a
+    CLI, os módulos do caminho nativo e o motor do agente (que só os importa
+    ao chamar o modelo); deve ser vazio.
+    """
+    codigo = (
+        "import sys, main, src.data_loader, src.data_processor, src.native_engine, src.incremental, src.batch, src.output_generator, src.calculation_engine; "
+        "main.build_parser().parse_args(['calculate', '--engine', 'native']); "
+        "print(' '.join(sorted({m.split('.')[0] for m in sys.modules})))"
+    )
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True).stdout
+    return sorted(set(saida.split()) & AGENT_PACKAGES)
+
+def run_import_benchmark(repeticoes=5, limite=None):
+    """
+    Mede a inicialização a frio da CLI e dos motores e verifica que o caminho
+    nativo não importa o LangChain. Retorna 1 (falha) se `main.py --help`
+    passar de `limite` (padrão: config.IMPORT_TIME_LIMITE_S) ou se algum
+    pacote do agente for carregado fora do caminho do agente.
+    """
+    limite = config.IMPORT_TIME_LIMITE_S if limite is None else limite
+    print(f"--- Inicialização a frio (melhor de {repeticoes}) ---")
+    tempos = {nome: measure_startup(args, repeticoes) for nome, args in IMPORT_TARGETS.items()}
+    for nome, segundos in tempos.items():
+        print(f"  - {nome}: {segundos:.3f}s")
+
+    print("--- Maiores importações de main ---")
+    print(import_profile("main").to_string(index=False))
+
+    status = 0
+    if tempos["main.py --help"] > limite:
+        print(f"ERRO: `main.py --help` levou {tempos['main.py --help']:.3f}s (limite: {limite}s).")
+        status = 1
+    carregados = agent_packages_loaded()
+    if carregados:
+        print(f"ERRO: Pacotes do agente importados fora do caminho do agente: {', '.join(carregados)}.")
+        status = 1
+    if status == 0:
+        print("Inicialização dentro do limite e sem importações do agente no caminho nativo.")
+    return status
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de escala do pipeline de VR com dados sintéticos.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=None, help="Números de colaboradores (padrão: config.BENCHMARK_SIZES).")
+    parser.add_argument("--output", default=None, help="Arquivo JSON de saída (padrão: config.BENCHMARK_DIR/bench_<commit>_<data>.json).")
+    parser.add_argument("--data-dir", default=None, help="Diretório dos dados sintéticos (padrão: config.SYNTHETIC_DIR).")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do gerador de dados sintéticos.")
+    parser.add_argument("--no-memory", action="store_true", help="Não mede memória com tracemalloc (tempos mais próximos do real).")
+    parser.add_argument("--streaming", action="store_true", help="Carrega as planilhas em modo streaming.")
+    parser.add_argument("--workers", type=int, default=1, help="Processos para leitura das planilhas.")
+    parser.add_argument("--compare", default=None, metavar="BASE.json", help="Compara o resultado com um benchmark anterior.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Piora relativa aceita antes de marcar regressão (padrão: 0.2).")
+    parser.add_argument("--imports", action="store_true", help="Mede só a inicialização a frio da CLI (limite: config.IMPORT_TIME_LIMITE_S).")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições de cada medição de --imports (usa a menor).")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.imports:
+        return run_import_benchmark(args.repeat)
+    output_file = run_benchmark(args.sizes, args.output, args.data_dir, not args.no_memory, args.seed, args.streaming, args.workers)
+    if args.compare:
+        comparacao = compare_results(args.compare, output_file, args.tolerance)
+        print(comparacao.to_string(index=False))
+        if (comparacao["status"] == "REGRESSAO").any():
+            print("AVISO: Regressões de desempenho encontradas.")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,27 +4,254 @@
 # ------------------------------------------------------------
 # Libs:
 import os
+import time
+import asyncio
+import threading
 import pandas as pd
-from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
-from langchain_experimental.tools import PythonAstREPLTool
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.agents import Tool, AgentExecutor, create_react_agent
-
-def run_calculations(processed_dfs: dict, llm_prompt: str) -> pd.DataFrame:
+from src import config
+from src import agent_cache
+from src import agent_shards
+from src import agent_compiler
+from src import agent_context
+from src import instrumentation
+from src.data_registry import select
+from src.periodo import periodo_padrao, formatar_data
+from src.repl_worker import ReplWorker
+
+def run_calculations(processed_dfs: dict, llm_prompt: str, llm=None, use_cache: bool = True, compile_mode: bool = False, periodo: dict = None, isolated: bool = None) -> pd.DataFrame:
     """
     Executa os cálculos de negócio usando um agente autônomo.
 
     Args:
         processed_dfs: Dicionário com os dataframes processados.
         llm_prompt: O prompt detalhado com as regras de negócio.
+        llm: Modelo de chat a usar (ex: `agent_llm.replay_llm(...)` em
+            testes). Se None, usa o modelo de `config.AGENT_MODEL`.
+        use_cache: Reaproveita o `final_df` e as completions já calculados
+            para os mesmos dados, prompt e modelo.
+        compile_mode: Executa o script compilado de uma sessão anterior
+            quando o esquema das bases é o mesmo (sem LLM); caso contrário,
+            roda o agente e compila o código que ele executou.
+        periodo: Período de apuração preenchido no prompt. Se None, usa o
+            período configurado em `config`.
+        isolated: Executa o código do agente em um processo separado, com
+            limites de CPU, memória e saída (ver `src/repl_worker.py`).
+            Padrão: `config.AGENT_REPL_ISOLADO`.
 
     Returns:
         O dataframe final com os resultados.
     """
+    # Só as bases usadas pelo agente (ver config.AGENT_SOURCES)
+    processed_dfs = select(processed_dfs, config.AGENT_SOURCES)
+    with instrumentation.stage("run_calculations", "agente", rows_in=instrumentation.rows(processed_dfs)) as span:
+        final_df = _run_calculations(processed_dfs, llm_prompt, llm, use_cache, compile_mode, periodo, isolated, span)
+        span.set(rows_out=instrumentation.rows(final_df))
+    return final_df
+
+def _run_calculations(processed_dfs, llm_prompt, llm, use_cache, compile_mode, periodo, isolated, span):
+    """Corpo de `run_calculations` (medido como uma única etapa)."""
     print("--- Iniciando agente autônomo para cálculos ---")
 
+    # 0. Preencher o prompt com as bases disponíveis e o período de apuração
+    full_prompt = _fill_prompt(processed_dfs, llm_prompt, periodo)
+
+    # Resultado em cache para os mesmos dados + prompt + modelo
+    model_name = _model_name(llm)
+    cache_key = agent_cache.agent_cache_key(processed_dfs, full_prompt, model_name)
+    if use_cache:
+        cached_df = agent_cache.load_cached_result(cache_key)
+        if cached_df is not None:
+            print("Resultado do agente recuperado do cache.")
+            span.set(origem="cache")
+            return cached_df
+
+    if compile_mode:
+        compiled_path = agent_compiler.find_compiled(processed_dfs)
+        if compiled_path is not None:
+            print(f"Executando script compilado '{compiled_path}' (sem LLM)...")
+            final_df = agent_compiler.run_compiled(compiled_path, processed_dfs, isolated=isolated)
+            if final_df is not None:
+                span.set(origem="compilado")
+                return final_df
+            print("AVISO: Script compilado falhou. Recorrendo ao agente.")
+        else:
+            print("Nenhum script compilado para este esquema. Executando o agente.")
+        # Cópia das bases antes do agente, para validar a compilação depois
+        input_snapshot = {name: df.copy() for name, df in processed_dfs.items()}
+
+    # O LangChain só é importado a partir daqui: acertos de cache e scripts
+    # compilados não precisam dele
+    from src.agent_llm import ProfilingCallbackHandler
+    if llm is None:
+        llm = _default_llm(cache_key, use_cache)
+    agent_executor, repl, executed_code = _build_agent(llm, processed_dfs, isolated=isolated)
+    try:
+        # 6. Invocar o agente com o prompt, os nomes e o resumo dos dataframes
+        # (tamanho limitado por config.AGENT_CONTEXT_MAX_TOKENS, qualquer que seja o número de linhas)
+        inputs, context_tokens = _agent_inputs(processed_dfs, full_prompt, use_cache)
+        span.set(contexto_tokens=context_tokens)
+        print(f"Invocando o agente (contexto das bases: {context_tokens} tokens)... Isso pode levar alguns minutos.")
+        profiler = ProfilingCallbackHandler()
+        response = agent_executor.invoke(inputs, config={"callbacks": [profiler]})
+        span.set(origem="agente", iteracoes=profiler.iteracao, reinicios_repl=getattr(repl, "reinicios", None), **profiler.totais)
+
+        print("--- Agente finalizou a execução ---")
+        final_df = _extract_final_df(response, repl)
+    finally:
+        _close_repl(repl)
+
+    if use_cache and isinstance(final_df, pd.DataFrame) and not final_df.empty:
+        agent_cache.store_result(cache_key, final_df)
+
+    if compile_mode and isinstance(final_df, pd.DataFrame) and not final_df.empty:
+        code = agent_compiler.compile_session(executed_code, input_snapshot, expected_df=final_df, isolated=isolated)
+        if code is not None:
+            path = agent_compiler.save_compiled(code, input_snapshot, model_name, llm_prompt)
+            print(f"Sessão do agente compilada em '{path}'.")
+
+    return final_df
+
+def run_calculations_sharded(processed_dfs: dict, llm_prompt: str, n_shards: int, shard_col: str = None, llm_factory=None, concurrency: int = None, requests_per_second: float = None, use_cache: bool = True, periodo: dict = None, isolated: bool = None) -> pd.DataFrame:
+    """
+    Executa o agente em shards independentes e simultâneos.
+
+    A base `funcionarios` é dividida por `shard_col` (ver
+    `agent_shards.partition_frames`); cada shard roda a sua própria sessão
+    do agente (`ainvoke`) com as suas bases, e os `final_df` são verificados
+    e combinados. Cada shard tem o seu cache de resultado, então uma nova
+    execução refaz só os shards que falharam.
+
+    Args:
+        processed_dfs: Dicionário com os dataframes processados.
+        llm_prompt: O prompt detalhado com as regras de negócio.
+        n_shards: Número de shards.
+        shard_col: Coluna de `funcionarios` usada para agrupar (padrão:
+            `config.AGENT_SHARD_COL`).
+        llm_factory: Função (bases do shard) -> modelo de chat (ex: um
+            modelo local nos testes). Se None, usa o modelo de
+            `config.AGENT_MODEL`.
+        concurrency: Sessões do agente ao mesmo tempo (padrão:
+            `config.AGENT_SHARD_CONCURRENCY`).
+        requests_per_second: Limite de chamadas ao LLM por segundo, somando
+            todos os shards (padrão: `config.AGENT_REQUESTS_POR_SEGUNDO`;
+            None = sem limite).
+        use_cache: Reaproveita o resultado de cada shard já calculado.
+        periodo: Período de apuração preenchido no prompt.
+        isolated: Um processo da ferramenta Python por shard (padrão:
+            `config.AGENT_REPL_ISOLADO`).
+
+    Returns:
+        O dataframe final com os resultados (vazio se algum shard falhar ou
+        se os resultados forem inconsistentes).
+    """
+    shard_col = shard_col or config.AGENT_SHARD_COL
+    concurrency = concurrency or config.AGENT_SHARD_CONCURRENCY
+    requests_per_second = config.AGENT_REQUESTS_POR_SEGUNDO if requests_per_second is None else requests_per_second
+    processed_dfs = select(processed_dfs, config.AGENT_SOURCES)
+    with instrumentation.stage("run_calculations_sharded", "agente", rows_in=instrumentation.rows(processed_dfs)) as span:
+        shards = agent_shards.partition_frames(processed_dfs, n_shards, shard_col)
+        tamanhos = [len(shard["funcionarios"]) for shard in shards]
+        print(f"--- Iniciando agente em {len(shards)} shards por '{shard_col}' (até {concurrency} simultâneos) ---")
+        print(f"Colaboradores por shard: {tamanhos}")
+        resultados = asyncio.run(_run_shards(shards, llm_prompt, llm_factory, concurrency, requests_per_second, use_cache, periodo, isolated))
+
+        falhas = [numero for numero, df in enumerate(resultados) if df is None]
+        span.set(shards=len(shards), falhas=len(falhas))
+        if falhas:
+            print(f"ERRO: {len(falhas)} de {len(shards)} shards falharam ({falhas}). Execute novamente para recalcular só esses shards.")
+            return pd.DataFrame()
+        final_df, erros = agent_shards.merge_shard_results(resultados)
+        for erro in erros:
+            print(f"ERRO: Resultados dos shards inconsistentes: {erro}")
+        span.set(rows_out=len(final_df))
+
+    print(f"--- Agente finalizou os {len(shards)} shards ({len(final_df)} linhas) ---")
+    return final_df
+
+async def _run_shards(shards, llm_prompt, llm_factory, concurrency, requests_per_second, use_cache, periodo, isolated):
+    """Roda os shards com no máximo `concurrency` sessões e o limite de chamadas compartilhado."""
+    limiter = None
+    if requests_per_second:
+        from langchain_core.rate_limiters import InMemoryRateLimiter
+        limiter = InMemoryRateLimiter(requests_per_second=requests_per_second, check_every_n_seconds=0.05)
+    semaforo = asyncio.Semaphore(concurrency)
+    tool_lock = threading.Lock()
+    return await asyncio.gather(*[
+        _run_shard(numero, shard_dfs, llm_prompt, llm_factory, limiter, semaforo, tool_lock, use_cache, periodo, isolated)
+        for numero, shard_dfs in enumerate(shards)
+    ])
+
+async def _run_shard(numero, shard_dfs, llm_prompt, llm_factory, limiter, semaforo, tool_lock, use_cache, periodo, isolated):
+    """Uma sessão do agente sobre as bases de um shard; retorna o `final_df` ou None."""
+    full_prompt = _fill_prompt(shard_dfs, llm_prompt, periodo)
+    llm = llm_factory(shard_dfs) if llm_factory is not None else None
+    cache_key = agent_cache.agent_cache_key(shard_dfs, full_prompt, _model_name(llm))
+    if use_cache:
+        cached_df = agent_cache.load_cached_result(cache_key)
+        if cached_df is not None:
+            print(f"Shard {numero}: resultado recuperado do cache.")
+            return cached_df
+
+    from src.agent_llm import ProfilingCallbackHandler
+    async with semaforo:
+        if llm is None:
+            llm = _default_llm(cache_key, use_cache, rate_limiter=limiter)
+        elif limiter is not None and getattr(llm, "rate_limiter", None) is None:
+            llm.rate_limiter = limiter
+        # A criação do worker (processo + envio das bases) não bloqueia os outros shards
+        agent_executor, repl, _ = await asyncio.to_thread(_build_agent, llm, shard_dfs, tool_lock, isolated)
+        inputs, context_tokens = _agent_inputs(shard_dfs, full_prompt, use_cache)
+        # Cada shard é uma linha própria no trace-event do perfil
+        profiler = ProfilingCallbackHandler(tid=numero + 1)
+        print(f"Shard {numero}: invocando o agente ({len(shard_dfs['funcionarios'])} colaboradores, contexto de {context_tokens} tokens)...")
+        inicio, t0 = time.time(), time.perf_counter()
+        try:
+            response = await agent_executor.ainvoke(inputs, config={"callbacks": [profiler]})
+            final_df = _extract_final_df(response, repl)
+            erros, avisos = agent_shards.check_shard_result(shard_dfs, final_df)
+        except Exception as e:
+            final_df, erros, avisos = None, [f"{type(e).__name__}: {e}"], []
+        finally:
+            await asyncio.to_thread(_close_repl, repl)
+        instrumentation.record(
+            f"shard:{numero}", inicio, time.perf_counter() - t0, "agente", tid=numero + 1,
+            rows_in=len(shard_dfs["funcionarios"]), rows_out=instrumentation.rows(final_df) if final_df is not None else None,
+            contexto_tokens=context_tokens, iteracoes=profiler.iteracao, erros=erros or None, **profiler.totais,
+        )
+
+    for aviso in avisos:
+        print(f"AVISO: Shard {numero}: {aviso}")
+    if erros:
+        for erro in erros:
+            print(f"ERRO: Shard {numero}: {erro}")
+        return None
+    print(f"Shard {numero}: concluído em {time.perf_counter() - t0:.1f}s ({len(final_df)} linhas).")
+    if use_cache:
+        agent_cache.store_result(cache_key, final_df)
+    return final_df
+
+def _fill_prompt(processed_dfs, llm_prompt, periodo=None):
+    """Preenche o prompt com os nomes das bases e o período de apuração."""
+    periodo = periodo or periodo_padrao()
+    return llm_prompt.format(
+        dataframe_names=", ".join(processed_dfs.keys()),
+        periodo_inicio=formatar_data(periodo["inicio"]),
+        periodo_fim=formatar_data(periodo["fim"]),
+        dia_limite=config.DIA_LIMITE_DESLIGAMENTO,
+    )
+
+def _model_name(llm):
+    """Nome do modelo usado na chave do cache do agente."""
+    return config.AGENT_MODEL if llm is None else getattr(llm, "model_name", None) or repr(llm)
+
+def _default_llm(cache_key, use_cache, rate_limiter=None):
+    """Modelo de `config.AGENT_MODEL`, com cache de completions e gravação da sessão."""
+    # Provedores importados só aqui: a importação custa alguns segundos
+    from dotenv import load_dotenv
+    from langchain_openai import ChatOpenAI
+    from src.agent_llm import DiskLLMCache
+    # from langchain_google_genai import ChatGoogleGenerativeAI
+
     # 1. Carregar variáveis de ambiente (GOOGLE_API_KEY)
     load_dotenv()
     if not os.getenv("GOOGLE_API_KEY"):
@@ -34,20 +261,68 @@ def run_calculations(processed_dfs: dict, llm_prompt: str) -> pd.DataFrame:
         raise ValueError("OPENAI_API_KEY não encontrada no arquivo .env")
 
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    # 2. Inicializar o LLM
+    # 2. Inicializar o LLM (com cache de completions em disco e gravação
+    # da sessão para replay)
+    llm_cache = DiskLLMCache(session_file=agent_cache.session_path(cache_key)) if use_cache else None
     # llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0)
-    llm = ChatOpenAI(temperature=0, api_key=OPENAI_API_KEY, model='gpt-4o-mini')
-    
-    # 3. Criar a ferramenta Python REPL com acesso aos dataframes
+    return ChatOpenAI(temperature=0, api_key=OPENAI_API_KEY, model=config.AGENT_MODEL, cache=llm_cache, rate_limiter=rate_limiter)
+
+def _build_agent(llm, processed_dfs, tool_lock=None, isolated=None):
+    """
+    Cria o agente ReAct com a ferramenta Python sobre uma cópia do
+    dicionário de bases.
+
+    Args:
+        tool_lock: Lock compartilhado pelas execuções da ferramenta no
+            processo principal (modo com shards). O `PythonAstREPLTool`
+            redireciona o `sys.stdout` do processo enquanto executa o código,
+            então duas execuções simultâneas em threads misturariam as saídas.
+        isolated: Executa o código em um `ReplWorker` (processo separado com
+            limites) em vez do `PythonAstREPLTool`. Padrão:
+            `config.AGENT_REPL_ISOLADO`.
+
+    Returns:
+        Tupla (AgentExecutor, ferramenta Python ou ReplWorker, lista do
+        código executado). Um ReplWorker deve ser encerrado com `_close_repl`.
+    """
+    from langchain_core.prompts import PromptTemplate
+    from langchain.agents import Tool, AgentExecutor, create_react_agent
+
+    isolated = config.AGENT_REPL_ISOLADO if isolated is None else isolated
+    # 3. Criar a ferramenta Python com acesso aos dataframes
     # O agente usará esta ferramenta para executar código Python e manipular os dataframes
-    tool_locals = processed_dfs.copy()
-    python_repl_tool = PythonAstREPLTool(locals=tool_locals)
+    if isolated:
+        # Processo separado e persistente: um código descontrolado (produto
+        # cartesiano, print gigante, laço infinito) não derruba a execução
+        repl = ReplWorker(processed_dfs)
+    else:
+        from langchain_experimental.tools import PythonAstREPLTool
+        tool_locals = dict(processed_dfs)
+        repl = PythonAstREPLTool(locals=tool_locals)
+
+    # Registra cada `Action Input` executado (usado pelo modo compile)
+    executed_code = []
+    def run_python(code):
+        executed_code.append(code)
+        if isolated:
+            # Saída já limitada a config.AGENT_TOOL_OUTPUT_MAX_CHARS no worker
+            return repl.run(code)
+        if tool_lock is None:
+            saida = repl.run(code)
+        else:
+            with tool_lock:
+                saida = repl.run(code)
+        # Impressões de bases inteiras não voltam por completo para o prompt
+        limite = config.AGENT_TOOL_OUTPUT_MAX_CHARS
+        if isinstance(saida, str) and len(saida) > limite:
+            saida = f"{saida[:limite]}\n... (saída truncada: {len(saida)} caracteres; use .head(), .shape ou .value_counts())"
+        return saida
 
     tools = [
         Tool(
             name="python_repl",
             description="Uma ferramenta para executar código Python. Use-a para manipular dataframes pandas, fazer cálculos e análises de dados. Os dataframes já estão carregados na variável 'tool_locals'. Você pode acessá-los diretamente pelos seus nomes (ex: ativos, ferias, etc.).",
-            func=python_repl_tool.run,
+            func=run_python,
         )
     ]
 
@@ -89,6 +364,10 @@ def run_calculations(processed_dfs: dict, llm_prompt: str) -> pd.DataFrame:
         Os seguintes dataframes estão disponíveis para você na ferramenta `python_repl`:
         - {dataframe_names}
 
+        **Resumo das Bases:**
+        Esquema, tipos, nulos e valores mais frequentes das colunas-chave. Use-o em vez de imprimir os dataframes inteiros.
+        {dataframe_context}
+
         **IMPORTANTE:** Ao final, sua resposta DEVE ser o dataframe final, e NADA MAIS. Salvar o dataframe final em um csv deve ser a última expressão avaliada no seu código para que seja retornado.
 
         Comece!
@@ -104,21 +383,42 @@ def run_calculations(processed_dfs: dict, llm_prompt: str) -> pd.DataFrame:
         tools=tools,
         verbose=False,
         handle_parsing_errors=True,
-        max_iterations=25
+        max_iterations=25,
+        # Sem streaming: o LangChain só consulta o cache do modelo (DiskLLMCache,
+        # que também grava a sessão para replay) em chamadas sem streaming
+        stream_runnable=False,
     )
+    return agent_executor, repl, executed_code
 
-    # 6. Invocar o agente com o prompt e os nomes dos dataframes
-    dataframe_names = ", ".join(processed_dfs.keys())
-    full_prompt = llm_prompt.format(dataframe_names=dataframe_names)
-
-    print("Invocando o agente... Isso pode levar alguns minutos.")
-    response = agent_executor.invoke({
+def _agent_inputs(processed_dfs, full_prompt, use_cache):
+    """Entradas do agente: prompt, nomes e resumo das bases (limitado em tokens)."""
+    dataframe_context, context_tokens = agent_context.build_context(processed_dfs, use_cache=use_cache)
+    inputs = {
         "input": full_prompt,
-        "dataframe_names": dataframe_names
-    })
-
-    print("--- Agente finalizou a execução ---")
-    
+        "dataframe_names": ", ".join(processed_dfs.keys()),
+        "dataframe_context": dataframe_context,
+    }
+    return inputs, context_tokens
+
+def _close_repl(repl):
+    """Encerra o processo da ferramenta Python, se ela rodar em um ReplWorker."""
+    if isinstance(repl, ReplWorker):
+        repl.close()
+
+def _repl_variable(repl, nome):
+    """Valor de uma variável da ferramenta Python (DataFrame vem do worker em Arrow)."""
+    if isinstance(repl, ReplWorker):
+        return repl.variable(nome)
+    return repl.locals.get(nome)
+
+def _repl_eval(repl, expressao):
+    """Avalia uma expressão no namespace da ferramenta Python (no worker, com os limites dele)."""
+    if isinstance(repl, ReplWorker):
+        return repl.evaluate(expressao)
+    return eval(expressao, {"pd": pd}, repl.locals)
+
+def _extract_final_df(response, repl):
+    """Recupera o DataFrame final da execução do agente (vazio em caso de erro)."""
     # O resultado final do agente deve ser o dataframe calculado
     # Tentamos extrair o resultado final da execução do agente.
     # A boa prática é o LLM retornar a variável que contém o DF final.
@@ -126,11 +426,11 @@ def run_calculations(processed_dfs: dict, llm_prompt: str) -> pd.DataFrame:
     if 'output' in response:
         # O agente pode retornar uma string que representa o dataframe.
         # Neste caso, uma abordagem mais robusta seria o agente salvar o df
-        # em uma variável e nós a recuperarmos do `tool_locals`.
+        # em uma variável e nós a recuperarmos da ferramenta Python.
         # Por simplicidade aqui, vamos assumir que o agente foi instruído
         # a deixar o resultado final em uma variável chamada 'final_df'.
-        if 'final_df' in python_repl_tool.locals:
-            final_df = python_repl_tool.locals['final_df']
+        final_df = _repl_variable(repl, 'final_df')
+        if final_df is not None:
             print("Dataframe final recuperado da variável 'final_df'.")
 
     if not isinstance(final_df, pd.DataFrame):
@@ -138,124 +438,12 @@ def run_calculations(processed_dfs: dict, llm_prompt: str) -> pd.DataFrame:
         print("Tentando avaliar a saída como uma expressão Python.")
         try:
             # Tenta avaliar a saída como se fosse código Python que retorna o df
-            final_df = eval(str(response['output']), {"pd": pd}, tool_locals)
+            final_df = _repl_eval(repl, str(response['output']))
         except Exception as e:
             print(f"Não foi possível converter a saída do agente em um DataFrame: {e}")
             print("Saída do agente:", response['output'])
             return pd.DataFrame() # Retorna DF vazio em caso de erro
-
+    if not isinstance(final_df, pd.DataFrame):
+        print("Saída do agente:", response['output'])
+        return pd.DataFrame()
     return final_df
-
-
-# --- CÓDIGO REFERÊNCIA ---
-# import numpy as np
-# import re
-# from src import config
-
-# # Funções harmonize_sindicato_name e get_uf_from_sindicato permanecem as mesmas...
-# def harmonize_sindicato_name(name):
-#     if not isinstance(name, str): return ""
-#     match = re.match(r'([A-Z\s]+)', name)
-#     if match: return re.sub(r'[^A-Z]', '', match.group(1))
-#     return re.sub(r'[^A-Z]', '', name.split('-')[0])
-
-# def get_uf_from_sindicato(name):
-#     if not isinstance(name, str): return None
-#     match = re.search(r'\b([A-Z]{2})\b', name)
-#     if match: return match.group(1)
-#     return None
-
-# def calculate_working_days(df, dataframes):
-#     print("Iniciando cálculo de dias úteis...")
-#     dias_uteis_df = dataframes.get("dias_uteis")
-#     if dias_uteis_df is not None and not dias_uteis_df.empty:
-#         df['SINDICATO_KEY'] = df['SINDICATO'].apply(harmonize_sindicato_name)
-#         dias_uteis_df['SINDICATO_KEY'] = dias_uteis_df['SINDICATO'].apply(harmonize_sindicato_name)
-#         df = pd.merge(df, dias_uteis_df[['SINDICATO_KEY', 'DIAS_UTEIS']], on="SINDICATO_KEY", how="left")
-#         if 'DIAS_UTEIS' in df.columns:
-#             df.rename(columns={'DIAS_UTEIS': 'DIAS_UTEIS_MES'}, inplace=True)
-#             df.fillna({'DIAS_UTEIS_MES': 0}, inplace=True)
-#         else:
-#             df['DIAS_UTEIS_MES'] = 0
-#     else:
-#         df['DIAS_UTEIS_MES'] = 0
-#     ferias_df = dataframes.get("ferias")
-#     if ferias_df is not None and not ferias_df.empty:
-#         ferias_df[config.MATRICULA_COL] = ferias_df[config.MATRICULA_COL].astype(str)
-#         df[config.MATRICULA_COL] = df[config.MATRICULA_COL].astype(str)
-#         ferias_agg = ferias_df.groupby(config.MATRICULA_COL)['DIAS_DE_F_RIAS'].sum().reset_index()
-#         df = pd.merge(df, ferias_agg, on=config.MATRICULA_COL, how="left")
-#         df.fillna({'DIAS_DE_F_RIAS': 0}, inplace=True)
-#         df['DIAS_A_PAGAR'] = df['DIAS_UTEIS_MES'] - df['DIAS_DE_F_RIAS']
-#         df['DIAS_A_PAGAR'] = df['DIAS_A_PAGAR'].apply(lambda x: max(x, 0))
-#     else:
-#         df['DIAS_A_PAGAR'] = df['DIAS_UTEIS_MES']
-#     print("Cálculo de dias úteis concluído.")
-#     return df
-
-# def apply_proportional_rules(df):
-#     print("Aplicando regras de pagamento proporcional...")
-#     pay_period_start = pd.to_datetime('2025-04-16')
-#     pay_period_end = pd.to_datetime('2025-05-15')
-
-#     # Admissões
-#     if 'ADMISSO' in df.columns:
-#         df['ADMISSO'] = pd.to_datetime(df['ADMISSO'], errors='coerce')
-#         admitidos_mask = (df['ADMISSO'].notna()) & (df['ADMISSO'] >= pay_period_start)
-#         if admitidos_mask.any():
-#             start_dates = np.array(df.loc[admitidos_mask, 'ADMISSO'], dtype='datetime64[D]')
-#             end_date = np.datetime64(pay_period_end.date(), 'D')
-#             df.loc[admitidos_mask, 'DIAS_A_PAGAR'] = np.busday_count(start_dates, end_date + np.timedelta64(1, 'D'))
-
-#     # Desligamentos
-#     if 'DATA_DEMISS_O' in df.columns:
-#         desligados_mask = (df['DATA_DEMISS_O'].notna()) & (df['DATA_DEMISS_O'].dt.day > config.DIA_LIMITE_DESLIGAMENTO)
-#         if desligados_mask.any():
-#             start_date = np.datetime64(pay_period_start.date(), 'D')
-#             end_dates = np.array(df.loc[desligados_mask, 'DATA_DEMISS_O'], dtype='datetime64[D]')
-#             df.loc[desligados_mask, 'DIAS_A_PAGAR'] = np.busday_count(start_date, end_dates)
-
-#     df['DIAS_A_PAGAR'] = df['DIAS_A_PAGAR'].apply(lambda x: max(x, 0))
-#     print("Regras de proporcionalidade aplicadas.")
-#     return df
-
-# def apply_termination_rule(df, dataframes):
-#     print("Aplicando regra de desligamento...")
-#     desligados_df = dataframes.get("desligados")
-#     if desligados_df is None or desligados_df.empty: return df
-#     desligados_df[config.MATRICULA_COL] = desligados_df[config.MATRICULA_COL].astype(str)
-#     df[config.MATRICULA_COL] = df[config.MATRICULA_COL].astype(str)
-#     desligados_df['DATA_DEMISS_O'] = pd.to_datetime(desligados_df['DATA_DEMISS_O'], errors='coerce')
-#     df = pd.merge(df, desligados_df[[config.MATRICULA_COL, 'DATA_DEMISS_O', 'COMUNICADO_DE_DESLIGAMENTO']], on=config.MATRICULA_COL, how="left")
-#     condicao_nao_pagar = (df['COMUNICADO_DE_DESLIGAMENTO'].str.upper() == 'OK') & (df['DATA_DEMISS_O'].dt.day <= config.DIA_LIMITE_DESLIGAMENTO)
-#     df.loc[condicao_nao_pagar, 'DIAS_A_PAGAR'] = 0
-#     print(f"{condicao_nao_pagar.sum()} colaboradores tiveram o benefício zerado.")
-#     return df
-
-# def calculate_vr_value(df, dataframes):
-#     print("Iniciando cálculo do valor do VR...")
-#     sindicatos_df = dataframes.get("sindicatos")
-#     if sindicatos_df is None or sindicatos_df.empty:
-#         print("ERRO: Planilha de sindicatos não encontrada.")
-#         df['VALOR_VR_DIARIO'] = 0
-#     else:
-#         df['UF'] = df['SINDICATO'].apply(get_uf_from_sindicato)
-#         # Renomeia a coluna de estado na base de sindicatos para 'UF' para o merge
-#         if 'ESTADO' in sindicatos_df.columns:
-#             sindicatos_df.rename(columns={'ESTADO': 'UF'}, inplace=True)
-#         df = pd.merge(df, sindicatos_df[['UF', 'VALOR']], on='UF', how='left')
-#         df.rename(columns={'VALOR': 'VALOR_VR_DIARIO'}, inplace=True)
-#         df.fillna({'VALOR_VR_DIARIO': 0}, inplace=True)
-#         print("Valor do VR calculado com base na UF do sindicato.")
-#     df['VALOR_TOTAL_VR'] = df['DIAS_A_PAGAR'] * df['VALOR_VR_DIARIO']
-#     df['CUSTO_EMPRESA'] = df['VALOR_TOTAL_VR'] * config.PERCENTUAL_CUSTO_EMPRESA
-#     df['CUSTO_COLABORADOR'] = df['VALOR_TOTAL_VR'] * config.PERCENTUAL_CUSTO_COLABORADOR
-#     print("Cálculo do valor do VR concluído.")
-#     return df
-
-# def run_calculations_python(df, dataframes):
-#     df = calculate_working_days(df, dataframes)
-#     df = apply_termination_rule(df, dataframes)
-#     df = apply_proportional_rules(df)
-#     df = calculate_vr_value(df, dataframes)
-#     return df
\ No newline at end of file
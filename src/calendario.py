@@ -0,0 +1,187 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import os
+import datetime
+import numpy as np
+import pandas as pd
+from src import config
+from src.periodo import periodo_do_titulo
+from src.sindicato_index import normalize_text, harmonize_sindicato_name, get_uf_from_sindicato
+
+# Chave usada para colaboradores sem sindicato conhecido (apenas feriados nacionais)
+CHAVE_NACIONAL = "__NACIONAL__"
+
+# Feriados já lidos, por (caminho, mtime)
+_FERIADOS_CACHE = {}
+
+# ------------------------------------------------------------
+def easter(year):
+    """Data do domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+def _expand_date(regra, years):
+    """
+    Converte a coluna DATA do arquivo de feriados em datas concretas:
+    "AAAA-MM-DD" (data única), "MM-DD" (todo ano) ou "PASCOA+N"/"PASCOA-N"
+    (relativa ao domingo de Páscoa de cada ano).
+    """
+    regra = str(regra).strip().upper()
+    if regra.startswith("PASCOA"):
+        offset = int(regra[len("PASCOA"):] or 0)
+        return [easter(y) + datetime.timedelta(days=offset) for y in years]
+    if len(regra) == 5:
+        month, day = map(int, regra.split("-"))
+        return [datetime.date(y, month, day) for y in years]
+    return [datetime.date.fromisoformat(regra)]
+
+def load_holidays(path=None):
+    """
+    Lê o arquivo local de feriados (CSV com DATA, DESCRICAO, ESCOPO, UF,
+    MUNICIPIO e SINDICATO). O resultado fica em memória enquanto o arquivo
+    não mudar.
+    """
+    path = path or config.FERIADOS_FILE
+    if not os.path.exists(path):
+        print(f"AVISO: Arquivo de feriados não encontrado em '{path}'. Considerando apenas fins de semana.")
+        return pd.DataFrame(columns=["DATA", "DESCRICAO", "ESCOPO", "UF", "MUNICIPIO", "SINDICATO"])
+
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    if key not in _FERIADOS_CACHE:
+        df = pd.read_csv(path, dtype=str).fillna("")
+        for col in ("ESCOPO", "UF", "MUNICIPIO", "SINDICATO"):
+            df[col] = df[col].map(lambda v: normalize_text(v) or "")
+        _FERIADOS_CACHE[key] = df
+    return _FERIADOS_CACHE[key]
+
+def holidays_for(feriados, years, uf=None, municipio=None, sindicato_key=None):
+    """Datas de feriado aplicáveis a um local/sindicato nos anos informados."""
+    aplicaveis = feriados["ESCOPO"] == "NACIONAL"
+    if uf:
+        aplicaveis |= (feriados["ESCOPO"] == "ESTADUAL") & (feriados["UF"] == uf)
+    if uf and municipio:
+        aplicaveis |= (feriados["ESCOPO"] == "MUNICIPAL") & (feriados["UF"] == uf) & (feriados["MUNICIPIO"] == municipio)
+    if sindicato_key:
+        aplicaveis |= (feriados["ESCOPO"] == "SINDICATO") & (feriados["SINDICATO"] == sindicato_key)
+    datas = set()
+    for regra in feriados.loc[aplicaveis, "DATA"]:
+        datas.update(_expand_date(regra, years))
+    return sorted(datas)
+
+class BusinessCalendar:
+    """
+    Calendário de dias úteis pré-computado para um intervalo de datas.
+
+    Para cada chave (sindicato canônico) guarda o acumulado de dias úteis
+    desde `origem`, de modo que a contagem entre duas datas é uma subtração
+    de duas posições de array, vetorizada para todos os colaboradores.
+    """
+
+    def __init__(self, inicio, fim, locais=None, feriados=None):
+        """
+        Args:
+            inicio, fim: Intervalo coberto (inclusive).
+            locais: Dicionário chave -> UF dos sindicatos a pré-computar.
+            feriados: DataFrame de `load_holidays` (padrão: arquivo de config).
+        """
+        feriados = load_holidays() if feriados is None else feriados
+        self.origem = np.datetime64(pd.Timestamp(inicio).date(), "D")
+        fim = np.datetime64(pd.Timestamp(fim).date(), "D")
+        dias = np.arange(self.origem, fim + np.timedelta64(1, "D"))
+        years = range(pd.Timestamp(inicio).year, pd.Timestamp(fim).year + 1)
+
+        locais = dict(locais or {})
+        self.chaves = [CHAVE_NACIONAL] + [k for k in locais if k != CHAVE_NACIONAL]
+        self._posicao = {chave: i for i, chave in enumerate(self.chaves)}
+
+        self.acumulado = np.zeros((len(self.chaves), len(dias) + 1), dtype=np.int32)
+        for i, chave in enumerate(self.chaves):
+            uf = locais.get(chave)
+            municipio = config.SINDICATO_MUNICIPIO.get(chave)
+            datas = holidays_for(feriados, years, uf, municipio, chave if chave != CHAVE_NACIONAL else None)
+            uteis = np.is_busday(dias, holidays=np.array(datas, dtype="datetime64[D]"))
+            self.acumulado[i, 1:] = np.cumsum(uteis)
+
+    def _indices(self, datas):
+        """Posição de cada data no acumulado (limitada ao intervalo coberto)."""
+        datas = np.asarray(pd.to_datetime(datas, errors="coerce").to_numpy(dtype="datetime64[D]"))
+        idx = (datas - self.origem).astype("int64")
+        return np.clip(idx, 0, self.acumulado.shape[1] - 1)
+
+    def key_positions(self, chaves):
+        """Linha do calendário para cada chave (desconhecidas -> nacional)."""
+        chaves = pd.Series(chaves)
+        if isinstance(chaves.dtype, pd.CategoricalDtype):
+            # Resolve só as categorias e expande pelos códigos
+            codes = chaves.cat.codes.to_numpy()
+            por_categoria = np.array([self._posicao.get(c, 0) for c in chaves.cat.categories] + [0], dtype="int64")
+            return por_categoria[np.where(codes >= 0, codes, len(por_categoria) - 1)]
+        return chaves.astype("object").map(self._posicao).fillna(0).to_numpy(dtype="int64")
+
+    def count(self, chaves, inicio, fim_exclusivo):
+        """
+        Dias úteis em [inicio, fim_exclusivo) para cada colaborador.
+        `inicio`/`fim_exclusivo` podem ser escalares ou arrays de datas.
+        """
+        linhas = self.key_positions(chaves)
+        n = len(linhas)
+        inicio = np.broadcast_to(self._indices(np.atleast_1d(inicio)), (n,)) if n else np.array([], dtype="int64")
+        fim = np.broadcast_to(self._indices(np.atleast_1d(fim_exclusivo)), (n,)) if n else np.array([], dtype="int64")
+        return np.maximum(self.acumulado[linhas, fim] - self.acumulado[linhas, inicio], 0)
+
+def sindicato_locais(nomes_sindicato):
+    """Chave canônica -> UF para cada nome de sindicato distinto."""
+    locais = {}
+    for nome in pd.unique(pd.Series(list(nomes_sindicato), dtype="object").dropna()):
+        chave = harmonize_sindicato_name(nome)
+        if chave and chave not in locais:
+            locais[chave] = get_uf_from_sindicato(nome)
+    return locais
+
+def build_business_calendar(periodo, locais=None):
+    """Calendário cobrindo o período de apuração (com o dia seguinte ao fim)."""
+    fim = pd.Timestamp(periodo["fim"]) + pd.Timedelta(days=1)
+    return BusinessCalendar(periodo["inicio"], fim, locais)
+
+def use_dias_uteis_sheet(dias_uteis_df, periodo):
+    """
+    Indica se os dias úteis do mês vêm da planilha "Base dias uteis": com
+    `config.DIAS_UTEIS_FONTE = "planilha"`, planilha presente e, quando o
+    título traz o período (`attrs["titulo"]`, ver `periodo.periodo_do_titulo`),
+    do mesmo mês e ano de fim que `periodo` (sem o ano no título, vale o de
+    `periodo`). Planilha de outro mês gera um aviso.
+    """
+    if config.DIAS_UTEIS_FONTE == "calendario" or dias_uteis_df is None or dias_uteis_df.empty:
+        return False
+    fim = pd.Timestamp(periodo["fim"])
+    titulo = periodo_do_titulo(dias_uteis_df.attrs.get("titulo"), fim.year)
+    if titulo and (titulo[1].year, titulo[1].month) != (fim.year, fim.month):
+        print(f"AVISO: A planilha de dias úteis é de {titulo[0]:%d/%m/%Y} a {titulo[1]:%d/%m/%Y}, "
+              f"fora do período até {fim:%d/%m/%Y}. Usando o calendário de feriados.")
+        return False
+    return True
+
+def generate_dias_uteis(periodo, nomes_sindicato, calendario=None):
+    """
+    Gera a tabela de dias úteis por sindicato (mesmo layout da planilha
+    "Base dias uteis": SINDICATO, DIAS_UTEIS) para qualquer período.
+    """
+    nomes = pd.Series(pd.unique(pd.Series(list(nomes_sindicato), dtype="object").dropna()), dtype="object")
+    chaves = nomes.map(harmonize_sindicato_name)
+    if calendario is None:
+        calendario = build_business_calendar(periodo, sindicato_locais(nomes))
+    fim_exclusivo = np.datetime64(periodo["fim"], "D") + np.timedelta64(1, "D")
+    dias = calendario.count(chaves, np.datetime64(periodo["inicio"], "D"), fim_exclusivo)
+    return pd.DataFrame({"SINDICATO": nomes.to_numpy(), "DIAS_UTEIS": dias.astype("int64")})
@@ -16,10 +16,177 @@ FILE_PATHS = {
     "template_vr": f"{INPUT_DIR}/VR MENSAL 05.2025.xlsx",
 }
 
+# Padrões (glob) para localizar cada planilha no diretório de uma competência
+# (modo batch), já que os nomes variam com o mês (ex: "ADMISSÃO MAIO.xlsx")
+FILE_PATTERNS = {
+    "admissoes": "ADMISS*.xlsx",
+    "afastamentos": "AFASTAMENTOS*.xlsx",
+    "aprendizes": "APRENDIZ*.xlsx",
+    "ativos": "ATIVOS*.xlsx",
+    "dias_uteis": "Base dias uteis*.xlsx",
+    "sindicatos": "Base sindicato*.xlsx",
+    "desligados": "DESLIGADOS*.xlsx",
+    "estagiarios": "EST*GIO*.xlsx",
+    "exterior": "EXTERIOR*.xlsx",
+    "ferias": "F*RIAS*.xlsx",
+    "template_vr": "VR MENSAL*.xlsx",
+}
+# Bases de referência carregadas uma única vez no modo batch (um diretório
+# de competência pode sobrescrevê-las com a sua própria planilha). Os dias
+# úteis são de cada mês: sem planilha própria, vêm do calendário de feriados
+SHARED_SOURCES = ["sindicatos"]
+
+# Diretório do cache dos DataFrames já lidos e limpos
+CACHE_DIR = "data/cache"
+
+# Número de processos para leitura paralela das planilhas (1 = sequencial)
+LOAD_WORKERS = 1
+
+# Leitura em streaming (openpyxl read_only): linhas por bloco e colunas
+# projetadas por base. Bases ausentes deste mapa são lidas por completo.
+STREAMING_CHUNK_SIZE = 50_000
+COLUNAS_UTILIZADAS = {
+    "ativos": ["MATRICULA", "TITULO_DO_CARGO", "CARGO", "DESC_SITUACAO", "SINDICATO"],
+    "admissoes": ["MATRICULA", "ADMISSAO", "ADMISS_O", "CARGO", "TITULO_DO_CARGO"],
+    "ferias": ["MATRICULA", "DESC_SITUACAO", "DIAS_DE_FERIAS", "DIAS_DE_F_RIAS", "DATA_INICIO", "DATA_IN_CIO", "IN_CIO_F_RIAS", "DATA_FIM", "FIM_F_RIAS", "DATA_RETORNO"],
+    "desligados": ["MATRICULA", "DATA_DEMISSAO", "DATA_DEMISS_O", "COMUNICADO_DE_DESLIGAMENTO"],
+    "afastamentos": ["MATRICULA", "DESC_SITUACAO", "DATA_INICIO", "DATA_IN_CIO", "DATA_FIM", "DATA_RETORNO"],
+    "estagiarios": ["MATRICULA", "TITULO_DO_CARGO"],
+    "aprendizes": ["MATRICULA", "TITULO_DO_CARGO"],
+    "exterior": ["MATRICULA"],
+}
+COLUNAS_TIPOS = {
+    "MATRICULA": "Int64",
+    "ADMISSAO": "datetime64[ns]",
+    "ADMISS_O": "datetime64[ns]",
+    "DATA_DEMISSAO": "datetime64[ns]",
+    "DATA_DEMISS_O": "datetime64[ns]",
+    "DATA_INICIO": "datetime64[ns]",
+    "DATA_IN_CIO": "datetime64[ns]",
+    "IN_CIO_F_RIAS": "datetime64[ns]",
+    "DATA_FIM": "datetime64[ns]",
+    "FIM_F_RIAS": "datetime64[ns]",
+    "DATA_RETORNO": "datetime64[ns]",
+    "DIAS_DE_FERIAS": "Int64",
+    "DIAS_DE_F_RIAS": "Int64",
+    "DIAS_UTEIS": "Int64",
+    "VALOR": "float64",
+}
+
+# Colunas de texto com poucos valores distintos, armazenadas como category
+COLUNAS_CATEGORICAS = ["SINDICATO", "CARGO", "TITULO_DO_CARGO", "UF", "DESC_SITUACAO"]
+
+# Regras de exclusão, uma por bit da máscara em EXCLUSAO_COL (na ordem abaixo).
+# "base": exclui matrículas presentes na base indicada.
+# "periodo_integral": com "base", se a base tiver datas de início/fim
+# (INICIO_INTERVALO_COLS/FIM_INTERVALO_COLS), só exclui quem fica afastado o
+# período inteiro; afastamentos parciais são descontados em dias úteis.
+# "colunas": exclui quando a coluna é igual a "valores" ou contém "contem".
+EXCLUSAO_COL = "MOTIVO_EXCLUSAO"
+REGRAS_EXCLUSAO = [
+    {"motivo": "ESTAGIARIO", "base": "estagiarios"},
+    {"motivo": "APRENDIZ", "base": "aprendizes"},
+    {"motivo": "AFASTAMENTO", "base": "afastamentos", "periodo_integral": True},
+    {"motivo": "EXTERIOR", "base": "exterior"},
+    {"motivo": "DIRETOR", "colunas": ["TITULO_DO_CARGO", "CARGO"], "contem": ["DIRETOR"]},
+]
+
+# Colunas de início/fim (inclusive) dos registros de férias e afastamentos.
+# DATA_RETORNO é o primeiro dia de volta ao trabalho (fim exclusivo).
+INICIO_INTERVALO_COLS = ("DATA_INICIO", "DATA_IN_CIO", "IN_CIO_F_RIAS")
+FIM_INTERVALO_COLS = ("DATA_FIM", "FIM_F_RIAS")
+RETORNO_INTERVALO_COLS = ("DATA_RETORNO",)
+
+# Agente LLM: modelo e diretório do cache de resultados/completions/sessões
+AGENT_MODEL = "gpt-4o-mini"
+AGENT_CACHE_DIR = f"{CACHE_DIR}/agent"
+# Bases processadas entregues ao agente (as demais, como o template do VR
+# MENSAL, não são lidas nem enviadas à ferramenta Python)
+AGENT_SOURCES = ["funcionarios", "excluidos", "dias_uteis", "sindicatos", "ferias", "afastamentos", "desligados"]
+# Contexto das bases no prompt do agente (ver src/agent_context.py): limite
+# rígido de tokens, colunas com amostra de valores e limites de tamanho
+AGENT_CONTEXT_MAX_TOKENS = 2000
+AGENT_CONTEXT_COLUNAS_CHAVE = ["SINDICATO", "CARGO", "TITULO_DO_CARGO", "DESC_SITUACAO", "COMUNICADO_DE_DESLIGAMENTO", "ESTADO"]
+AGENT_CONTEXT_AMOSTRAS = 8
+AGENT_CONTEXT_MAX_CHARS_VALOR = 60
+# Estimativa usada quando o tiktoken não está disponível
+AGENT_CONTEXT_CHARS_POR_TOKEN = 4
+# Saída máxima (caracteres) de cada execução da ferramenta Python devolvida ao agente
+AGENT_TOOL_OUTPUT_MAX_CHARS = 4000
+# Agente em shards (--shards): coluna de `funcionarios` usada para agrupar
+# os colaboradores, sessões do agente ao mesmo tempo e limite de chamadas ao
+# LLM por segundo somando todos os shards (None = sem limite)
+AGENT_SHARD_COL = "SINDICATO"
+AGENT_SHARD_CONCURRENCY = 4
+AGENT_REQUESTS_POR_SEGUNDO = None
+# Ferramenta Python do agente em um processo separado (src/repl_worker.py):
+# tempo de CPU e tempo total (s) por execução e limite de memória do
+# processo (MB). Com AGENT_REPL_ISOLADO = False, o código roda no processo
+# principal (PythonAstREPLTool), sem limites.
+AGENT_REPL_ISOLADO = True
+AGENT_REPL_CPU_S = 60
+AGENT_REPL_TIMEOUT_S = 120
+AGENT_REPL_MEMORIA_MB = 4096
+# Scripts gerados pelo modo compile (versionados por esquema das bases)
+COMPILED_DIR = "data/compiled"
+
 # Caminho para o arquivo de saída
 OUTPUT_DIR = "data/output"
 OUTPUT_FILE = f"{OUTPUT_DIR}/VR_compra_calculado.xlsx"
 
+# Dados sintéticos e resultados do benchmark de escala (ver src/benchmark.py)
+SYNTHETIC_DIR = "data/synthetic"
+BENCHMARK_DIR = "data/benchmarks"
+BENCHMARK_SIZES = [10_000, 100_000, 1_000_000]
+
+# Perfis de execução (--profile): JSON com as etapas, trace-event e cProfile
+PROFILE_DIR = "data/profiles"
+
+# Recálculo incremental: estado de cada competência (entradas normalizadas,
+# hashes por matrícula e resultado) e log das alterações entre execuções
+RUNS_DIR = f"{CACHE_DIR}/runs"
+CHANGELOG_FILE = f"{OUTPUT_DIR}/VR_alteracoes.csv"
+
+# Conciliação (python main.py reconcile / run --reconcile): discrepâncias
+# por colaborador contra a compra anterior ou outro motor. Uma diferença é
+# divergência quando passa da tolerância absoluta da coluna e da fração
+# RECONCILIACAO_TOLERANCIA_RELATIVA do valor de referência.
+RECONCILIACAO_FILE = f"{OUTPUT_DIR}/VR_conciliacao.csv"
+RECONCILIACAO_TOLERANCIAS = {
+    "DIAS_A_PAGAR": 0,
+    "VALOR_VR_DIARIO": 0.01,
+    "VALOR_TOTAL_VR": 0.01,
+    "CUSTO_EMPRESA": 0.01,
+    "CUSTO_COLABORADOR": 0.01,
+}
+RECONCILIACAO_TOLERANCIA_RELATIVA = 0.0
+
+# Saídas intermediárias dos subcomandos da CLI (process -> calculate -> report)
+STAGES_DIR = f"{CACHE_DIR}/stages"
+
+# Tempo máximo (s) de inicialização a frio de `main.py --help`, verificado
+# por `python -m src.benchmark --imports`
+IMPORT_TIME_LIMITE_S = 0.5
+
+# Motor SQL (--engine sql, DuckDB embutido): threads (None = todos os
+# núcleos), limite de memória antes de usar o disco (None = padrão do DuckDB,
+# ex: "4GB") e diretório do spill/das bases exportadas em Parquet
+SQL_THREADS = None
+SQL_MEMORY_LIMIT = None
+SQL_TEMP_DIR = f"{CACHE_DIR}/duckdb"
+SQL_PARQUET_DIR = f"{CACHE_DIR}/parquet"
+
+# Serviço local (python main.py serve): endereço, porta e intervalo (s) da
+# verificação de arquivos alterados em data/input
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_POLL_S = 2.0
+
+# Formatos gravados pelo relatório final ("xlsx", "csv", "parquet") e
+# engine do .xlsx ("auto" usa xlsxwriter se instalado, senão openpyxl)
+OUTPUT_FORMATS = ["xlsx"]
+EXCEL_WRITER_ENGINE = "auto"
+
 # Colunas importantes (exemplo, pode precisar de ajuste)
 MATRICULA_COL = "MATRICULA"
 
@@ -28,3 +195,41 @@ PERCENTUAL_CUSTO_EMPRESA = 0.80
 PERCENTUAL_CUSTO_COLABORADOR = 0.20
 DIA_LIMITE_DESLIGAMENTO = 15
 
+
+# Período de apuração do benefício (competência)
+PERIODO_INICIO = "2025-04-16"
+PERIODO_FIM = "2025-05-15"
+COMPETENCIA = "2025-05-01"
+# Dia de corte: o período de uma competência vai do dia seguinte ao corte no
+# mês anterior até o dia de corte do mês (16/04 a 15/05 para 05/2025)
+DIA_CORTE_PERIODO = 15
+
+# Calendário de dias úteis: arquivo local de feriados (nacionais, estaduais,
+# municipais e de sindicato) e município-sede de cada sindicato (chave
+# canônica), usado para aplicar os feriados municipais
+FERIADOS_FILE = "data/calendario/feriados.csv"
+SINDICATO_MUNICIPIO = {
+    "SITEPDPR": "CURITIBA",
+    "SINDPDSP": "SAO PAULO",
+    "SINDPPDRS": "PORTO ALEGRE",
+    "SINDPDRJ": "RIO DE JANEIRO",
+}
+# Origem dos dias úteis do mês: "planilha" (Base dias uteis) ou "calendario"
+# (gerado pelo calendário de feriados; também usado se a planilha faltar)
+DIAS_UTEIS_FONTE = "planilha"
+# Índices de sindicatos mantidos em memória (um por par de tabelas de
+# referência, ex: dias úteis de cada competência); os mais antigos saem
+SINDICATO_INDEX_CACHE_MAX = 4
+
+# Mapeamento UF -> nome do estado (a base de sindicatos usa o nome por extenso)
+UF_ESTADOS = {
+    "AC": "ACRE", "AL": "ALAGOAS", "AP": "AMAPA", "AM": "AMAZONAS",
+    "BA": "BAHIA", "CE": "CEARA", "DF": "DISTRITO FEDERAL",
+    "ES": "ESPIRITO SANTO", "GO": "GOIAS", "MA": "MARANHAO",
+    "MT": "MATO GROSSO", "MS": "MATO GROSSO DO SUL", "MG": "MINAS GERAIS",
+    "PA": "PARA", "PB": "PARAIBA", "PR": "PARANA", "PE": "PERNAMBUCO",
+    "PI": "PIAUI", "RJ": "RIO DE JANEIRO", "RN": "RIO GRANDE DO NORTE",
+    "RS": "RIO GRANDE DO SUL", "RO": "RONDONIA", "RR": "RORAIMA",
+    "SC": "SANTA CATARINA", "SP": "SAO PAULO", "SE": "SERGIPE",
+    "TO": "TOCANTINS",
+}
@@ -0,0 +1,100 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import os
+import json
+import hashlib
+import pandas as pd
+from src import config
+
+# Incrementar sempre que a limpeza/renomeação em data_loader mudar,
+# para invalidar os DataFrames já armazenados.
+CACHE_VERSION = 2
+
+# ------------------------------------------------------------
+def file_hash(path, chunk_size=1 << 20):
+    """Calcula o SHA-256 do conteúdo de um arquivo, lendo em blocos."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cache_paths(name, path):
+    """Retorna os caminhos do DataFrame e dos metadados em cache para um arquivo."""
+    key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:12]
+    base = os.path.join(config.CACHE_DIR, f"{name}-{key}")
+    return f"{base}.pkl", f"{base}.json"
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_meta(meta_path, meta):
+    tmp_path = f"{meta_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+
+def load_cached(name, path):
+    """
+    Retorna o DataFrame em cache para `path` se o arquivo não mudou, ou None.
+
+    A verificação é feita primeiro por tamanho e mtime (sem ler o arquivo);
+    somente se algum deles mudou o conteúdo é re-hasheado, de modo que um
+    arquivo apenas "tocado" continua sendo servido pelo cache.
+    """
+    data_path, meta_path = _cache_paths(name, path)
+    meta = _read_meta(meta_path)
+    if meta is None or not os.path.exists(data_path):
+        return None
+    if meta.get("version") != CACHE_VERSION or meta.get("path") != os.path.abspath(path):
+        return None
+
+    stat = os.stat(path)
+    if meta.get("size") != stat.st_size:
+        return None
+    if meta.get("mtime_ns") != stat.st_mtime_ns:
+        if meta.get("sha256") != file_hash(path):
+            return None
+        meta["mtime_ns"] = stat.st_mtime_ns
+        _write_meta(meta_path, meta)
+
+    try:
+        return pd.read_pickle(data_path)
+    except Exception as e:
+        print(f"AVISO: Cache corrompido para '{path}', relendo o arquivo: {e}")
+        return None
+
+def store_cached(name, path, df):
+    """Armazena o DataFrame limpo de `path` junto com a impressão digital do arquivo."""
+    data_path, meta_path = _cache_paths(name, path)
+    try:
+        os.makedirs(config.CACHE_DIR, exist_ok=True)
+        stat = os.stat(path)
+        meta = {
+            "version": CACHE_VERSION,
+            "path": os.path.abspath(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_hash(path),
+        }
+        tmp_path = f"{data_path}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, data_path)
+        _write_meta(meta_path, meta)
+    except Exception as e:
+        print(f"AVISO: Não foi possível gravar o cache de '{path}': {e}")
+
+def clear_cache():
+    """Remove todos os arquivos do diretório de cache."""
+    if not os.path.isdir(config.CACHE_DIR):
+        return
+    for entry in os.listdir(config.CACHE_DIR):
+        if entry.endswith((".pkl", ".json", ".tmp")):
+            os.remove(os.path.join(config.CACHE_DIR, entry))
@@ -3,86 +3,283 @@
 # Created on: 2025-08-17
 # ------------------------------------------------------------
 # Libs:
+import os
 import re
+import time
+import hashlib
+import openpyxl
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from src import config
+from src import data_cache
+from src import instrumentation
+
+# Linha do cabeçalho de cada base (a planilha de dias úteis tem um título na linha 1)
+HEADER_ROWS = {"dias_uteis": 1}
+
+# Renomeações específicas aplicadas após a limpeza dos nomes
+SOURCE_RENAMES = {
+    "exterior": {"CADASTRO": config.MATRICULA_COL},
+    "dias_uteis": {"SINDICADO": "SINDICATO"},
+}
 
 # ------------------------------------------------------------
-def clean_column_names(df):
+def clean_column_name(col):
     """
-    Limpa e padroniza os nomes das colunas de um DataFrame:
+    Limpa e padroniza um nome de coluna:
     - Converte para string.
     - Remove espaços extras no início e no fim.
     - Substitui espaços e caracteres especiais por um underscore.
     - Converte para maiúsculas.
     """
-    new_columns = {}
-    for col in df.columns:
-        col_str = str(col)
-        # Remove espaços no início/fim
-        new_col = col_str.strip()
-        # Substitui espaços e caracteres não alfanuméricos por _
-        new_col = re.sub(r'\\s+', '_', new_col)
-        # Substitui Ã por A
-        new_col = new_col.replace("Ã", "A")
-        # Substitui caracteres não alfanuméricos por _
-        new_col = re.sub(r'[^a-zA-Z0-9_]', '_', new_col)
-        # Remove múltiplos underscores
-        new_col = re.sub(r'_+', '_', new_col)
-        # Converte para maiúsculas para padronização
-        new_col = new_col.upper()
-        new_columns[col] = new_col
+    col_str = str(col)
+    # Remove espaços no início/fim
+    new_col = col_str.strip()
+    # Substitui espaços e caracteres não alfanuméricos por _
+    new_col = re.sub(r'\\s+', '_', new_col)
+    # Substitui Ã por A
+    new_col = new_col.replace("Ã", "A")
+    # Substitui caracteres não alfanuméricos por _
+    new_col = re.sub(r'[^a-zA-Z0-9_]', '_', new_col)
+    # Remove múltiplos underscores
+    new_col = re.sub(r'_+', '_', new_col)
+    # Converte para maiúsculas para padronização
+    return new_col.upper()
+
+def clean_column_names(df):
+    """
+    Limpa e padroniza os nomes das colunas de um DataFrame (ver
+    `clean_column_name`).
+    """
+    new_columns = {col: clean_column_name(col) for col in df.columns}
     df.rename(columns=new_columns, inplace=True)
     return df
 
-def load_all_data():
+def read_file(name, path):
+    """
+    Lê um arquivo Excel de entrada, limpa os nomes das colunas e aplica as
+    renomeações específicas de cada base.
+    """
+    df = pd.read_excel(path, header=HEADER_ROWS.get(name, 0))
+    df = clean_column_names(df)
+
+    # Renomeações específicas pós-limpeza
+    renames = {old: new for old, new in SOURCE_RENAMES.get(name, {}).items() if old in df.columns}
+    if renames:
+        df.rename(columns=renames, inplace=True)
+    return df
+
+def apply_column_types(df):
+    """
+    Converte as colunas projetadas para tipos compactos conforme
+    `config.COLUNAS_TIPOS` (texto fica como "string").
+    """
+    for col in df.columns:
+        dtype = config.COLUNAS_TIPOS.get(col, "string")
+        if dtype == "datetime64[ns]":
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        elif dtype in ("Int64", "float64"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+def read_file_streaming(name, path, chunk_size=None, columns=None):
+    """
+    Lê um arquivo Excel linha a linha (openpyxl `read_only=True`), mantendo
+    apenas as colunas `columns` (padrão: as usadas pelo pipeline,
+    `config.COLUNAS_UTILIZADAS`).
+
+    As linhas são convertidas em DataFrames tipados a cada `chunk_size`
+    registros, de modo que apenas um bloco de objetos Python fica em memória
+    por vez. Bases sem projeção configurada usam a leitura completa.
+    """
+    columns = config.COLUNAS_UTILIZADAS.get(name) if columns is None else columns
+    if columns is None:
+        return read_file(name, path)
+    chunk_size = chunk_size or config.STREAMING_CHUNK_SIZE
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        # Assim como pd.read_excel, usa a primeira aba da planilha
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        for _ in range(HEADER_ROWS.get(name, 0)):
+            next(rows, None)
+        header = next(rows, None) or ()
+
+        renames = SOURCE_RENAMES.get(name, {})
+        selected = {}
+        for i, col in enumerate(header):
+            col_name = clean_column_name(f"Unnamed: {i}" if col is None else col)
+            col_name = renames.get(col_name, col_name)
+            if col_name in columns and col_name not in selected.values():
+                selected[i] = col_name
+        indexes = list(selected)
+        names = list(selected.values())
+
+        chunks = []
+        buffer = []
+        for row in rows:
+            values = tuple(row[i] if i < len(row) else None for i in indexes)
+            if all(v is None for v in values):
+                continue
+            buffer.append(values)
+            if len(buffer) >= chunk_size:
+                chunks.append(apply_column_types(pd.DataFrame.from_records(buffer, columns=names)))
+                buffer = []
+        if buffer or not chunks:
+            chunks.append(apply_column_types(pd.DataFrame.from_records(buffer, columns=names)))
+    finally:
+        workbook.close()
+
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+def _cache_name(name, streaming, columns=None):
+    # Leituras projetadas (streaming ou `columns`) têm outras colunas/tipos: cache separado
+    if columns is not None:
+        return f"{name}.cols-{hashlib.sha1(','.join(columns).encode('utf-8')).hexdigest()[:8]}"
+    return f"{name}.stream" if streaming else name
+
+def sheet_title(path):
+    """Texto da primeira linha (título) da primeira aba de uma planilha."""
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        titulo = next(workbook.worksheets[0].iter_rows(max_row=1, values_only=True), ())
+    finally:
+        workbook.close()
+    return " ".join(str(v) for v in titulo if v is not None)
+
+def _with_title(name, path, df):
+    """
+    Guarda em `df.attrs["titulo"]` o título das bases de HEADER_ROWS. O
+    título vai para o cache junto com a base, então um acerto de cache não
+    reabre a planilha.
+    """
+    if name in HEADER_ROWS and not df.empty:
+        df.attrs["titulo"] = sheet_title(path)
+    return df
+
+def _from_cache(name, path, streaming=False, columns=None):
+    """Base em cache para `path` (com o título em `attrs`, ver `_with_title`), ou None."""
+    return data_cache.load_cached(_cache_name(name, streaming, columns), path) if os.path.exists(path) else None
+
+def load_file(name, path, use_cache=True, streaming=False, columns=None):
+    """
+    Carrega uma única base (do cache ou do Excel) com o tratamento de erros
+    padrão: arquivo ausente ou inválido resulta em um DataFrame vazio.
+    Com `streaming`, usa `read_file_streaming` em vez de `pd.read_excel`;
+    com `columns`, lê em streaming apenas essas colunas.
+
+    Nas planilhas com título, ele fica em `df.attrs["titulo"]` (o período é
+    lido dele por `periodo.periodo_do_titulo`).
+
+    Retorna a tupla (nome, DataFrame, mensagem). A mensagem é devolvida em
+    vez de impressa para que o carregamento possa rodar em outro processo.
+    """
+    cache_name = _cache_name(name, streaming, columns)
+    try:
+        df = _from_cache(name, path, streaming, columns) if use_cache else None
+        if df is not None:
+            return name, df, f"Arquivo '{path}' carregado do cache."
+
+        if columns is not None:
+            df = read_file_streaming(name, path, columns=columns)
+        else:
+            df = read_file_streaming(name, path) if streaming else read_file(name, path)
+        df = _with_title(name, path, df)
+        if use_cache:
+            data_cache.store_cached(cache_name, path, df)
+        return name, df, f"Arquivo '{path}' carregado e limpo com sucesso."
+
+    except FileNotFoundError:
+        return name, pd.DataFrame(), f"AVISO: Arquivo não encontrado em '{path}'. Ignorando."
+    except Exception as e:
+        return name, pd.DataFrame(), f"ERRO: Falha ao carregar o arquivo '{path}': {e}"
+
+def _timed_load_file(name, path, use_cache=True, streaming=False):
+    """`load_file` com início, duração e PID, para instrumentar leituras em outro processo."""
+    inicio, t0 = time.time(), time.perf_counter()
+    result = load_file(name, path, use_cache, streaming)
+    return result, inicio, time.perf_counter() - t0, os.getpid()
+
+def load_all_data(use_cache=True, workers=None, streaming=False, file_paths=None):
     """
     Carrega todos os arquivos Excel, limpa os nomes das colunas e padroniza
     colunas importantes.
+
+    Com `use_cache`, arquivos não modificados desde a última execução são
+    servidos a partir do cache em `config.CACHE_DIR`.
+
+    Com `workers` > 1 (padrão: `config.LOAD_WORKERS`), os arquivos são lidos
+    em paralelo por um pool de processos, de modo que o tempo total acompanha
+    o maior arquivo e não a soma de todos.
+
+    Com `streaming`, as bases grandes são lidas em modo somente leitura,
+    projetando apenas as colunas usadas (ver `read_file_streaming`).
+
+    `file_paths` (nome -> caminho) substitui `config.FILE_PATHS`, por
+    exemplo para carregar as planilhas de outra competência.
     """
-    dataframes = {}
-    for name, path in config.FILE_PATHS.items():
-        try:
-            header_row = 0
-            if name == "dias_uteis":
-                header_row = 1
-            
-            df = pd.read_excel(path, header=header_row)
-            df = clean_column_names(df)
-            
-            # Renomeações específicas pós-limpeza
-            if name == "exterior" and "CADASTRO" in df.columns:
-                df.rename(columns={"CADASTRO": config.MATRICULA_COL}, inplace=True)
-            if name == "dias_uteis" and "SINDICADO" in df.columns:
-                df.rename(columns={"SINDICADO": "SINDICATO"}, inplace=True)
+    workers = config.LOAD_WORKERS if workers is None else workers
+    items = list((config.FILE_PATHS if file_paths is None else file_paths).items())
 
+    with instrumentation.stage("load_all_data", workers=workers, streaming=streaming) as load_span:
+        if not (workers and workers > 1 and len(items) > 1):
+            results = []
+            for name, path in items:
+                with instrumentation.stage(f"load_file:{name}", "io", arquivo=path) as span:
+                    result = load_file(name, path, use_cache, streaming)
+                    span.set(rows_out=len(result[1]), cache="cache" in result[2])
+                results.append(result)
+        else:
+            # Acertos de cache são resolvidos aqui mesmo; só o que precisa ser
+            # relido do Excel é enviado ao pool.
+            results = {}
+            pending = []
+            for name, path in items:
+                inicio, t0 = time.time(), time.perf_counter()
+                df = _from_cache(name, path, streaming) if use_cache else None
+                if df is not None:
+                    results[name] = (name, df, f"Arquivo '{path}' carregado do cache.")
+                    instrumentation.record(f"load_file:{name}", inicio, time.perf_counter() - t0, "io", arquivo=path, rows_out=len(df), cache=True)
+                else:
+                    pending.append((name, path))
+
+            if pending:
+                with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+                    for result, inicio, duracao, pid in executor.map(_timed_load_file, *zip(*pending), [use_cache] * len(pending), [streaming] * len(pending)):
+                        results[result[0]] = result
+                        # Cada processo do pool aparece como uma linha própria no trace
+                        instrumentation.record(f"load_file:{result[0]}", inicio, duracao, "io", tid=pid, rows_out=len(result[1]), cache=False)
+            results = [results[name] for name, _ in items]
+
+        # Mantém a ordem de config.FILE_PATHS independentemente da ordem de conclusão
+        dataframes = {}
+        for name, df, message in results:
+            print(message)
             dataframes[name] = df
-            print(f"Arquivo '{path}' carregado e limpo com sucesso.")
-
-        except FileNotFoundError:
-            print(f"AVISO: Arquivo não encontrado em '{path}'. Ignorando.")
-            dataframes[name] = pd.DataFrame()
-        except Exception as e:
-            print(f"ERRO: Falha ao carregar o arquivo '{path}': {e}")
-            dataframes[name] = pd.DataFrame()
-            
+        load_span.set(arquivos=len(dataframes), rows_out=instrumentation.rows(dataframes))
     return dataframes
 
-def serialize_data_to_markdown(dataframes):
-    """Lê os arquivos Excel e converte os DataFrames para tabelas Markdown."""
-    serialized_data = {}
-    print("Lendo e serializando arquivos de dados...")
-    # Para cada DataFrame, converte para Markdown:
+def describe_dataframes(dataframes):
+    """
+    Resumo de cada base carregada: linhas, colunas, memória (MB) e os tipos
+    das colunas. Usado pelo subcomando `load` da CLI.
+    """
+    linhas = []
     for name, df in dataframes.items():
-        if not df.empty:
-            serialized_data[name] = df.to_markdown(index=False)
-            print(f"  - DataFrame '{name}' serializado.")
-        else:
-            serialized_data[name] = "DATAFRAME VAZIO"
-    return serialized_data
+        linhas.append({
+            "base": name,
+            "linhas": len(df),
+            "colunas": len(df.columns),
+            "memoria_mb": round(df.memory_usage(deep=True).sum() / 2**20, 2),
+            "tipos": ", ".join(f"{col}:{dtype}" for col, dtype in df.dtypes.astype(str).items()),
+        })
+    return pd.DataFrame(linhas, columns=["base", "linhas", "colunas", "memoria_mb", "tipos"])
 
 if __name__ == '__main__':
     all_data = load_all_data()
+    print(describe_dataframes(all_data).drop(columns="tipos").to_string(index=False))
     for name, df in all_data.items():
         if not df.empty:
             print(f"\n--- DataFrame: {name} ---")
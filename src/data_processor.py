@@ -3,10 +3,56 @@
 # Created on: 2025-08-17
 # ------------------------------------------------------------
 # Libs:
+import numpy as np
 import pandas as pd
 from src import config
+from src import instrumentation
+from src.data_registry import DataRegistry, derive, project
+from src.periodo import periodo_padrao
+from src.intervalos import has_intervals, leave_intervals, full_period_matriculas
 
 # ------------------------------------------------------------
+def normalize_schema(df):
+    """
+    Converte as colunas conhecidas para tipos compactos e nativos, uma única
+    vez, para que merges, `isin` e agregações posteriores não operem sobre
+    strings Python:
+    - MATRICULA -> inteiro anulável (Int64).
+    - Colunas de data (config.COLUNAS_TIPOS) -> datetime64.
+    - SINDICATO, CARGO, UF... (config.COLUNAS_CATEGORICAS) -> category.
+    A função é idempotente: colunas já tipadas não são convertidas de novo.
+    """
+    if df is None or df.empty:
+        return df
+
+    if config.MATRICULA_COL in df.columns and df[config.MATRICULA_COL].dtype != "Int64":
+        matriculas = pd.to_numeric(df[config.MATRICULA_COL], errors="coerce")
+        df[config.MATRICULA_COL] = matriculas.round().astype("Int64")
+
+    for col, dtype in config.COLUNAS_TIPOS.items():
+        if dtype == "datetime64[ns]" and col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+
+    for col in config.COLUNAS_CATEGORICAS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+def normalize_dataframes(dataframes):
+    """
+    Aplica `normalize_schema` a todas as bases carregadas (exceto o
+    template) e retorna um novo dicionário; as bases de entrada não são
+    alteradas (cópias rasas, com copy-on-write). Um `DataRegistry` já
+    normaliza cada base ao lê-la e é devolvido como está, sem forçar a
+    leitura das bases.
+    """
+    if isinstance(dataframes, DataRegistry):
+        return dataframes
+    return {
+        name: df if name == "template_vr" or df is None else normalize_schema(df.copy(deep=False))
+        for name, df in dataframes.items()
+    }
+
 def consolidate_data(dataframes):
     """
     Consolida as bases de dados em um único DataFrame.
@@ -25,11 +71,10 @@ def consolidate_data(dataframes):
     admissoes_df = dataframes.get("admissoes", pd.DataFrame()).copy()
     if not admissoes_df.empty:
         # admissoes_df = admissoes_df.loc[:, ~admissoes_df.columns.str.startswith('Unnamed')]
-        # Garante que as colunas MATRICULA sejam do mesmo tipo para o concat
-        ativos_df[config.MATRICULA_COL] = ativos_df[config.MATRICULA_COL].astype(str)
-        admissoes_df[config.MATRICULA_COL] = admissoes_df[config.MATRICULA_COL].astype(str)
-        
+        # MATRICULA já é Int64 nas duas bases (normalize_schema)
         base_final = pd.concat([ativos_df, admissoes_df], ignore_index=True)
+        # O concat de categorias diferentes gera object: retipa o resultado
+        base_final = normalize_schema(base_final)
     else:
         base_final = ativos_df
     
@@ -39,55 +84,121 @@ def consolidate_data(dataframes):
     print(f"Base consolidada com {len(base_final)} registros únicos.")
     return base_final
 
-def apply_exclusions(df, dataframes):
+def _matricula_array(series):
+    """Matrículas como int64 (nulos viram -1) para joins por array ordenado."""
+    return pd.to_numeric(series, errors="coerce").astype("Int64").to_numpy(dtype="int64", na_value=-1)
+
+def _base_matriculas(df_excluir, rule, periodo):
+    """
+    Matrículas a excluir de uma base. Com "periodo_integral" e datas na base,
+    ficam só os registros sem datas e quem fica afastado o período inteiro.
+    """
+    if rule.get("periodo_integral") and has_intervals(df_excluir):
+        com_datas = leave_intervals(df_excluir, periodo)[3]
+        sem_datas = _matricula_array(df_excluir.loc[~com_datas, config.MATRICULA_COL])
+        return np.concatenate([sem_datas, full_period_matriculas(df_excluir, periodo)])
+    return _matricula_array(df_excluir[config.MATRICULA_COL])
+
+def _rule_mask(df, dataframes, rule, periodo=None):
+    """
+    Avalia uma regra de exclusão e retorna um array booleano por linha de `df`.
+    - Regras com "base": matrícula presente na base indicada (join por
+      `searchsorted` sobre as matrículas ordenadas da base). Com
+      "periodo_integral", afastamentos parciais no `periodo` não excluem.
+    - Regras com "colunas": valor da coluna igual a algum de "valores" ou
+      contendo algum termo de "contem" (avaliado uma vez por categoria).
+    """
+    mask = np.zeros(len(df), dtype=bool)
+    if "base" in rule:
+        # Sem "periodo_integral" basta a matrícula; com ele, a base inteira
+        # (as datas), que é a mesma usada depois pelo cálculo dos dias
+        if rule.get("periodo_integral"):
+            df_excluir = dataframes.get(rule["base"])
+        else:
+            df_excluir = project(dataframes, rule["base"], [config.MATRICULA_COL])
+        if df_excluir is None or df_excluir.empty:
+            return mask
+        if config.MATRICULA_COL not in df_excluir.columns:
+            print(f"AVISO: Coluna '{config.MATRICULA_COL}' não encontrada no arquivo '{rule['base']}'.")
+            return mask
+        excluir = np.unique(_base_matriculas(df_excluir, rule, periodo or periodo_padrao()))
+        excluir = excluir[excluir >= 0]
+        if len(excluir) == 0:
+            return mask
+        matriculas = _matricula_array(df[config.MATRICULA_COL])
+        pos = np.minimum(np.searchsorted(excluir, matriculas), len(excluir) - 1)
+        return (excluir[pos] == matriculas) & (matriculas >= 0)
+
+    valores = set(rule.get("valores", []))
+    termos = [t.upper() for t in rule.get("contem", [])]
+    for col in rule.get("colunas", []):
+        if col not in df.columns:
+            continue
+        serie = df[col] if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].astype("category")
+        categorias = serie.cat.categories.astype(str)
+        hit = categorias.isin(valores)
+        for termo in termos:
+            hit |= categorias.str.upper().str.contains(termo, regex=False)
+        codes = serie.cat.codes.to_numpy()
+        mask |= (codes >= 0) & np.append(np.asarray(hit, dtype=bool), False)[codes]
+    return mask
+
+def flag_exclusions(df, dataframes, rules=None, periodo=None):
+    """
+    Marca cada colaborador com uma máscara de bits (coluna
+    config.EXCLUSAO_COL), com um bit por regra de `config.REGRAS_EXCLUSAO`
+    na ordem em que aparecem. Zero significa elegível.
+    """
+    rules = config.REGRAS_EXCLUSAO if rules is None else rules
+    bitmask = np.zeros(len(df), dtype=np.uint32)
+    for bit, rule in enumerate(rules):
+        print(f"Verificando exclusões: {rule['motivo']}")
+        bitmask |= _rule_mask(df, dataframes, rule, periodo).astype(np.uint32) << np.uint32(bit)
+    df = df.copy()
+    df[config.EXCLUSAO_COL] = bitmask
+    return df
+
+def exclusion_reasons(bitmask, rules=None):
+    """Traduz a máscara de bits em texto (ex: "ESTAGIARIO|AFASTAMENTO")."""
+    rules = config.REGRAS_EXCLUSAO if rules is None else rules
+    bitmask = pd.Series(bitmask)
+    # Decodifica apenas as combinações distintas
+    distintos = {
+        valor: "|".join(r["motivo"] for bit, r in enumerate(rules) if int(valor) >> bit & 1)
+        for valor in bitmask.unique()
+    }
+    return bitmask.map(distintos)
+
+def exclusion_summary(flagged_df, rules=None):
+    """Resumo das exclusões: colaboradores marcados por motivo e no total."""
+    rules = config.REGRAS_EXCLUSAO if rules is None else rules
+    bitmask = flagged_df[config.EXCLUSAO_COL].to_numpy()
+    linhas = [
+        {"MOTIVO": r["motivo"], "BIT": bit, "COLABORADORES": int(((bitmask >> bit) & 1).sum())}
+        for bit, r in enumerate(rules)
+    ]
+    linhas.append({"MOTIVO": "TOTAL", "BIT": None, "COLABORADORES": int((bitmask != 0).sum())})
+    return pd.DataFrame(linhas)
+
+def apply_exclusions(df, dataframes, rules=None, periodo=None):
     """
     Aplica as regras de exclusão na base de dados consolidada.
-    Remove diretores, estagiários, aprendizes, afastados e pessoal do exterior.
+    Remove diretores, estagiários, aprendizes, afastados e pessoal do exterior
+    (regras configuráveis em `config.REGRAS_EXCLUSAO`).
     """
     if df.empty:
         return df
 
     print("Aplicando regras de exclusão...")
-    matriculas_a_excluir = set()
-    
-    # Lista de dataframes para verificar exclusões
-    dfs_to_exclude = ["estagiarios", "aprendizes", "afastamentos", "exterior", 'ativos']
-    
-    # Lista de funcoes para verificar exclusão:
-    funcoes_excluir = ["DIRETOR"] 
-    
-    for name in dfs_to_exclude:
-        print(f"Verificando exclusões no DataFrame: {name}")
-        df_excluir = dataframes.get(name)
-        if name == 'ativos':
-            # Verifica funções específicas para exclusão
-            # Corrigido: verifica se algum valor da lista está nas colunas
-            mask_cargo = df["TITULO_DO_CARGO"].isin(funcoes_excluir) if "TITULO_DO_CARGO" in df.columns else False
-            mask_titulo = df["CARGO"].isin(funcoes_excluir) if "CARGO" in df.columns else False
-            
-            if (mask_cargo.any() if isinstance(mask_cargo, pd.Series) else mask_cargo) or \
-               (mask_titulo.any() if isinstance(mask_titulo, pd.Series) else mask_titulo):
-                # Filtra apenas os registros que atendem aos critérios de exclusão
-                funcionarios_diretor = df[mask_cargo | mask_titulo] if isinstance(mask_cargo, pd.Series) and isinstance(mask_titulo, pd.Series) else df
-                valid_matriculas = funcionarios_diretor[config.MATRICULA_COL].dropna().astype(str).unique()
-                matriculas_a_excluir.update(valid_matriculas)
-        else:
-            if df_excluir is not None and not df_excluir.empty:
-                # Garante que a coluna de matrícula existe
-                if config.MATRICULA_COL in df_excluir.columns:
-                    # Limpa valores nulos e converte para string antes de adicionar ao set
-                    valid_matriculas = df_excluir[config.MATRICULA_COL].dropna().astype(str).unique()
-                    matriculas_a_excluir.update(valid_matriculas)
-                else:
-                    print(f"AVISO: Coluna '{config.MATRICULA_COL}' não encontrada no arquivo '{name}'.")
-
-    print(f"Encontradas {len(matriculas_a_excluir)} matrículas únicas para excluir.")
-    
-    # Garante que a coluna de matrícula no DF principal também seja string para comparação
-    df[config.MATRICULA_COL] = df[config.MATRICULA_COL].astype(str)
-    
-    df_filtrado = df[~df[config.MATRICULA_COL].isin(matriculas_a_excluir)]
-    
+    if config.EXCLUSAO_COL not in df.columns:
+        df = flag_exclusions(df, dataframes, rules, periodo)
+
+    resumo = exclusion_summary(df, rules)
+    for _, linha in resumo.iterrows():
+        print(f"  - {linha['MOTIVO']}: {linha['COLABORADORES']}")
+
+    df_filtrado = df[df[config.EXCLUSAO_COL].to_numpy() == 0].drop(columns=[config.EXCLUSAO_COL])
+
     print(f"Base após exclusões com {len(df_filtrado)} registros.")
     return df_filtrado
 
@@ -100,18 +211,36 @@ def clean_data(df):
     
     return df
 
-def process_data(dataframes):
+def process_data(dataframes, periodo=None):
     """
-    Orquestra o processo de consolidação, exclusão e limpeza.
+    Orquestra o processo de normalização, consolidação, exclusão e limpeza.
+    `periodo` (padrão: o configurado em `config`) delimita os afastamentos
+    que cobrem o período inteiro.
+
+    `dataframes` (dicionário ou `DataRegistry`) não é alterado: o retorno é
+    uma nova coleção do mesmo tipo, com "funcionarios" (e "excluidos") no
+    lugar de ativos/admissões.
     """
-    consolidated_df = consolidate_data(dataframes)
-    excluded_df = apply_exclusions(consolidated_df, dataframes)
+    with instrumentation.stage("normalize", rows_in=instrumentation.rows(dataframes)):
+        dataframes = normalize_dataframes(dataframes)
+    with instrumentation.stage("consolidate_data") as span:
+        consolidated_df = consolidate_data(dataframes)
+        span.set(rows_in=sum(len(dataframes.get(n, pd.DataFrame())) for n in ("ativos", "admissoes")), rows_out=len(consolidated_df))
+    with instrumentation.stage("flag_exclusions", rows_in=len(consolidated_df)):
+        flagged_df = flag_exclusions(consolidated_df, dataframes, periodo=periodo) if not consolidated_df.empty else consolidated_df
+    with instrumentation.stage("apply_exclusions", rows_in=len(flagged_df)) as span:
+        excluded_df = apply_exclusions(flagged_df, dataframes, periodo=periodo)
+        span.set(rows_out=len(excluded_df))
     cleaned_df = clean_data(excluded_df)
     
     # remove dataframes ativos + admissao and add the new one:
-    dataframes.pop("ativos", None)
-    dataframes.pop("admissoes", None)
-    dataframes["funcionarios"] = cleaned_df
+    novas = {"funcionarios": cleaned_df}
+
+    # Mantém quem foi excluído e por quê, para auditoria
+    if not flagged_df.empty:
+        excluidos = flagged_df.loc[flagged_df[config.EXCLUSAO_COL].to_numpy() != 0, [config.MATRICULA_COL, config.EXCLUSAO_COL]]
+        excluidos = excluidos.assign(MOTIVOS=exclusion_reasons(excluidos[config.EXCLUSAO_COL]).to_numpy())
+        novas["excluidos"] = excluidos.reset_index(drop=True)
 
     print("Processamento de dados concluído.")
-    return dataframes
\ No newline at end of file
+    return derive(dataframes, drop=("ativos", "admissoes"), **novas)
\ No newline at end of file
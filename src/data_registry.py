@@ -0,0 +1,171 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import threading
+from collections.abc import Mapping
+import pandas as pd
+from src import config
+from src import instrumentation
+from src.data_loader import load_file, load_all_data
+
+# As visões rasas devolvidas pelo registro dependem do copy-on-write do pandas
+# (padrão a partir do pandas 3); no pandas 2, ele é ativado aqui
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+# Bases que só são lidas quando algum consumidor as pede (nunca pré-carregadas)
+SOB_DEMANDA = ("template_vr",)
+
+# ------------------------------------------------------------
+class _Sources:
+    """
+    Leitura e memória das planilhas, compartilhadas por um registro e todos
+    os registros derivados dele.
+    """
+
+    def __init__(self, file_paths, use_cache, streaming):
+        self.paths = dict(file_paths)
+        self.use_cache = use_cache
+        self.streaming = streaming
+        self.frames = {}        # nome -> base completa
+        self.projections = {}   # (nome, colunas) -> base só com as colunas
+        self.lock = threading.RLock()
+
+    def _read(self, name, columns=None):
+        from src.data_processor import normalize_schema
+        path = self.paths[name]
+        with instrumentation.stage(f"load_file:{name}", "io", arquivo=path, colunas=len(columns) if columns else None) as span:
+            _, df, message = load_file(name, path, self.use_cache, self.streaming, columns)
+            if name not in SOB_DEMANDA:
+                df = normalize_schema(df)
+            span.set(rows_out=len(df), cache="cache" in message)
+        print(message)
+        return df
+
+    def get(self, name, columns=None):
+        with self.lock:
+            if name not in self.frames and columns is None:
+                self.frames[name] = self._read(name)
+            if name in self.frames:
+                df = self.frames[name]
+                return df if columns is None else df[[c for c in columns if c in df.columns]]
+            chave = (name, tuple(columns))
+            if chave not in self.projections:
+                self.projections[chave] = self._read(name, list(columns))
+            return self.projections[chave]
+
+    def preload(self, names, workers):
+        from src.data_processor import normalize_schema
+        with self.lock:
+            pendentes = {name: self.paths[name] for name in names if name not in self.frames}
+            if not pendentes:
+                return
+            for name, df in load_all_data(self.use_cache, workers, self.streaming, pendentes).items():
+                self.frames[name] = df if name in SOB_DEMANDA else normalize_schema(df)
+
+class DataRegistry(Mapping):
+    """
+    Bases de entrada carregadas sob demanda, no lugar do dicionário de
+    `load_all_data`.
+
+    Cada planilha só é lida (do cache ou do Excel, já normalizada por
+    `normalize_schema`) no primeiro acesso e fica memorizada; `project` lê
+    apenas as colunas pedidas. O registro é somente leitura: os acessos
+    devolvem visões rasas das bases memorizadas (com o copy-on-write do
+    pandas, alterar a visão não altera a base), e `derive` cria um novo
+    registro, com bases a menos ou a mais, que compartilha as leituras.
+    Assim, uma etapa que nunca usa uma base (ex: o template do VR MENSAL no
+    motor nativo) não paga a leitura dela.
+    """
+
+    def __init__(self, file_paths=None, use_cache=True, streaming=False):
+        self._sources = _Sources(config.FILE_PATHS if file_paths is None else file_paths, use_cache, streaming)
+        self._names = list(self._sources.paths)
+        self._extras = {}
+
+    def _derived(self, names, extras):
+        registro = object.__new__(DataRegistry)
+        registro._sources = self._sources
+        registro._names = names
+        registro._extras = extras
+        return registro
+
+    def __getitem__(self, name):
+        if name in self._extras:
+            return self._extras[name].copy(deep=False)
+        if name not in self._names:
+            raise KeyError(name)
+        return self._sources.get(name).copy(deep=False)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __repr__(self):
+        return f"DataRegistry({self._names}, carregadas={list(self.loaded())})"
+
+    def project(self, name, columns):
+        """Base `name` só com as colunas `columns` que existirem nela (lidas em streaming, se ainda não carregada)."""
+        if name in self._extras:
+            df = self._extras[name]
+            return df[[c for c in columns if c in df.columns]]
+        if name not in self._names:
+            raise KeyError(name)
+        return self._sources.get(name, columns).copy(deep=False)
+
+    def loaded(self):
+        """Bases já carregadas (sem disparar leituras), na ordem do registro."""
+        carregadas = {**self._sources.frames, **self._extras}
+        return {name: carregadas[name] for name in self._names if name in carregadas}
+
+    def preload(self, names=None, workers=None):
+        """
+        Lê de uma vez as bases `names` ainda não carregadas (padrão: todas,
+        exceto as de `SOB_DEMANDA`), em paralelo com `workers` > 1 (ver
+        `load_all_data`).
+        """
+        if names is None:
+            names = [n for n in self._names if n not in SOB_DEMANDA]
+        self._sources.preload([n for n in names if n in self._names and n not in self._extras], workers)
+        return self
+
+    def derive(self, drop=(), **frames):
+        """
+        Novo registro sem as bases `drop` e com as bases em memória `frames`
+        (no fim, na ordem dada). As leituras continuam compartilhadas.
+        """
+        from src.data_processor import normalize_schema
+        extras = {n: df for n, df in self._extras.items() if n not in drop and n not in frames}
+        extras.update({n: normalize_schema(df.copy(deep=False)) for n, df in frames.items()})
+        names = [n for n in self._names if n not in drop and n not in frames] + list(frames)
+        return self._derived(names, extras)
+
+# ------------------------------------------------------------
+def derive(dataframes, drop=(), **frames):
+    """
+    `DataRegistry.derive` também para dicionários de bases: devolve uma
+    nova coleção sem `drop` e com `frames`, sem alterar a original.
+    """
+    if isinstance(dataframes, DataRegistry):
+        return dataframes.derive(drop, **frames)
+    novo = {n: df for n, df in dataframes.items() if n not in drop and n not in frames}
+    novo.update(frames)
+    return novo
+
+def project(dataframes, name, columns):
+    """Base `name` só com as colunas `columns` (None se ela não existir), de um registro ou dicionário."""
+    if isinstance(dataframes, DataRegistry):
+        return dataframes.project(name, columns) if name in dataframes else None
+    df = dataframes.get(name)
+    return None if df is None else df[[c for c in columns if c in df.columns]]
+
+def select(dataframes, names):
+    """Dicionário só com as bases `names` presentes (as demais de um registro não são lidas)."""
+    return {n: dataframes[n] for n in names if n in dataframes}
@@ -0,0 +1,298 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import os
+import json
+import hashlib
+import datetime
+import numpy as np
+import pandas as pd
+from src import config
+from src.data_cache import file_hash
+from src.data_processor import normalize_dataframes, normalize_schema, process_data
+from src.data_registry import derive
+from src.native_engine import run_calculations_native
+from src.periodo import periodo_padrao
+
+# Incrementar sempre que as regras de cálculo mudarem, para forçar um
+# recálculo completo na próxima execução.
+STATE_VERSION = 1
+
+# Bases que não participam do cálculo
+IGNORED_SOURCES = ("template_vr",)
+
+# Colunas do resultado comparadas no log de alterações
+RESULT_COLUMNS = ["DIAS_A_PAGAR", "VALOR_VR_DIARIO", "VALOR_TOTAL_VR"]
+
+# ------------------------------------------------------------
+def _per_employee(dataframes):
+    """Separa as bases por matrícula (ativos, férias...) das globais (sindicatos, dias úteis)."""
+    por_matricula, globais = {}, {}
+    for name, df in dataframes.items():
+        if name in IGNORED_SOURCES or df is None:
+            continue
+        if config.MATRICULA_COL in df.columns:
+            por_matricula[name] = df
+        else:
+            globais[name] = df
+    return por_matricula, globais
+
+def matricula_hashes(df):
+    """
+    Hash de conteúdo por matrícula: o hash de cada linha (todas as colunas),
+    somado entre as linhas da mesma matrícula (independe da ordem).
+    """
+    if df.empty:
+        return pd.Series(dtype="uint64")
+    linhas = pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy()
+    matriculas = pd.to_numeric(df[config.MATRICULA_COL], errors="coerce").astype("Int64")
+    return pd.Series(linhas, index=matriculas).groupby(level=0).sum()
+
+def global_fingerprint(globais, periodo):
+    """
+    Impressão digital do que afeta todos os colaboradores: bases globais,
+    período, regras de exclusão, origem dos dias úteis e feriados.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        "version": STATE_VERSION,
+        "periodo": periodo,
+        "regras": config.REGRAS_EXCLUSAO,
+        "dias_uteis_fonte": config.DIAS_UTEIS_FONTE,
+        "limite_desligamento": config.DIA_LIMITE_DESLIGAMENTO,
+        "percentuais": [config.PERCENTUAL_CUSTO_EMPRESA, config.PERCENTUAL_CUSTO_COLABORADOR],
+    }, sort_keys=True, default=str).encode("utf-8"))
+    if os.path.exists(config.FERIADOS_FILE):
+        digest.update(file_hash(config.FERIADOS_FILE).encode("utf-8"))
+    for name in sorted(globais):
+        df = globais[name]
+        digest.update(f"{name}|{list(map(str, df.columns))}|{len(df)}".encode("utf-8"))
+        if not df.empty:
+            digest.update(pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def diff_sources(hashes_anteriores, hashes_atuais):
+    """
+    Compara os hashes por matrícula de cada base e retorna um DataFrame com
+    FONTE, MATRICULA e TIPO (INSERIDO, ALTERADO ou REMOVIDO).
+    """
+    partes = []
+    for fonte in sorted(set(hashes_anteriores) | set(hashes_atuais)):
+        antes = hashes_anteriores.get(fonte, pd.Series(dtype="uint64"))
+        depois = hashes_atuais.get(fonte, pd.Series(dtype="uint64"))
+        alinhado = pd.concat([antes.rename("ANTES"), depois.rename("DEPOIS")], axis=1)
+        tipo = np.select(
+            [alinhado["ANTES"].isna(), alinhado["DEPOIS"].isna(), alinhado["ANTES"] != alinhado["DEPOIS"]],
+            ["INSERIDO", "REMOVIDO", "ALTERADO"],
+            default="",
+        )
+        mudou = tipo != ""
+        if mudou.any():
+            partes.append(pd.DataFrame({"FONTE": fonte, config.MATRICULA_COL: alinhado.index[mudou], "TIPO": tipo[mudou]}))
+    if not partes:
+        return pd.DataFrame(columns=["FONTE", config.MATRICULA_COL, "TIPO"])
+    return pd.concat(partes, ignore_index=True)
+
+def _subset(dataframes, matriculas):
+    """Recorta as bases por matrícula às matrículas afetadas (bases globais inteiras)."""
+    matriculas = pd.array(matriculas, dtype="Int64")
+    recorte = {}
+    for name, df in dataframes.items():
+        if df is not None and config.MATRICULA_COL in df.columns and name not in IGNORED_SOURCES:
+            df = df[df[config.MATRICULA_COL].isin(matriculas).to_numpy(dtype=bool)].copy()
+        recorte[name] = df
+    return recorte
+
+def _consolidated_order(dataframes):
+    """Posição de cada matrícula na base consolidada (ativos + admissões)."""
+    partes = [dataframes[n][config.MATRICULA_COL] for n in ("ativos", "admissoes") if dataframes.get(n) is not None]
+    if not partes:
+        return pd.Series(dtype="int64")
+    ordem = pd.concat(partes, ignore_index=True).drop_duplicates()
+    return pd.Series(np.arange(len(ordem)), index=ordem.to_numpy())
+
+def _patch(anterior, novo, afetadas, ordem):
+    """Substitui as linhas das matrículas afetadas e restaura a ordem da base consolidada."""
+    mantidas = anterior[~anterior[config.MATRICULA_COL].isin(afetadas).to_numpy(dtype=bool)]
+    partes = [df for df in (mantidas, novo) if not df.empty]
+    if not partes:
+        return anterior.iloc[0:0]
+    patched = pd.concat(partes, ignore_index=True)
+    if len(ordem):
+        posicao = patched[config.MATRICULA_COL].map(ordem).fillna(len(ordem)).to_numpy()
+        patched = patched.iloc[np.argsort(posicao, kind="stable")]
+    return normalize_schema(patched.reset_index(drop=True))
+
+def _changed_columns(inputs_anteriores, dataframes, alteracoes):
+    """Para cada (fonte, matrícula) alterada, lista as colunas cujo valor mudou."""
+    colunas = {}
+    for fonte, grupo in alteracoes[alteracoes["TIPO"] == "ALTERADO"].groupby("FONTE"):
+        antes_df, depois_df = inputs_anteriores.get(fonte), dataframes.get(fonte)
+        if antes_df is None or depois_df is None:
+            continue
+        comuns = [c for c in depois_df.columns if c in antes_df.columns and c != config.MATRICULA_COL]
+        afetadas = pd.array(grupo[config.MATRICULA_COL].to_numpy(), dtype="Int64")
+        antes = antes_df[antes_df[config.MATRICULA_COL].isin(afetadas)].drop_duplicates(config.MATRICULA_COL, keep="last").set_index(config.MATRICULA_COL)
+        depois = depois_df[depois_df[config.MATRICULA_COL].isin(afetadas)].drop_duplicates(config.MATRICULA_COL, keep="last").set_index(config.MATRICULA_COL)
+        antes, depois = antes.reindex(depois.index)[comuns].astype(str), depois[comuns].astype(str)
+        diferentes = (antes != depois).to_numpy()
+        for matricula, linha in zip(depois.index, diferentes):
+            colunas[(fonte, matricula)] = [c for c, d in zip(comuns, linha) if d]
+    return colunas
+
+def build_change_log(resultado_anterior, resultado, alteracoes, excluidos, colunas_alteradas=None, completo=False):
+    """
+    Log das alterações entre duas execuções, uma linha por matrícula afetada:
+    situação (INCLUIDO, REMOVIDO, ALTERADO, SEM_EFEITO), bases e colunas que
+    mudaram, motivo de exclusão (se houver) e os valores antes/depois.
+    Com `completo`, compara todas as matrículas dos dois resultados.
+    """
+    colunas_alteradas = colunas_alteradas or {}
+    mat = config.MATRICULA_COL
+    antes = resultado_anterior.drop_duplicates(mat).set_index(mat)
+    depois = resultado.drop_duplicates(mat).set_index(mat)
+
+    afetadas = pd.Index(pd.unique(alteracoes[mat]), dtype="Int64")
+    if completo:
+        afetadas = antes.index.union(depois.index)
+
+    log = pd.DataFrame(index=afetadas)
+    log.index.name = mat
+    for col in RESULT_COLUMNS:
+        log[f"{col}_ANTES"] = antes[col].reindex(afetadas).to_numpy() if col in antes.columns else np.nan
+        log[f"{col}_DEPOIS"] = depois[col].reindex(afetadas).to_numpy() if col in depois.columns else np.nan
+
+    no_antes, no_depois = afetadas.isin(antes.index), afetadas.isin(depois.index)
+    mudou = np.zeros(len(afetadas), dtype=bool)
+    for col in RESULT_COLUMNS:
+        a, d = log[f"{col}_ANTES"], log[f"{col}_DEPOIS"]
+        mudou |= ~((a == d) | (a.isna() & d.isna())).to_numpy()
+    log["SITUACAO"] = np.select(
+        [~no_antes & no_depois, no_antes & ~no_depois, mudou],
+        ["INCLUIDO", "REMOVIDO", "ALTERADO"],
+        default="SEM_EFEITO",
+    )
+
+    if not completo:
+        descricao = alteracoes.assign(DESC=alteracoes["FONTE"] + ":" + alteracoes["TIPO"].str.lower())
+        log["FONTES"] = descricao.groupby(mat)["DESC"].agg("|".join).reindex(afetadas).to_numpy()
+        colunas = {}
+        for (fonte, matricula), cols in colunas_alteradas.items():
+            colunas.setdefault(matricula, []).extend(f"{fonte}.{c}" for c in cols)
+        log["COLUNAS"] = ["|".join(colunas.get(m, [])) for m in afetadas]
+    else:
+        log["FONTES"] = "recalculo_completo"
+        log["COLUNAS"] = ""
+
+    motivos = excluidos.drop_duplicates(mat).set_index(mat)["MOTIVOS"] if excluidos is not None and not excluidos.empty else pd.Series(dtype="object")
+    log["MOTIVO_EXCLUSAO"] = motivos.reindex(afetadas).to_numpy()
+    ordem = ["SITUACAO", "FONTES", "COLUNAS", "MOTIVO_EXCLUSAO"] + [c for c in log.columns if c.endswith(("_ANTES", "_DEPOIS"))]
+    return log[ordem].reset_index()
+
+def _state_dir(periodo):
+    return os.path.join(config.RUNS_DIR, pd.Timestamp(periodo["competencia"]).strftime("%Y-%m"))
+
+def load_state(periodo):
+    """Estado salvo da última execução da competência, ou None."""
+    state_dir = _state_dir(periodo)
+    try:
+        with open(os.path.join(state_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != STATE_VERSION:
+            return None
+        state = {"meta": meta}
+        for nome in ("inputs", "hashes", "resultado", "excluidos"):
+            state[nome] = pd.read_pickle(os.path.join(state_dir, f"{nome}.pkl"))
+        return state
+    except (OSError, ValueError):
+        return None
+    except Exception as e:
+        print(f"AVISO: Estado da execução anterior ilegível ({state_dir}): {e}")
+        return None
+
+def save_state(periodo, inputs, hashes, resultado, excluidos, fingerprint):
+    """Grava entradas normalizadas, hashes, resultado e exclusões da execução."""
+    state_dir = _state_dir(periodo)
+    try:
+        os.makedirs(state_dir, exist_ok=True)
+        for nome, valor in (("inputs", inputs), ("hashes", hashes), ("resultado", resultado), ("excluidos", excluidos)):
+            path = os.path.join(state_dir, f"{nome}.pkl")
+            pd.to_pickle(valor, f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+        meta = {
+            "version": STATE_VERSION,
+            "periodo": periodo,
+            "global_fingerprint": fingerprint,
+            "colaboradores": len(resultado),
+            "gerado_em": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(os.path.join(state_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+    except Exception as e:
+        print(f"AVISO: Não foi possível gravar o estado da execução: {e}")
+
+def _calculate(dataframes, periodo):
+    processed = process_data(dict(dataframes), periodo)
+    excluidos = processed.get("excluidos", pd.DataFrame(columns=[config.MATRICULA_COL, config.EXCLUSAO_COL, "MOTIVOS"]))
+    return run_calculations_native(processed, periodo), excluidos
+
+def run_incremental(dataframes, periodo=None, changelog_file=None):
+    """
+    Executa o cálculo (motor nativo) reaproveitando a última execução da
+    mesma competência.
+
+    As bases por matrícula são comparadas linha a linha (hashes) com as da
+    execução anterior; apenas as matrículas inseridas, alteradas ou
+    removidas em alguma base são reprocessadas e substituídas no resultado
+    anterior. Mudanças nas bases globais (sindicatos, dias úteis), no
+    período ou nas regras forçam um recálculo completo. O log de alterações
+    é gravado em `changelog_file` (padrão: `config.CHANGELOG_FILE`).
+
+    Returns:
+        O dataframe final com os resultados (igual ao de um recálculo completo).
+    """
+    periodo = periodo or periodo_padrao()
+    dataframes = normalize_dataframes(dict(derive(dataframes, drop=IGNORED_SOURCES)))
+    por_matricula, globais = _per_employee(dataframes)
+    hashes = {name: matricula_hashes(df) for name, df in por_matricula.items()}
+    fingerprint = global_fingerprint(globais, periodo)
+    anterior = load_state(periodo)
+
+    if anterior is None or anterior["meta"].get("global_fingerprint") != fingerprint:
+        motivo = "nenhuma execução anterior" if anterior is None else "bases globais, período ou regras mudaram"
+        print(f"--- Recálculo completo ({motivo}) ---")
+        resultado, excluidos = _calculate(dataframes, periodo)
+        alteracoes = pd.DataFrame(columns=["FONTE", config.MATRICULA_COL, "TIPO"])
+        colunas = {}
+        completo = True
+    else:
+        completo = False
+        alteracoes = diff_sources(anterior["hashes"], hashes)
+        afetadas = pd.unique(alteracoes[config.MATRICULA_COL])
+        print(f"--- Recálculo incremental: {len(afetadas)} matrícula(s) afetada(s) ---")
+        for (fonte, tipo), total in alteracoes.groupby(["FONTE", "TIPO"]).size().items():
+            print(f"  - {fonte}: {total} {tipo.lower()}(s)")
+        if len(afetadas) == 0:
+            resultado, excluidos = anterior["resultado"], anterior["excluidos"]
+        else:
+            novo, novos_excluidos = _calculate(_subset(dataframes, afetadas), periodo)
+            ordem = _consolidated_order(dataframes)
+            resultado = _patch(anterior["resultado"], novo, afetadas, ordem)
+            excluidos = _patch(anterior["excluidos"], novos_excluidos, afetadas, ordem)
+        colunas = _changed_columns(anterior["inputs"], dataframes, alteracoes)
+
+    if anterior is not None:
+        log = build_change_log(anterior["resultado"], resultado, alteracoes, excluidos, colunas, completo)
+        changelog_file = changelog_file or config.CHANGELOG_FILE
+        try:
+            os.makedirs(os.path.dirname(changelog_file) or ".", exist_ok=True)
+            log.to_csv(changelog_file, index=False, sep=";", encoding="utf-8-sig")
+            situacoes = log["SITUACAO"].value_counts().to_dict()
+            print(f"Log de alterações gravado em '{changelog_file}': {situacoes}")
+        except Exception as e:
+            print(f"AVISO: Não foi possível gravar o log de alterações: {e}")
+
+    save_state(periodo, por_matricula, hashes, resultado, excluidos, fingerprint)
+    return resultado
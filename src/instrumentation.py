@@ -0,0 +1,222 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import os
+import sys
+import json
+import time
+import socket
+import datetime
+import threading
+import contextlib
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Execução instrumentada ativa (None = instrumentação desligada)
+_ATIVO = None
+
+# ------------------------------------------------------------
+def rss_mb():
+    """Memória residente atual do processo (MB), se disponível (Linux)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            paginas = int(f.read().split()[1])
+        return round(paginas * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def rss_peak_mb():
+    """Pico de memória residente do processo até agora (MB), se disponível."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return round(rss / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+def rows(obj):
+    """Número de linhas de um DataFrame (ou soma de um dicionário de DataFrames)."""
+    if isinstance(obj, pd.DataFrame):
+        return len(obj)
+    if hasattr(obj, "loaded"):
+        # DataRegistry: só as bases já lidas (contar não dispara leituras)
+        obj = obj.loaded()
+    if isinstance(obj, dict):
+        return sum(len(df) for df in obj.values() if isinstance(df, pd.DataFrame))
+    return None
+
+class Span:
+    """Uma etapa medida: nome, categoria, início, duração e atributos."""
+
+    def __init__(self, nome, categoria="pipeline", inicio=None, pai=None, tid=None, **attrs):
+        self.nome = nome
+        self.categoria = categoria
+        self.inicio = time.time() if inicio is None else inicio
+        self.duracao = None
+        self.pai = pai
+        self.tid = threading.get_ident() if tid is None else tid
+        self.attrs = dict(attrs)
+
+    def set(self, **attrs):
+        """Acrescenta atributos à etapa (ex: rows_in, rows_out, tokens)."""
+        self.attrs.update({k: v for k, v in attrs.items() if v is not None})
+        return self
+
+    def to_dict(self, origem):
+        return {
+            "nome": self.nome,
+            "categoria": self.categoria,
+            "inicio_s": round(self.inicio - origem, 6),
+            "duracao_s": None if self.duracao is None else round(self.duracao, 6),
+            "pai": self.pai,
+            "tid": self.tid,
+            **self.attrs,
+        }
+
+class _NullSpan:
+    """Etapa sem efeito, usada quando a instrumentação está desligada."""
+
+    def set(self, **attrs):
+        return self
+
+_NULL_SPAN = _NullSpan()
+
+class RunProfile:
+    """
+    Perfil de uma execução: lista de etapas (com aninhamento), exportável
+    em JSON e no formato trace-event (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self, nome="pipeline", **meta):
+        self.nome = nome
+        self.inicio = time.time()
+        self.meta = {
+            "nome": nome,
+            "inicio": datetime.datetime.fromtimestamp(self.inicio).isoformat(timespec="seconds"),
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "python": sys.version.split()[0],
+            **meta,
+        }
+        self.spans = []
+        self._pilha = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, nome, categoria="pipeline", **attrs):
+        pai = self._pilha[-1].nome if self._pilha else None
+        span = Span(nome, categoria, pai=pai, rss_inicio_mb=rss_mb(), **attrs)
+        self._pilha.append(span)
+        inicio = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.set(erro=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.duracao = time.perf_counter() - inicio
+            span.set(rss_fim_mb=rss_mb(), rss_pico_mb=rss_peak_mb())
+            self._pilha.pop()
+            with self._lock:
+                self.spans.append(span)
+
+    def record(self, nome, inicio, duracao, categoria="pipeline", tid=None, **attrs):
+        """Registra uma etapa já medida (ex: em outro processo ou em um callback)."""
+        pai = self._pilha[-1].nome if self._pilha else None
+        span = Span(nome, categoria, inicio=inicio, pai=pai, tid=tid, **attrs)
+        span.duracao = duracao
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def to_dict(self):
+        spans = sorted(self.spans, key=lambda s: s.inicio)
+        return {
+            **self.meta,
+            "duracao_s": round(time.time() - self.inicio, 6),
+            "rss_pico_mb": rss_peak_mb(),
+            "resumo": self.summary().to_dict(orient="records"),
+            "etapas": [s.to_dict(self.inicio) for s in spans],
+        }
+
+    def summary(self):
+        """Tempo total, chamadas e linhas por (categoria, etapa), ordenado por tempo."""
+        if not self.spans:
+            return pd.DataFrame(columns=["categoria", "etapa", "chamadas", "segundos"])
+        df = pd.DataFrame([
+            {"categoria": s.categoria, "etapa": s.nome.split(":")[0], "segundos": s.duracao or 0.0,
+             "rows_out": s.attrs.get("rows_out"), "tokens": s.attrs.get("total_tokens")}
+            for s in self.spans
+        ])
+        resumo = df.groupby(["categoria", "etapa"], sort=False).agg(
+            chamadas=("segundos", "size"), segundos=("segundos", "sum"),
+            rows_out=("rows_out", "max"), tokens=("tokens", lambda t: t.sum(min_count=1)),
+        ).reset_index()
+        resumo["segundos"] = resumo["segundos"].round(4)
+        return resumo.sort_values("segundos", ascending=False, ignore_index=True)
+
+    def write_json(self, path):
+        """Grava o perfil completo (metadados, resumo e etapas) em JSON."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False, default=str)
+        return path
+
+    def write_trace(self, path):
+        """Grava as etapas no formato trace-event do Chrome (eventos "X", em µs)."""
+        eventos = []
+        for s in sorted(self.spans, key=lambda s: s.inicio):
+            eventos.append({
+                "name": s.nome,
+                "cat": s.categoria,
+                "ph": "X",
+                "ts": round((s.inicio - self.inicio) * 1e6, 1),
+                "dur": round((s.duracao or 0.0) * 1e6, 1),
+                "pid": self.meta["pid"],
+                "tid": s.tid,
+                "args": {k: v for k, v in s.attrs.items()},
+            })
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": eventos, "displayTimeUnit": "ms", "otherData": self.meta}, f, default=str)
+        return path
+
+# ------------------------------------------------------------
+def start_run(nome="pipeline", **meta):
+    """Liga a instrumentação para a execução atual e retorna o perfil."""
+    global _ATIVO
+    _ATIVO = RunProfile(nome, **meta)
+    return _ATIVO
+
+def stop_run():
+    """Desliga a instrumentação e retorna o perfil coletado (ou None)."""
+    global _ATIVO
+    profile, _ATIVO = _ATIVO, None
+    return profile
+
+def current_run():
+    """Perfil ativo, ou None se a instrumentação estiver desligada."""
+    return _ATIVO
+
+@contextlib.contextmanager
+def stage(nome, categoria="pipeline", **attrs):
+    """
+    Mede uma etapa do pipeline (tempo, RSS e os atributos passados ou
+    definidos com `span.set(...)`). Sem execução ativa, não faz nada.
+    """
+    if _ATIVO is None:
+        yield _NULL_SPAN
+        return
+    with _ATIVO.stage(nome, categoria, **attrs) as span:
+        yield span
+
+def record(nome, inicio, duracao, categoria="pipeline", tid=None, **attrs):
+    """Registra uma etapa já medida na execução ativa (se houver)."""
+    if _ATIVO is None:
+        return _NULL_SPAN
+    return _ATIVO.record(nome, inicio, duracao, categoria, tid, **attrs)
@@ -0,0 +1,117 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import numpy as np
+import pandas as pd
+from src import config
+
+# ------------------------------------------------------------
+def first_column(df, candidates):
+    """Retorna o primeiro nome de coluna de `candidates` presente em `df`."""
+    for col in candidates:
+        if col in df.columns:
+            return col
+    return None
+
+def to_days(series):
+    """Converte uma série de datas para datetime64[D] (NaT preservado)."""
+    return pd.to_datetime(series, errors="coerce").to_numpy(dtype="datetime64[D]")
+
+def has_intervals(df):
+    """True se a base tiver colunas de início e de fim/retorno dos registros."""
+    if df is None or df.empty:
+        return False
+    fim = first_column(df, config.FIM_INTERVALO_COLS) or first_column(df, config.RETORNO_INTERVALO_COLS)
+    return first_column(df, config.INICIO_INTERVALO_COLS) is not None and fim is not None
+
+def leave_intervals(df, periodo):
+    """
+    Extrai os registros com datas de uma base de férias/afastamentos como
+    intervalos [início, fim) recortados ao período de apuração.
+
+    Returns:
+        (matriculas int64, inicios datetime64[D], fins datetime64[D]),
+        sem registros vazios ou fora do período, e a máscara das linhas de
+        `df` que têm datas válidas.
+    """
+    vazio = (np.array([], dtype="int64"), np.array([], dtype="datetime64[D]"), np.array([], dtype="datetime64[D]"))
+    if not has_intervals(df):
+        return vazio + (np.zeros(0 if df is None else len(df), dtype=bool),)
+
+    inicio = to_days(df[first_column(df, config.INICIO_INTERVALO_COLS)])
+    fim_col = first_column(df, config.FIM_INTERVALO_COLS)
+    if fim_col is not None:
+        fim = to_days(df[fim_col]) + np.timedelta64(1, "D")
+    else:
+        fim = to_days(df[first_column(df, config.RETORNO_INTERVALO_COLS)])
+
+    matriculas = pd.to_numeric(df[config.MATRICULA_COL], errors="coerce").astype("Int64").to_numpy(dtype="int64", na_value=-1)
+    com_datas = ~np.isnat(inicio) & ~np.isnat(fim) & (matriculas >= 0)
+
+    periodo_inicio = np.datetime64(periodo["inicio"], "D")
+    periodo_fim = np.datetime64(periodo["fim"], "D") + np.timedelta64(1, "D")
+    inicio = np.maximum(inicio, periodo_inicio)
+    fim = np.minimum(fim, periodo_fim)
+    validos = com_datas & (inicio < fim)
+    return matriculas[validos], inicio[validos], fim[validos], com_datas
+
+def merge_intervals(matriculas, inicios, fins):
+    """
+    Une os intervalos sobrepostos (ou contíguos) de cada matrícula.
+
+    Tudo é feito com arrays: ordenação por (matrícula, início), máximo
+    acumulado dos fins dentro de cada matrícula e `reduceat` nos pontos em
+    que um intervalo novo começa. O custo é O(n log n) pela ordenação.
+    """
+    if len(matriculas) == 0:
+        return matriculas, inicios, fins
+
+    ordem = np.lexsort((inicios, matriculas))
+    matriculas, inicios, fins = matriculas[ordem], inicios[ordem], fins[ordem]
+
+    # Dias como inteiros relativos ao menor início
+    base = inicios.min()
+    s = (inicios - base).astype("int64")
+    e = (fins - base).astype("int64")
+
+    # Desloca cada matrícula para uma faixa própria, de modo que um único
+    # maximum.accumulate equivale ao máximo acumulado por matrícula
+    nova_matricula = np.empty(len(matriculas), dtype=bool)
+    nova_matricula[0] = True
+    nova_matricula[1:] = matriculas[1:] != matriculas[:-1]
+    grupo = np.cumsum(nova_matricula) - 1
+    largura = int(e.max()) + 1
+    fim_acumulado = np.maximum.accumulate(e + grupo * largura)
+
+    novo = nova_matricula.copy()
+    novo[1:] |= (s[1:] + grupo[1:] * largura) > fim_acumulado[:-1]
+    pos = np.flatnonzero(novo)
+    return matriculas[pos], inicios[pos], np.maximum.reduceat(fins, pos)
+
+def business_days_lost(matriculas, inicios, fins, calendario, chaves=None):
+    """
+    Soma, por matrícula, os dias úteis cobertos pelos intervalos (já unidos)
+    no calendário do sindicato de cada colaborador (`chaves`, alinhado aos
+    intervalos; None usa o calendário nacional).
+
+    Returns:
+        pd.Series de dias úteis indexada pela matrícula.
+    """
+    if len(matriculas) == 0:
+        return pd.Series(dtype="int64")
+    if chaves is None:
+        chaves = pd.Series(None, index=range(len(matriculas)), dtype="object")
+    dias = calendario.count(chaves, inicios, fins)
+    # Os intervalos unidos já vêm ordenados por matrícula
+    pos = np.flatnonzero(np.r_[True, matriculas[1:] != matriculas[:-1]])
+    return pd.Series(np.add.reduceat(dias, pos).astype("int64"), index=pd.Index(matriculas[pos], dtype="Int64"))
+
+def full_period_matriculas(df, periodo):
+    """Matrículas cujos intervalos unidos cobrem o período de apuração inteiro."""
+    matriculas, inicios, fins, _ = leave_intervals(df, periodo)
+    matriculas, inicios, fins = merge_intervals(matriculas, inicios, fins)
+    periodo_inicio = np.datetime64(periodo["inicio"], "D")
+    periodo_fim = np.datetime64(periodo["fim"], "D") + np.timedelta64(1, "D")
+    return np.unique(matriculas[(inicios <= periodo_inicio) & (fins >= periodo_fim)])
@@ -0,0 +1,281 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import numpy as np
+import pandas as pd
+from src import config
+from src import instrumentation
+from src.periodo import periodo_padrao
+from src.data_registry import derive
+from src.calendario import build_business_calendar, generate_dias_uteis, sindicato_locais, use_dias_uteis_sheet
+from src.intervalos import first_column, to_days, leave_intervals, merge_intervals, business_days_lost
+from src.sindicato_index import resolve_sindicatos
+
+# Colunas de data possíveis após clean_column_names ("Admissão" -> "ADMISS_O")
+ADMISSAO_COLS = ("ADMISSAO", "ADMISS_O")
+DEMISSAO_COLS = ("DATA_DEMISSAO", "DATA_DEMISS_O")
+FERIAS_COLS = ("DIAS_DE_FERIAS", "DIAS_DE_F_RIAS")
+
+# ------------------------------------------------------------
+def _matricula_key(series):
+    """Chave inteira anulável de matrícula (sem conversão se já for Int64)."""
+    if series.dtype == "Int64":
+        return series
+    return pd.to_numeric(series, errors="coerce").round().astype("Int64")
+
+def _month_scale(dias_calendario, dias_mes, dias_periodo):
+    """
+    Leva dias úteis contados no calendário à escala de DIAS_UTEIS_MES
+    (planilha ou calendário): quem cobre o período inteiro recebe
+    exatamente os dias úteis do mês, como um ativo. Arredonda meio para cima.
+    """
+    escala = dias_calendario * dias_mes / np.maximum(dias_periodo, 1)
+    return np.where(dias_periodo > 0, np.floor(escala + 0.5), dias_calendario).astype("int64")
+
+def _month_basis(df, periodo, calendario):
+    """
+    (DIAS_UTEIS_MES, dias úteis do período no calendário) de cada linha de
+    `df`, as duas escalas de `_month_scale`. Sem a coluna DIAS_UTEIS_MES,
+    vale o próprio calendário.
+    """
+    chaves = df["SINDICATO_KEY"] if "SINDICATO_KEY" in df.columns else pd.Series(None, index=df.index, dtype="object")
+    inicio = np.datetime64(periodo["inicio"], "D")
+    fim_exclusivo = np.datetime64(periodo["fim"], "D") + np.timedelta64(1, "D")
+    dias_periodo = calendario.count(chaves, inicio, fim_exclusivo)
+    if "DIAS_UTEIS_MES" not in df.columns:
+        return dias_periodo, dias_periodo
+    dias_mes = pd.to_numeric(df["DIAS_UTEIS_MES"], errors="coerce").fillna(0).to_numpy(dtype="int64")
+    return dias_mes, dias_periodo
+
+# ------------------------------------------------------------
+def _leave_days_lost(df, dataframes, periodo, calendario):
+    """
+    Dias úteis perdidos no período por férias/afastamentos com datas: os
+    registros das duas bases são recortados ao período e unidos por
+    matrícula (sem contar duas vezes dias sobrepostos) e contados no
+    calendário do sindicato de cada colaborador.
+
+    Returns:
+        (pd.Series de dias perdidos por matrícula, máscara das linhas de
+        férias com datas, que não entram na soma de DIAS_DE_FERIAS).
+    """
+    partes = []
+    ferias_com_datas = None
+    for nome in ("ferias", "afastamentos"):
+        base = dataframes.get(nome)
+        if base is None or base.empty:
+            continue
+        matriculas, inicios, fins, com_datas = leave_intervals(base, periodo)
+        if nome == "ferias":
+            ferias_com_datas = com_datas
+        partes.append((matriculas, inicios, fins))
+
+    if not partes or sum(len(p[0]) for p in partes) == 0:
+        return pd.Series(dtype="int64"), ferias_com_datas
+
+    matriculas, inicios, fins = merge_intervals(*(np.concatenate(arrays) for arrays in zip(*partes)))
+    if calendario is None:
+        nomes = df["SINDICATO"] if "SINDICATO" in df.columns else []
+        calendario = build_business_calendar(periodo, sindicato_locais(nomes))
+    chaves = None
+    if "SINDICATO_KEY" in df.columns:
+        chave_por_matricula = pd.Series(df["SINDICATO_KEY"].to_numpy(), index=df[config.MATRICULA_COL].to_numpy())
+        chaves = chave_por_matricula.reindex(matriculas)
+    return business_days_lost(matriculas, inicios, fins, calendario, chaves), ferias_com_datas
+
+def calculate_working_days(df, dataframes, periodo=None, calendario=None):
+    """
+    Define os dias úteis do mês de cada colaborador a partir do sindicato e
+    subtrai os dias de férias e de afastamentos parciais (nunca menor que
+    zero). Registros com datas de início/fim são descontados pelos dias
+    úteis que cobrem no período, contados no calendário e levados à escala
+    de DIAS_UTEIS_MES (ver `_month_scale`); os demais, pela coluna de dias
+    de férias.
+    """
+    print("Iniciando cálculo de dias úteis...")
+    periodo = periodo or periodo_padrao()
+    dias_uteis_df = dataframes.get("dias_uteis")
+    if dias_uteis_df is not None and not dias_uteis_df.empty and "SINDICATO" in df.columns:
+        sindicatos = resolve_sindicatos(df["SINDICATO"], dias_uteis_df, dataframes.get("sindicatos"))
+        df["SINDICATO_KEY"] = sindicatos["SINDICATO_KEY"]
+        df["DIAS_UTEIS_MES"] = sindicatos["DIAS_UTEIS"]
+    else:
+        df["DIAS_UTEIS_MES"] = 0
+
+    if calendario is None:
+        nomes = df["SINDICATO"] if "SINDICATO" in df.columns else []
+        calendario = build_business_calendar(periodo, sindicato_locais(nomes))
+    dias_perdidos, ferias_com_datas = _leave_days_lost(df, dataframes, periodo, calendario)
+    perdidos = df[config.MATRICULA_COL].map(dias_perdidos).fillna(0).to_numpy(dtype="int64")
+    df["DIAS_AFASTADO"] = _month_scale(perdidos, *_month_basis(df, periodo, calendario))
+
+    df["DIAS_DE_FERIAS"] = 0
+    ferias_df = dataframes.get("ferias")
+    if ferias_df is not None and not ferias_df.empty:
+        ferias_col = first_column(ferias_df, FERIAS_COLS)
+        if ferias_col is not None:
+            if ferias_com_datas is not None and ferias_com_datas.any():
+                ferias_df = ferias_df[~ferias_com_datas]
+            ferias_agg = ferias_df.groupby(_matricula_key(ferias_df[config.MATRICULA_COL]))[ferias_col].sum()
+            df["DIAS_DE_FERIAS"] = df[config.MATRICULA_COL].map(ferias_agg).fillna(0).astype("int64")
+
+    df["DIAS_A_PAGAR"] = np.maximum(df["DIAS_UTEIS_MES"] - df["DIAS_DE_FERIAS"] - df["DIAS_AFASTADO"], 0)
+    print("Cálculo de dias úteis concluído.")
+    return df
+
+def apply_termination_rule(df, dataframes):
+    """
+    Anexa a data e o comunicado de desligamento e zera os dias a pagar de
+    quem teve o desligamento comunicado ("OK") até o dia limite.
+    """
+    print("Aplicando regra de desligamento...")
+    df["DATA_DEMISSAO"] = pd.NaT
+    desligados_df = dataframes.get("desligados")
+    if desligados_df is None or desligados_df.empty:
+        return df
+
+    demissao_col = first_column(desligados_df, DEMISSAO_COLS)
+    if demissao_col is None:
+        print("AVISO: Coluna de data de demissão não encontrada na base de desligados.")
+        return df
+
+    desligados = desligados_df.drop_duplicates(subset=[config.MATRICULA_COL], keep="last")
+    chave = _matricula_key(desligados[config.MATRICULA_COL])
+    # Sempre na resolução de config.COLUNAS_TIPOS, a mesma da coluna vazia
+    # acima: o resultado de um recorte (modo incremental) combina com o completo
+    data_demissao = pd.Series(pd.to_datetime(desligados[demissao_col], errors="coerce").to_numpy(dtype="datetime64[ns]"), index=chave)
+    df["DATA_DEMISSAO"] = df[config.MATRICULA_COL].map(data_demissao)
+
+    comunicado_ok = np.zeros(len(df), dtype=bool)
+    if "COMUNICADO_DE_DESLIGAMENTO" in desligados.columns:
+        comunicado = pd.Series(desligados["COMUNICADO_DE_DESLIGAMENTO"].astype("string").str.strip().str.upper().to_numpy(), index=chave)
+        comunicado_ok = (df[config.MATRICULA_COL].map(comunicado) == "OK").fillna(False).to_numpy(dtype=bool)
+
+    dia_demissao = df["DATA_DEMISSAO"].dt.day
+    condicao_nao_pagar = comunicado_ok & (dia_demissao <= config.DIA_LIMITE_DESLIGAMENTO).to_numpy(dtype=bool)
+    df.loc[condicao_nao_pagar, "DIAS_A_PAGAR"] = 0
+    print(f"{int(condicao_nao_pagar.sum())} colaboradores tiveram o benefício zerado.")
+    return df
+
+def apply_proportional_rules(df, periodo=None, calendario=None):
+    """
+    Aplica o pagamento proporcional em dias úteis para admitidos dentro do
+    período e para desligados após o dia limite.
+
+    Os dias trabalhados são contados no calendário de feriados do sindicato
+    de cada colaborador (`calendario`, construído para o período se
+    omitido) e levados à escala de DIAS_UTEIS_MES (ver `_month_scale`), de
+    modo que o total do mês vem sempre da mesma fonte.
+    """
+    print("Aplicando regras de pagamento proporcional...")
+    periodo = periodo or periodo_padrao()
+    if calendario is None:
+        nomes = df["SINDICATO"] if "SINDICATO" in df.columns else []
+        calendario = build_business_calendar(periodo, sindicato_locais(nomes))
+    chaves = df["SINDICATO_KEY"] if "SINDICATO_KEY" in df.columns else pd.Series(None, index=df.index, dtype="object")
+    inicio = np.datetime64(periodo["inicio"], "D")
+    fim_exclusivo = np.datetime64(periodo["fim"], "D") + np.timedelta64(1, "D")
+    dias = df["DIAS_A_PAGAR"].to_numpy(dtype="int64", copy=True)
+    dias_mes, dias_periodo = _month_basis(df, periodo, calendario)
+
+    # Admissões: dias úteis entre a admissão e o fim do período (férias ignoradas)
+    admissao_col = first_column(df, ADMISSAO_COLS)
+    if admissao_col is not None:
+        admissao = to_days(df[admissao_col])
+        admitidos = ~np.isnat(admissao) & (admissao >= inicio) & (admissao < fim_exclusivo)
+        if admitidos.any():
+            trabalhados = calendario.count(chaves[admitidos], admissao[admitidos], fim_exclusivo)
+            dias[admitidos] = _month_scale(trabalhados, dias_mes[admitidos], dias_periodo[admitidos])
+
+    # Desligamentos após o dia limite: dias úteis entre o início do período e a demissão
+    if "DATA_DEMISSAO" in df.columns:
+        demissao = to_days(df["DATA_DEMISSAO"])
+        valido = ~np.isnat(demissao)
+        dia = np.zeros(len(df), dtype="int64")
+        dia[valido] = df["DATA_DEMISSAO"].dt.day.to_numpy()[valido]
+        desligados = valido & (dia > config.DIA_LIMITE_DESLIGAMENTO)
+        if desligados.any():
+            # Limita ao fim do período e aos dias úteis já apurados para o sindicato
+            fim = np.minimum(demissao[desligados], fim_exclusivo)
+            trabalhados = calendario.count(chaves[desligados], inicio, fim)
+            dias[desligados] = np.minimum(dias[desligados], _month_scale(trabalhados, dias_mes[desligados], dias_periodo[desligados]))
+
+    df["DIAS_A_PAGAR"] = np.maximum(dias, 0)
+    print("Regras de proporcionalidade aplicadas.")
+    return df
+
+def calculate_vr_value(df, dataframes):
+    """
+    Calcula o valor diário pela UF do sindicato e divide o total entre
+    empresa e colaborador.
+    """
+    print("Iniciando cálculo do valor do VR...")
+    sindicatos_df = dataframes.get("sindicatos")
+    if sindicatos_df is None or sindicatos_df.empty or "VALOR" not in sindicatos_df.columns or "SINDICATO" not in df.columns:
+        print("ERRO: Planilha de sindicatos não encontrada.")
+        df["UF"] = None
+        df["VALOR_VR_DIARIO"] = 0.0
+    else:
+        # O índice de sindicatos já está em cache após calculate_working_days
+        sindicatos = resolve_sindicatos(df["SINDICATO"], dataframes.get("dias_uteis"), sindicatos_df)
+        df["UF"] = sindicatos["UF"]
+        df["VALOR_VR_DIARIO"] = sindicatos["VALOR_VR_DIARIO"]
+        print("Valor do VR calculado com base na UF do sindicato.")
+
+    df["VALOR_TOTAL_VR"] = df["DIAS_A_PAGAR"] * df["VALOR_VR_DIARIO"]
+    df["CUSTO_EMPRESA"] = df["VALOR_TOTAL_VR"] * config.PERCENTUAL_CUSTO_EMPRESA
+    df["CUSTO_COLABORADOR"] = df["VALOR_TOTAL_VR"] * config.PERCENTUAL_CUSTO_COLABORADOR
+    print("Cálculo do valor do VR concluído.")
+    return df
+
+def run_calculations_native(processed_dfs: dict, periodo: dict = None) -> pd.DataFrame:
+    """
+    Executa os cálculos de negócio de forma determinística e vetorizada,
+    sem chamadas ao LLM.
+
+    Args:
+        processed_dfs: Dicionário com os dataframes processados.
+        periodo: Período de apuração ({"inicio", "fim", "competencia"}).
+            Se None, usa o período configurado em `config`.
+
+    Returns:
+        O dataframe final com os resultados.
+    """
+    print("--- Iniciando motor nativo para cálculos ---")
+    funcionarios = processed_dfs.get("funcionarios")
+    if funcionarios is None or funcionarios.empty:
+        print("ERRO: Base de funcionários vazia. Nada a calcular.")
+        return pd.DataFrame()
+
+    with instrumentation.stage("run_calculations_native", "calculo", rows_in=len(funcionarios)) as span:
+        df = funcionarios.copy()
+        df[config.MATRICULA_COL] = _matricula_key(df[config.MATRICULA_COL])
+
+        periodo = periodo or periodo_padrao()
+        # Calendário único para o período: sindicatos dos colaboradores e da planilha de dias úteis
+        with instrumentation.stage("calendario", "calculo"):
+            dias_uteis_df = processed_dfs.get("dias_uteis")
+            nomes = list(df["SINDICATO"].dropna().unique()) if "SINDICATO" in df.columns else []
+            if dias_uteis_df is not None and "SINDICATO" in dias_uteis_df.columns:
+                nomes += list(dias_uteis_df["SINDICATO"].dropna())
+            calendario = build_business_calendar(periodo, sindicato_locais(nomes))
+
+            if not use_dias_uteis_sheet(dias_uteis_df, periodo):
+                print("Gerando dias úteis do mês pelo calendário de feriados...")
+                processed_dfs = derive(processed_dfs, dias_uteis=generate_dias_uteis(periodo, nomes, calendario))
+
+        with instrumentation.stage("calculate_working_days", "calculo"):
+            df = calculate_working_days(df, processed_dfs, periodo, calendario)
+        with instrumentation.stage("apply_termination_rule", "calculo"):
+            df = apply_termination_rule(df, processed_dfs)
+        with instrumentation.stage("apply_proportional_rules", "calculo"):
+            df = apply_proportional_rules(df, periodo, calendario)
+        with instrumentation.stage("calculate_vr_value", "calculo"):
+            df = calculate_vr_value(df, processed_dfs)
+        df["COMPETENCIA"] = pd.Timestamp(periodo["competencia"])
+        span.set(rows_out=len(df))
+
+    print("--- Motor nativo finalizou a execução ---")
+    return df.reset_index(drop=True)
@@ -3,66 +3,176 @@
 # Created on: 2025-08-17
 # ------------------------------------------------------------
 # Libs:
-import pandas as pd
 import os
+import openpyxl
+import pandas as pd
 from src import config
+from src import instrumentation
+
+# Colunas de fallback caso o template não possa ser lido
+DEFAULT_TEMPLATE_COLUMNS = ['Matricula', 'Nome Completo', 'Valor a ser creditado']
+
+# Mapeia as colunas do template para as colunas do df calculado
+# (os nomes podem variar, então fazemos um mapeamento explícito;
+# uma tupla indica nomes alternativos, na ordem de preferência)
+COLUMN_MAPPING = {
+    'Matricula': config.MATRICULA_COL,
+    # 'Nome Completo': 'NOME_COMPLETO', # Assumindo que este é o nome da coluna no df
+    'Admissão': ('ADMISSAO', 'ADMISS_O'),
+    'Sindicato do Colaborador': 'SINDICATO',
+    'Competência': 'COMPETENCIA',
+    'Dias': 'DIAS_A_PAGAR',
+    'VALOR DIÁRIO VR': 'VALOR_VR_DIARIO',
+    'TOTAL': 'VALOR_TOTAL_VR',
+    'Valor a ser creditado': 'VALOR_TOTAL_VR',
+    'Custo empresa': 'CUSTO_EMPRESA',
+    'Desconto profissional': 'CUSTO_COLABORADOR'
+}
+
+# Cabeçalhos de template já lidos, por (caminho, mtime)
+_TEMPLATE_CACHE = {}
+
+# ------------------------------------------------------------
+def get_template_columns(path=None, header_row=1):
+    """
+    Retorna a ordem e os nomes exatos das colunas do template de VR.
+
+    Lê apenas a linha de cabeçalho (openpyxl em modo somente leitura) e
+    guarda o resultado em memória enquanto o arquivo não mudar.
+    """
+    path = path or config.FILE_PATHS["template_vr"]
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    if key not in _TEMPLATE_CACHE:
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(min_row=header_row + 1, max_row=header_row + 1, values_only=True)
+            header = next(rows, ())
+        finally:
+            workbook.close()
+        columns = [str(col).strip() if col is not None else f"Unnamed: {i}" for i, col in enumerate(header)]
+        # Remove colunas vazias à direita
+        while columns and columns[-1].startswith("Unnamed"):
+            columns.pop()
+        _TEMPLATE_CACHE[key] = columns
+    return list(_TEMPLATE_CACHE[key])
 
-# --- CÓDIGO REFERÊNCIA ---
-def generate_report(df):
+def build_output_frame(df, template_columns):
+    """
+    Monta o DataFrame de saída na ordem do template, de uma só vez.
+    Colunas que já estão no formato do template são usadas diretamente.
+    """
+    columns = {}
+    for template_col in template_columns:
+        if template_col in df.columns:
+            columns[template_col] = df[template_col].to_numpy()
+            continue
+        source = COLUMN_MAPPING.get(template_col)
+        candidates = source if isinstance(source, tuple) else (source,)
+        source_col = next((c for c in candidates if c is not None and c in df.columns), None)
+        if source_col is not None:
+            columns[template_col] = df[source_col].to_numpy()
+        else:
+            # Se a coluna de origem não existir, cria uma coluna vazia no output
+            columns[template_col] = None
+            if source is not None:
+                print(f"AVISO: Coluna de origem '{source}' não encontrada. Coluna '{template_col}' ficará vazia.")
+    return pd.DataFrame(columns, index=range(len(df)))
+
+def _iter_rows(output_df, chunk_size=50_000):
+    """Gera as linhas como tuplas de objetos Python (nulos -> None), em blocos."""
+    for start in range(0, len(output_df), chunk_size):
+        chunk = output_df.iloc[start:start + chunk_size].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        yield from chunk.itertuples(index=False, name=None)
+
+def write_excel(output_df, path, engine=None):
+    """
+    Grava o DataFrame em .xlsx linha a linha, com memória constante:
+    xlsxwriter em modo `constant_memory` quando disponível, senão openpyxl
+    em modo `write_only`.
+    """
+    engine = engine or config.EXCEL_WRITER_ENGINE
+    if engine in ("auto", "xlsxwriter"):
+        try:
+            import xlsxwriter
+        except ImportError:
+            if engine == "xlsxwriter":
+                raise
+            engine = "openpyxl"
+        else:
+            engine = "xlsxwriter"
+
+    header = [str(col) for col in output_df.columns]
+    if engine == "xlsxwriter":
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "default_date_format": "dd/mm/yyyy"})
+        try:
+            worksheet = workbook.add_worksheet()
+            worksheet.write_row(0, 0, header)
+            for i, row in enumerate(_iter_rows(output_df), start=1):
+                worksheet.write_row(i, 0, row)
+        finally:
+            workbook.close()
+    else:
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet()
+        worksheet.append(header)
+        for row in _iter_rows(output_df):
+            worksheet.append(row)
+        workbook.save(path)
+
+def generate_report(df, formats=None, output_file=None):
     """
     Gera a planilha final para a operadora de VR, usando o arquivo
     'VR MENSAL 05.2025.xlsx' como base para as colunas.
+
+    Além do .xlsx, pode gravar cópias em CSV e Parquet (`formats`, padrão:
+    `config.OUTPUT_FORMATS`). `output_file` substitui `config.OUTPUT_FILE`.
     """
+    with instrumentation.stage("generate_report", "relatorio", rows_in=len(df)):
+        _generate_report(df, formats, output_file)
+
+def _generate_report(df, formats, output_file):
+    """Corpo de `generate_report` (medido como uma única etapa)."""
     print("Iniciando geração do relatório final...")
-    
+
     if df.empty:
         print("AVISO: DataFrame final está vazio. Nenhum relatório será gerado.")
         return
 
     try:
-        # Carrega o template para obter a ordem e os nomes exatos das colunas
-        template_df = pd.read_excel(config.FILE_PATHS["template_vr"], header=1)
-        template_columns = template_df.columns.tolist()
+        # Obtém do template a ordem e os nomes exatos das colunas
+        template_columns = get_template_columns()
     except Exception as e:
         print(f"ERRO: Falha ao ler o template '{config.FILE_PATHS['template_vr']}'. Usando colunas padrão. Erro: {e}")
-        # Colunas de fallback caso o template não possa ser lido
-        template_columns = ['Matricula', 'Nome Completo', 'Valor a ser creditado']
-
-    # Cria um novo DataFrame para o output
-    output_df = pd.DataFrame()
-
-    # Mapeia as colunas do nosso df calculado para as colunas do template
-    # (os nomes podem variar, então fazemos um mapeamento explícito)
-    mapping = {
-        'Matricula': config.MATRICULA_COL,
-        # 'Nome Completo': 'NOME_COMPLETO', # Assumindo que este é o nome da coluna no df
-        'Valor a ser creditado': 'VALOR_TOTAL_VR',
-        'Custo empresa': 'CUSTO_EMPRESA',
-        'Desconto profissional': 'CUSTO_COLABORADOR'
-    }
+        template_columns = DEFAULT_TEMPLATE_COLUMNS
 
     print("Mapeando colunas para o formato final...")
-    for template_col, source_col in mapping.items():
-        if source_col in df.columns:
-            # Renomeia a coluna do nosso df para corresponder ao template
-            output_df[template_col] = df[source_col]
-        else:
-            # Se a coluna de origem não existir, cria uma coluna vazia no output
-            output_df[template_col] = None
-            print(f"AVISO: Coluna de origem '{source_col}' não encontrada. Coluna '{template_col}' ficará vazia.")
-
-    # Garante que todas as colunas do template existam no arquivo final, na ordem correta
-    for col in template_columns:
-        if col not in output_df.columns:
-            output_df[col] = None
-    
-    output_df = output_df[template_columns]
+    with instrumentation.stage("build_output_frame", "relatorio", rows_in=len(df)):
+        output_df = build_output_frame(df, template_columns)
 
     # Salva o arquivo final
+    formats = config.OUTPUT_FORMATS if formats is None else formats
+    output_file = output_file or config.OUTPUT_FILE
+    base_path = os.path.splitext(output_file)[0]
     try:
-        os.makedirs(config.OUTPUT_DIR, exist_ok=True)
-        print(f"Salvando relatório em '{config.OUTPUT_FILE}'...")
-        output_df.to_excel(config.OUTPUT_FILE, index=False)
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        for fmt in formats:
+            with instrumentation.stage(f"write:{fmt}", "relatorio", rows_in=len(output_df)):
+                if fmt == "xlsx":
+                    print(f"Salvando relatório em '{output_file}'...")
+                    write_excel(output_df, output_file)
+                elif fmt == "csv":
+                    print(f"Salvando relatório em '{base_path}.csv'...")
+                    output_df.to_csv(f"{base_path}.csv", index=False, sep=";", encoding="utf-8-sig")
+                elif fmt == "parquet":
+                    print(f"Salvando relatório em '{base_path}.parquet'...")
+                    # Parquet exige colunas com tipo único: o texto vai como string
+                    parquet_df = output_df.copy()
+                    for col in parquet_df.columns[parquet_df.dtypes == object]:
+                        parquet_df[col] = parquet_df[col].astype("string")
+                    parquet_df.to_parquet(f"{base_path}.parquet", index=False)
+                else:
+                    print(f"AVISO: Formato de saída '{fmt}' não suportado. Ignorando.")
         print("Relatório final gerado com sucesso!")
     except Exception as e:
-        print(f"ERRO: Falha ao salvar o relatório final: {e}")
\ No newline at end of file
+        print(f"ERRO: Falha ao salvar o relatório final: {e}")
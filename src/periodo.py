@@ -0,0 +1,62 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import re
+import pandas as pd
+from src import config
+
+# Período no título de uma planilha, com ou sem o ano
+# (ex: "BASE DIAS UTEIS DE 15/04 a 15/05" ou "DE 15/04/2025 a 15/05/2025")
+PERIODO_TITULO = re.compile(r"(\d{1,2})/(\d{1,2})(?:/(\d{4}))?\s*A\s*(\d{1,2})/(\d{1,2})(?:/(\d{4}))?", re.IGNORECASE)
+
+# ------------------------------------------------------------
+def periodo_padrao():
+    """Período de apuração configurado em `config` (execução de um único mês)."""
+    return {
+        "inicio": config.PERIODO_INICIO,
+        "fim": config.PERIODO_FIM,
+        "competencia": config.COMPETENCIA,
+    }
+
+def periodo_da_competencia(competencia):
+    """
+    Calcula o período de apuração de uma competência ("AAAA-MM"): do dia
+    seguinte ao corte no mês anterior até o dia de corte do próprio mês
+    (ex: "2025-05" -> 16/04/2025 a 15/05/2025).
+    """
+    mes = pd.Period(competencia, freq="M")
+    fim = mes.to_timestamp() + pd.Timedelta(days=config.DIA_CORTE_PERIODO - 1)
+    inicio = (mes - 1).to_timestamp() + pd.Timedelta(days=config.DIA_CORTE_PERIODO)
+    return {
+        "inicio": inicio.strftime("%Y-%m-%d"),
+        "fim": fim.strftime("%Y-%m-%d"),
+        "competencia": mes.to_timestamp().strftime("%Y-%m-%d"),
+    }
+
+def periodo_do_titulo(titulo, ano=None):
+    """
+    Período do título de uma planilha, como (pd.Timestamp inicial,
+    pd.Timestamp final), ou None se o título não o trouxer. Sem o ano no
+    título, o fim é do ano `ano` (padrão: o de `config.COMPETENCIA`).
+    """
+    match = PERIODO_TITULO.search(titulo or "")
+    if match is None:
+        return None
+    dia_inicio, mes_inicio, ano_inicio, dia_fim, mes_fim, ano_fim = match.groups()
+    dia_inicio, mes_inicio, dia_fim, mes_fim = int(dia_inicio), int(mes_inicio), int(dia_fim), int(mes_fim)
+    # Período que vira o ano (ex: 16/12 a 15/01): o início é do ano anterior ao fim
+    virada = mes_inicio > mes_fim
+    if ano_fim is not None:
+        ano_fim = int(ano_fim)
+    elif ano_inicio is not None:
+        ano_fim = int(ano_inicio) + virada
+    else:
+        ano_fim = ano or pd.Timestamp(config.COMPETENCIA).year
+    ano_inicio = int(ano_inicio) if ano_inicio is not None else ano_fim - virada
+    return pd.Timestamp(ano_inicio, mes_inicio, dia_inicio), pd.Timestamp(ano_fim, mes_fim, dia_fim)
+
+def formatar_data(data):
+    """Data ISO -> "DD/MM/AAAA" (formato usado no prompt do agente)."""
+    return pd.Timestamp(data).strftime("%d/%m/%Y")
@@ -0,0 +1,233 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import os
+import numpy as np
+import pandas as pd
+import openpyxl
+from src import config
+from src import instrumentation
+from src.data_loader import clean_column_name
+from src.output_generator import COLUMN_MAPPING
+
+# Valores comparados por colaborador, na ordem do relatório (cada um é um
+# bit da máscara de divergências)
+VALORES_CONCILIADOS = ["DIAS_A_PAGAR", "VALOR_VR_DIARIO", "VALOR_TOTAL_VR", "CUSTO_EMPRESA", "CUSTO_COLABORADOR"]
+
+STATUS_OK = "OK"
+STATUS_DIVERGENTE = "DIVERGENTE"
+STATUS_NOVO = "NOVO"            # só no cálculo atual
+STATUS_REMOVIDO = "REMOVIDO"    # só na referência
+
+# Linhas lidas no início da planilha para achar o cabeçalho (o VR MENSAL tem
+# uma linha de título acima dele; o relatório gerado começa no cabeçalho)
+LINHAS_BUSCA_CABECALHO = 10
+
+# ------------------------------------------------------------
+def _column_names():
+    """Nome limpo (`clean_column_name`) de cada coluna do layout VR MENSAL -> nome interno."""
+    nomes = {}
+    for template_col, source in COLUMN_MAPPING.items():
+        interno = source[0] if isinstance(source, tuple) else source
+        nomes.setdefault(clean_column_name(template_col), interno)
+    return nomes
+
+def _read_excel(path):
+    """
+    Lê uma planilha no layout VR MENSAL (ou o relatório gerado) em modo
+    somente leitura, só com as colunas conciliadas; o cabeçalho é a primeira
+    linha que tem a coluna de matrícula.
+    """
+    nomes = _column_names()
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        selected = {}
+        for _ in range(LINHAS_BUSCA_CABECALHO):
+            header = next(rows, None)
+            if header is None:
+                break
+            limpos = [clean_column_name(col) if col is not None else None for col in header]
+            if config.MATRICULA_COL in limpos:
+                for i, col in enumerate(limpos):
+                    interno = nomes.get(col, col)
+                    if interno in (config.MATRICULA_COL, "SINDICATO", *VALORES_CONCILIADOS) and interno not in selected.values():
+                        selected[i] = interno
+                break
+        if not selected:
+            raise ValueError(f"coluna de matrícula não encontrada nas {LINHAS_BUSCA_CABECALHO} primeiras linhas")
+        indexes = list(selected)
+        registros = []
+        for row in rows:
+            values = tuple(row[i] if i < len(row) else None for i in indexes)
+            if values[0] is None:
+                continue
+            registros.append(values)
+    finally:
+        workbook.close()
+    return pd.DataFrame.from_records(registros, columns=list(selected.values()))
+
+def load_reference(path):
+    """
+    Carrega o arquivo de referência da conciliação: a compra de VR de um mês
+    anterior (.xlsx no layout VR MENSAL, ou o .csv/.parquet do relatório) ou
+    o resultado de outro motor gravado por `calculate` (.pkl).
+    """
+    extensao = os.path.splitext(path)[1].lower()
+    if extensao == ".pkl":
+        return pd.read_pickle(path)
+    if extensao == ".parquet":
+        return pd.read_parquet(path)
+    if extensao == ".csv":
+        # O relatório em CSV usa ";" (ver output_generator)
+        df = pd.read_csv(path, sep=";", encoding="utf-8-sig")
+        return df if len(df.columns) > 1 else pd.read_csv(path, encoding="utf-8-sig")
+    return _read_excel(path)
+
+def _standardize(df):
+    """
+    Matrícula (Int64), sindicato e valores conciliados (float) de um
+    resultado, com os nomes internos. Aceita o layout VR MENSAL, o relatório
+    gerado ou a saída de um motor.
+    """
+    nomes = _column_names()
+    renomear = {}
+    for col in df.columns:
+        limpo = clean_column_name(col)
+        interno = limpo if limpo in (config.MATRICULA_COL, "SINDICATO", *VALORES_CONCILIADOS) else nomes.get(limpo)
+        if interno is not None and interno not in renomear.values() and (col == interno or interno not in df.columns):
+            renomear[col] = interno
+    df = df[list(renomear)].rename(columns=renomear)
+    if config.MATRICULA_COL not in df.columns:
+        raise ValueError(f"coluna '{config.MATRICULA_COL}' não encontrada")
+    saida = pd.DataFrame({config.MATRICULA_COL: pd.to_numeric(df[config.MATRICULA_COL], errors="coerce").round().astype("Int64")})
+    saida["SINDICATO"] = df["SINDICATO"].astype("object") if "SINDICATO" in df.columns else None
+    for col in VALORES_CONCILIADOS:
+        saida[col] = pd.to_numeric(df[col], errors="coerce").astype("float64") if col in df.columns else np.nan
+    return saida[saida[config.MATRICULA_COL].notna()]
+
+def _drop_duplicates(df, lado):
+    duplicadas = df[config.MATRICULA_COL].duplicated()
+    if duplicadas.any():
+        print(f"AVISO: {int(duplicadas.sum())} matrícula(s) repetida(s) no {lado}; a conciliação usa a primeira linha de cada uma.")
+        df = df[~duplicadas.to_numpy()]
+    return df
+
+def _divergence_reasons(mascara):
+    """Máscara de bits -> colunas divergentes separadas por ';' (um texto por máscara distinta)."""
+    distintos = {
+        m: ";".join(col for bit, col in enumerate(VALORES_CONCILIADOS) if m & (1 << bit))
+        for m in pd.unique(mascara)
+    }
+    return pd.Series(mascara).map(distintos).to_numpy()
+
+def reconcile(atual, referencia, tolerancias=None, tolerancia_relativa=None):
+    """
+    Compara, por matrícula, o resultado calculado com uma referência (compra
+    do mês anterior ou saída de outro motor).
+
+    Uma diferença é divergência quando passa da tolerância absoluta da
+    coluna (`tolerancias`, padrão `config.RECONCILIACAO_TOLERANCIAS`) e da
+    fração `tolerancia_relativa` do valor de referência (padrão
+    `config.RECONCILIACAO_TOLERANCIA_RELATIVA`). Matrículas que só existem
+    de um lado entram como NOVO/REMOVIDO, com o outro lado valendo zero.
+
+    Returns:
+        DataFrame com uma linha por matrícula: STATUS, MOTIVO (colunas
+        divergentes), valores ATUAL/REFERENCIA e DIF_<coluna>, ordenado pela
+        maior diferença absoluta do total.
+    """
+    tolerancias = {**config.RECONCILIACAO_TOLERANCIAS, **(tolerancias or {})}
+    tolerancia_relativa = config.RECONCILIACAO_TOLERANCIA_RELATIVA if tolerancia_relativa is None else tolerancia_relativa
+    a = _drop_duplicates(_standardize(atual), "cálculo atual")
+    r = _drop_duplicates(_standardize(referencia), "arquivo de referência")
+
+    m = a.merge(r, on=config.MATRICULA_COL, how="outer", suffixes=("_ATUAL", "_REFERENCIA"), indicator=True, sort=False)
+    lado = m.pop("_merge").to_numpy()
+    resultado = pd.DataFrame({
+        config.MATRICULA_COL: m[config.MATRICULA_COL].to_numpy(),
+        "SINDICATO": m["SINDICATO_ATUAL"].where(m["SINDICATO_ATUAL"].notna(), m["SINDICATO_REFERENCIA"]).to_numpy(),
+    })
+
+    mascara = np.zeros(len(m), dtype=np.int64)
+    for bit, col in enumerate(VALORES_CONCILIADOS):
+        valor_atual = m[f"{col}_ATUAL"].to_numpy(dtype="float64", na_value=np.nan)
+        valor_ref = m[f"{col}_REFERENCIA"].to_numpy(dtype="float64", na_value=np.nan)
+        diferenca = np.nan_to_num(valor_atual) - np.nan_to_num(valor_ref)
+        limite = np.maximum(tolerancias.get(col, 0.0), tolerancia_relativa * np.abs(np.nan_to_num(valor_ref)))
+        # Pequena folga para erros de arredondamento de ponto flutuante
+        mascara |= (np.abs(diferenca) > limite + 1e-9).astype(np.int64) << bit
+        resultado[f"{col}_ATUAL"] = valor_atual
+        resultado[f"{col}_REFERENCIA"] = valor_ref
+        resultado[f"DIF_{col}"] = diferenca
+
+    status = np.where(mascara != 0, STATUS_DIVERGENTE, STATUS_OK).astype(object)
+    status[lado == "left_only"] = STATUS_NOVO
+    status[lado == "right_only"] = STATUS_REMOVIDO
+    resultado.insert(2, "STATUS", status)
+    # MOTIVO só descreve matrículas presentes nos dois lados
+    resultado.insert(3, "MOTIVO", _divergence_reasons(np.where(lado == "both", mascara, 0)))
+
+    ordem = np.argsort(-np.abs(resultado["DIF_VALOR_TOTAL_VR"].to_numpy()), kind="stable")
+    return resultado.iloc[ordem].reset_index(drop=True)
+
+def reconciliation_summary(resultado):
+    """Colaboradores e totais (atual, referência e diferença) por status, com a linha TOTAL."""
+    grupos = resultado.groupby("STATUS", sort=False).agg(
+        COLABORADORES=(config.MATRICULA_COL, "size"),
+        TOTAL_ATUAL=("VALOR_TOTAL_VR_ATUAL", "sum"),
+        TOTAL_REFERENCIA=("VALOR_TOTAL_VR_REFERENCIA", "sum"),
+        DIFERENCA=("DIF_VALOR_TOTAL_VR", "sum"),
+    )
+    ordem = [s for s in (STATUS_OK, STATUS_DIVERGENTE, STATUS_NOVO, STATUS_REMOVIDO) if s in grupos.index]
+    resumo = grupos.loc[ordem].reset_index()
+    total = resumo.drop(columns="STATUS").sum().to_frame().T.assign(STATUS="TOTAL")
+    resumo = pd.concat([resumo, total[resumo.columns]], ignore_index=True)
+    resumo["COLABORADORES"] = resumo["COLABORADORES"].astype("int64")
+    return resumo.round(2)
+
+def divergences_by_column(resultado):
+    """Número de colaboradores divergentes em cada valor conciliado."""
+    divergentes = resultado.loc[resultado["STATUS"] == STATUS_DIVERGENTE, "MOTIVO"]
+    return {col: int(divergentes.str.contains(col, regex=False).sum()) for col in VALORES_CONCILIADOS}
+
+def run_reconciliation(final_df, referencia, tolerancias=None, tolerancia_relativa=None, output_file=None):
+    """
+    Concilia o resultado com a referência (caminho do arquivo ou DataFrame),
+    imprime o resumo e grava o relatório compacto de discrepâncias: só as
+    linhas fora de OK em `output_file` (padrão: `config.RECONCILIACAO_FILE`)
+    e o resumo por status em `<output_file>_resumo.csv`.
+
+    Returns:
+        O DataFrame completo da conciliação (ver `reconcile`).
+    """
+    with instrumentation.stage("reconcile", "relatorio", rows_in=len(final_df)) as span:
+        if isinstance(referencia, str):
+            print(f"Conciliando com '{referencia}'...")
+            with instrumentation.stage("load_reference", "relatorio"):
+                referencia = load_reference(referencia)
+        resultado = reconcile(final_df, referencia, tolerancias, tolerancia_relativa)
+        resumo = reconciliation_summary(resultado)
+        discrepancias = resultado[resultado["STATUS"] != STATUS_OK]
+        span.set(rows_out=len(discrepancias))
+
+        print("--- Conciliação ---")
+        print(resumo.to_string(index=False))
+        por_coluna = {col: n for col, n in divergences_by_column(resultado).items() if n}
+        if por_coluna:
+            print("Divergências por coluna: " + ", ".join(f"{col}={n}" for col, n in por_coluna.items()))
+        if not discrepancias.empty:
+            colunas = [config.MATRICULA_COL, "STATUS", "MOTIVO", *(f"DIF_{col}" for col in VALORES_CONCILIADOS)]
+            print(discrepancias[colunas].head(10).to_string(index=False))
+
+        output_file = output_file or config.RECONCILIACAO_FILE
+        try:
+            os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+            discrepancias.to_csv(output_file, index=False, sep=";", encoding="utf-8-sig")
+            resumo.to_csv(f"{os.path.splitext(output_file)[0]}_resumo.csv", index=False, sep=";", encoding="utf-8-sig")
+            print(f"Discrepâncias ({len(discrepancias)} linhas) gravadas em '{output_file}'.")
+        except OSError as e:
+            print(f"ERRO: Falha ao salvar o relatório de conciliação: {e}")
+    return resultado
@@ -0,0 +1,356 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import io
+import ast
+import sys
+import pickle
+import signal
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from src import config
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ------------------------------------------------------------
+class ReplWorkerError(Exception):
+    """Falha ao executar código no processo do worker (erro, limite ou worker encerrado)."""
+
+class _CPUEsgotada(Exception):
+    pass
+
+# ------------------------------------------------------------
+# Transporte das bases: Arrow IPC em memória compartilhada (sem pickle nem
+# passagem dos dados pelo pipe; o outro processo copia o conteúdo uma vez e
+# fecha o segmento em seguida). Bases
+# que o Arrow não representa (ex: colunas object com tipos misturados) vão
+# por pickle.
+def _export_frame(df):
+    """Grava um DataFrame em um segmento de memória compartilhada; retorna o descritor."""
+    if pa is not None:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, TypeError, ValueError):
+            table = None
+        if table is not None:
+            medida = pa.MockOutputStream()
+            with pa.ipc.new_stream(medida, table.schema) as writer:
+                writer.write_table(table)
+            tamanho = medida.size()
+            shm = shared_memory.SharedMemory(create=True, size=max(tamanho, 1))
+            destino = pa.FixedSizeBufferWriter(pa.py_buffer(shm.buf))
+            try:
+                with pa.ipc.new_stream(destino, table.schema) as writer:
+                    writer.write_table(table)
+            finally:
+                # O segmento só pode ser fechado sem referências ao buffer
+                writer = destino = table = None
+                shm.close()
+            return {"formato": "arrow", "shm": shm.name, "tamanho": tamanho}
+    return {"formato": "pickle", "dados": pickle.dumps(df, protocol=5)}
+
+def _import_frame(desc, unlink=False):
+    """
+    Lê um DataFrame exportado por `_export_frame`. O conteúdo é copiado uma
+    vez para a memória do processo e o segmento é fechado logo em seguida
+    (e removido, com `unlink`): nenhuma coluna do DataFrame aponta para ele.
+    """
+    if desc["formato"] == "pickle":
+        return pickle.loads(desc["dados"])
+    shm = shared_memory.SharedMemory(name=desc["shm"])
+    try:
+        dados = pa.py_buffer(bytes(shm.buf[:desc["tamanho"]]))
+    finally:
+        shm.close()
+        if unlink:
+            shm.unlink()
+    return pa.ipc.open_stream(dados).read_all().to_pandas()
+
+def _release(desc):
+    """Remove o segmento de um descritor que não foi (ou não será) lido."""
+    if desc.get("formato") != "arrow":
+        return
+    try:
+        shm = shared_memory.SharedMemory(name=desc["shm"])
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+# ------------------------------------------------------------
+# Processo do worker
+class _LimitedOutput(io.TextIOBase):
+    """stdout do worker: guarda só os primeiros `limite` caracteres e conta o total."""
+
+    def __init__(self, limite):
+        self.limite = limite
+        self.total = 0
+        self._partes = []
+        self._guardados = 0
+
+    def writable(self):
+        return True
+
+    def write(self, texto):
+        self.total += len(texto)
+        if self._guardados < self.limite:
+            parte = texto[: self.limite - self._guardados]
+            self._partes.append(parte)
+            self._guardados += len(parte)
+        return len(texto)
+
+    def getvalue(self):
+        return "".join(self._partes)
+
+def _on_sigxcpu(signum, frame):
+    raise _CPUEsgotada()
+
+def _limit_memory(memoria_mb):
+    """Limite de memória do processo: RLIMIT_DATA (heap e mmaps privados) no Linux, senão RLIMIT_AS."""
+    if resource is None or not memoria_mb:
+        return
+    limite = int(memoria_mb) * 1024 * 1024
+    tipo = getattr(resource, "RLIMIT_DATA", None) if sys.platform.startswith("linux") else None
+    resource.setrlimit(tipo if tipo is not None else resource.RLIMIT_AS, (limite, limite))
+
+def _limit_cpu(cpu_s):
+    """Próximo limite de CPU: o tempo já usado pelo processo + `cpu_s` (None = sem limite)."""
+    if resource is None:
+        return
+    _, maximo = resource.getrlimit(resource.RLIMIT_CPU)
+    if cpu_s:
+        uso = resource.getrusage(resource.RUSAGE_SELF)
+        limite = int(uso.ru_utime + uso.ru_stime + cpu_s) + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (limite if maximo == resource.RLIM_INFINITY else min(limite, maximo), maximo))
+    else:
+        resource.setrlimit(resource.RLIMIT_CPU, (maximo, maximo))
+
+def _describe_error(e):
+    if isinstance(e, _CPUEsgotada):
+        return "TimeoutError: limite de tempo de CPU por execução excedido"
+    if isinstance(e, MemoryError):
+        return "MemoryError: limite de memória do worker excedido"
+    return f"{type(e).__name__}: {e}"
+
+def _run_code(namespace, code, cpu_s, saida_max):
+    """
+    Executa o código como o PythonAstREPLTool: todas as instruções e, se a
+    última for uma expressão, o seu valor é acrescentado à saída.
+    """
+    saida = _LimitedOutput(saida_max)
+    stdout = sys.stdout
+    erro = None
+    _limit_cpu(cpu_s)
+    try:
+        sys.stdout = saida
+        tree = ast.parse(code)
+        ultima = tree.body[-1] if tree.body and isinstance(tree.body[-1], ast.Expr) else None
+        if ultima is not None:
+            tree.body = tree.body[:-1]
+        exec(compile(tree, "<agent>", "exec"), namespace)
+        if ultima is not None:
+            valor = eval(compile(ast.Expression(ultima.value), "<agent>", "eval"), namespace)
+            if valor is not None:
+                print(valor)
+    except BaseException as e:
+        if isinstance(e, (KeyboardInterrupt, SystemExit)):
+            raise
+        erro = _describe_error(e)
+        saida.write(erro)
+    finally:
+        sys.stdout = stdout
+        _limit_cpu(None)
+    return {"ok": True, "saida": saida.getvalue(), "total": saida.total, "erro": erro}
+
+def _evaluate(namespace, expressao, cpu_s):
+    """Avalia uma expressão; DataFrames voltam em Arrow, os demais valores só pelo tipo."""
+    _limit_cpu(cpu_s)
+    try:
+        valor = eval(expressao, namespace)
+    except BaseException as e:
+        if isinstance(e, (KeyboardInterrupt, SystemExit)):
+            raise
+        return {"ok": False, "erro": _describe_error(e), "nome_ausente": isinstance(e, NameError)}
+    finally:
+        _limit_cpu(None)
+    if isinstance(valor, pd.DataFrame):
+        return {"ok": True, "frame": _export_frame(valor)}
+    return {"ok": True, "tipo": type(valor).__name__}
+
+def _worker_main(conn, memoria_mb):
+    """Laço do processo do worker: carrega as bases e executa os pedidos do processo principal."""
+    _limit_memory(memoria_mb)
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+    namespace = {"pd": pd, "np": np}
+    while True:
+        try:
+            pedido = conn.recv()
+        except (EOFError, OSError):
+            break
+        operacao = pedido[0]
+        if operacao == "close":
+            break
+        try:
+            if operacao == "load":
+                # O processo principal remove os segmentos depois da carga
+                namespace.update({name: _import_frame(desc) for name, desc in pedido[1].items()})
+                resposta = {"ok": True}
+            elif operacao == "run":
+                resposta = _run_code(namespace, pedido[1], pedido[2], pedido[3])
+            elif operacao == "eval":
+                resposta = _evaluate(namespace, pedido[1], pedido[2])
+            else:
+                resposta = {"ok": False, "erro": f"operação desconhecida: {operacao}"}
+        except BaseException as e:
+            resposta = {"ok": False, "erro": _describe_error(e)}
+        conn.send(resposta)
+    conn.close()
+
+# ------------------------------------------------------------
+class ReplWorker:
+    """
+    Ferramenta Python do agente em um processo separado e persistente.
+
+    As bases são enviadas uma vez (Arrow em memória compartilhada) e as
+    variáveis criadas pelo agente ficam no processo do worker entre as
+    chamadas. Cada execução tem limite de tempo de CPU (`cpu_s`, sinal
+    SIGXCPU) e de tempo total (`timeout_s`: o worker é encerrado e recriado
+    com as bases originais); o processo tem limite de memória (`memoria_mb`)
+    e a saída impressa é cortada em `saida_max` caracteres já no worker.
+    Limites de CPU e memória dependem do módulo `resource` (Linux/macOS).
+    """
+
+    def __init__(self, dataframes, cpu_s=None, timeout_s=None, memoria_mb=None, saida_max=None):
+        self.dataframes = dataframes
+        self.cpu_s = config.AGENT_REPL_CPU_S if cpu_s is None else cpu_s
+        self.timeout_s = config.AGENT_REPL_TIMEOUT_S if timeout_s is None else timeout_s
+        self.memoria_mb = config.AGENT_REPL_MEMORIA_MB if memoria_mb is None else memoria_mb
+        self.saida_max = config.AGENT_TOOL_OUTPUT_MAX_CHARS if saida_max is None else saida_max
+        self.reinicios = 0
+        self._conn = None
+        self._processo = None
+        if pa is None:
+            print("AVISO: pyarrow não instalado; as bases vão ao worker por pickle (pip install pyarrow).")
+        self._start()
+
+    def _start(self):
+        contexto = multiprocessing.get_context("spawn")
+        self._conn, filho = contexto.Pipe()
+        self._processo = contexto.Process(target=_worker_main, args=(filho, self.memoria_mb), daemon=True, name="repl-worker")
+        self._processo.start()
+        filho.close()
+        descritores = {name: _export_frame(df) for name, df in self.dataframes.items() if isinstance(df, pd.DataFrame)}
+        try:
+            # A carga das bases não conta no limite de tempo das execuções
+            self._request(("load", descritores), timeout=None)
+        finally:
+            for desc in descritores.values():
+                _release(desc)
+
+    def _kill(self):
+        if self._processo is not None and self._processo.is_alive():
+            self._processo.kill()
+            self._processo.join()
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = self._processo = None
+
+    def _restart(self, motivo):
+        self._kill()
+        self.reinicios += 1
+        self._start()
+        return (
+            f"{motivo}. O worker Python foi reiniciado: as variáveis criadas até aqui foram perdidas "
+            "e as bases originais foram recarregadas."
+        )
+
+    def _request(self, pedido, timeout):
+        """Envia um pedido e espera a resposta; ReplWorkerError se o worker morrer ou passar do tempo."""
+        try:
+            self._conn.send(pedido)
+            if timeout and not self._conn.poll(timeout):
+                raise ReplWorkerError(f"TimeoutError: execução passou de {timeout}s")
+            return self._conn.recv()
+        except (EOFError, OSError) as e:
+            self._processo.join(timeout=1)
+            raise ReplWorkerError(f"Worker encerrado inesperadamente (código de saída {self._processo.exitcode})") from e
+
+    def run(self, code):
+        """Executa código do agente e retorna a saída (texto limitado) para o prompt."""
+        from src.agent_compiler import sanitize_code
+        try:
+            resposta = self._request(("run", sanitize_code(code), self.cpu_s, self.saida_max), self.timeout_s)
+        except ReplWorkerError as e:
+            return self._restart(str(e))
+        if not resposta.get("ok"):
+            return resposta.get("erro", "")
+        saida = resposta["saida"]
+        if resposta["total"] > self.saida_max:
+            saida = f"{saida}\n... (saída truncada: {resposta['total']} caracteres; use .head(), .shape ou .value_counts())"
+        return saida
+
+    def execute(self, code):
+        """
+        Executa um script (ex: o compilado de uma sessão) com os mesmos
+        limites; ReplWorkerError se ele falhar ou passar dos limites.
+        """
+        try:
+            resposta = self._request(("run", code, self.cpu_s, self.saida_max), self.timeout_s)
+        except ReplWorkerError as e:
+            self._restart(str(e))
+            raise
+        if not resposta.get("ok") or resposta.get("erro"):
+            raise ReplWorkerError(resposta.get("erro"))
+
+    def evaluate(self, expressao):
+        """
+        Avalia uma expressão no worker. Retorna o DataFrame (recebido em Arrow)
+        ou None se o valor não for um DataFrame; ReplWorkerError em caso de erro.
+        """
+        try:
+            resposta = self._request(("eval", expressao, self.cpu_s), self.timeout_s)
+        except ReplWorkerError as e:
+            self._restart(str(e))
+            raise
+        if not resposta.get("ok"):
+            raise (NameError if resposta.get("nome_ausente") else ReplWorkerError)(resposta.get("erro"))
+        if "frame" not in resposta:
+            return None
+        return _import_frame(resposta["frame"], unlink=True)
+
+    def variable(self, nome):
+        """DataFrame guardado na variável `nome` do worker, ou None se ela não existir."""
+        try:
+            return self.evaluate(nome)
+        except NameError:
+            return None
+
+    def close(self):
+        """Encerra o processo do worker."""
+        if self._conn is not None:
+            try:
+                self._conn.send(("close",))
+            except (OSError, ValueError):
+                pass
+        if self._processo is not None:
+            self._processo.join(timeout=5)
+        self._kill()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
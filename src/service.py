@@ -0,0 +1,387 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import os
+import json
+import time
+import datetime
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+from src import config
+from src.data_loader import load_file
+from src.data_processor import normalize_dataframes, process_data
+from src.native_engine import run_calculations_native
+from src.periodo import periodo_padrao, periodo_da_competencia
+
+# Bases lidas do disco que não entram no cálculo (só no relatório)
+IGNORED_SOURCES = {"template_vr"}
+
+# Colunas devolvidas por colaborador (as demais ficam no relatório completo)
+COLUNAS_RESPOSTA = [
+    "MATRICULA", "SINDICATO", "SINDICATO_KEY", "UF", "DIAS_UTEIS_MES", "DIAS_DE_FERIAS", "DIAS_AFASTADO",
+    "DATA_DEMISSAO", "DIAS_A_PAGAR", "VALOR_VR_DIARIO", "VALOR_TOTAL_VR", "CUSTO_EMPRESA", "CUSTO_COLABORADOR",
+]
+
+# ------------------------------------------------------------
+class ServiceError(Exception):
+    """Erro de requisição (status HTTP e mensagem devolvida em JSON)."""
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+def _json_value(valor):
+    if valor is None or (not isinstance(valor, (list, dict, str)) and pd.isna(valor)):
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.strftime("%Y-%m-%d")
+    if hasattr(valor, "item"):
+        return valor.item()
+    return valor
+
+def _records(df, colunas=None):
+    """Linhas de um DataFrame como dicionários serializáveis em JSON."""
+    colunas = [c for c in (colunas or df.columns) if c in df.columns]
+    return [{c: _json_value(v) for c, v in zip(colunas, linha)} for linha in df[colunas].itertuples(index=False, name=None)]
+
+def _matricula(valor):
+    try:
+        return int(str(valor).strip())
+    except (TypeError, ValueError):
+        raise ServiceError(400, f"Matrícula inválida: {valor!r}.")
+
+def _employee_subset(dataframes, matricula):
+    """Recorta as bases por matrícula a um colaborador (bases globais inteiras)."""
+    recorte = {}
+    for name, df in dataframes.items():
+        if df is not None and config.MATRICULA_COL in df.columns:
+            df = df[(df[config.MATRICULA_COL] == matricula).fillna(False).to_numpy(dtype=bool)].copy()
+        recorte[name] = df
+    return recorte
+
+def _calculate(bases, periodo):
+    """
+    Bases processadas e resultado do motor nativo de uma competência, com o
+    índice das linhas por matrícula. Não altera `bases`.
+    """
+    processed = process_data(dict(bases), periodo)
+    final_df = run_calculations_native(processed, periodo)
+    indice = pd.Series(range(len(final_df)), index=final_df[config.MATRICULA_COL].to_numpy()) if not final_df.empty else pd.Series(dtype="int64")
+    return {"periodo": periodo, "processed": processed, "final_df": final_df, "indice": indice}
+
+class CalculationService:
+    """
+    Estado do serviço: as bases lidas (uma entrada por arquivo de
+    `file_paths`) e, por competência, as bases processadas e o resultado
+    do motor nativo, indexado por matrícula.
+
+    `refresh` relê só os arquivos cujo mtime/tamanho mudou e recalcula as
+    competências que estavam em memória. Leituras e cálculos rodam fora do
+    lock, que só protege a troca do estado: as consultas continuam sendo
+    respondidas com o estado anterior durante uma recarga.
+    """
+
+    def __init__(self, file_paths=None, use_cache=True):
+        self.file_paths = dict(config.FILE_PATHS if file_paths is None else file_paths)
+        self.use_cache = use_cache
+        self.dataframes = {}
+        self.assinaturas = {}
+        self.carregado_em = None
+        self.recargas = 0
+        self._resultados = {}
+        self._lock = threading.RLock()
+        # Uma recarga por vez (observador de arquivos e POST /recarregar)
+        self._recarga_lock = threading.Lock()
+
+    def _assinatura(self, path):
+        try:
+            stat = os.stat(path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def refresh(self):
+        """
+        Relê os arquivos alterados desde a última carga (ou todos, na
+        primeira). Retorna a lista de bases relidas.
+        """
+        with self._recarga_lock:
+            with self._lock:
+                dataframes, assinaturas = dict(self.dataframes), dict(self.assinaturas)
+                periodos = [r["periodo"] for r in self._resultados.values()]
+            alterados = [
+                name for name, path in self.file_paths.items()
+                if name not in dataframes or self._assinatura(path) != assinaturas.get(name)
+            ]
+            if not alterados:
+                return alterados
+
+            lidas = {}
+            for name in alterados:
+                path = self.file_paths[name]
+                assinaturas[name] = self._assinatura(path)
+                _, lidas[name], mensagem = load_file(name, path, self.use_cache)
+                print(mensagem)
+            lidas.update(normalize_dataframes({n: df for n, df in lidas.items() if n not in IGNORED_SOURCES}))
+            dataframes.update(lidas)
+            # Recalcula já as competências que estavam em memória (a consulta seguinte continua rápida)
+            bases = {n: df for n, df in dataframes.items() if n not in IGNORED_SOURCES}
+            resultados = {periodo["competencia"]: _calculate(bases, periodo) for periodo in periodos}
+
+            with self._lock:
+                self.dataframes, self.assinaturas, self._resultados = dataframes, assinaturas, resultados
+                self.carregado_em = datetime.datetime.now()
+                self.recargas += 1
+            return alterados
+
+    def _bases(self):
+        return {n: df for n, df in self.dataframes.items() if n not in IGNORED_SOURCES}
+
+    def _periodo(self, competencia):
+        if not competencia:
+            return periodo_padrao()
+        try:
+            return periodo_da_competencia(competencia)
+        except ValueError:
+            raise ServiceError(400, f"Competência inválida: {competencia!r} (use AAAA-MM).")
+
+    def resultado(self, competencia=None):
+        """
+        Bases processadas e resultado da competência, calculados uma vez e
+        mantidos em memória até a próxima recarga.
+        """
+        periodo = self._periodo(competencia)
+        chave = periodo["competencia"]
+        with self._lock:
+            estado = self._resultados.get(chave)
+            bases, recargas = self._bases(), self.recargas
+        if estado is None:
+            estado = _calculate(bases, periodo)
+            with self._lock:
+                # Uma recarga no meio do cálculo já substituiu as bases: não guarda
+                if self.recargas == recargas:
+                    estado = self._resultados.setdefault(chave, estado)
+        return estado
+
+    def employee(self, matricula, competencia=None):
+        """Resultado de um colaborador ou, se excluído, o motivo da exclusão."""
+        matricula = _matricula(matricula)
+        estado = self.resultado(competencia)
+        posicao = estado["indice"].get(matricula)
+        if posicao is not None:
+            linha = estado["final_df"].iloc[[int(posicao)]]
+            return {"competencia": estado["periodo"]["competencia"], "elegivel": True, **_records(linha, COLUNAS_RESPOSTA)[0]}
+
+        excluidos = estado["processed"].get("excluidos")
+        if excluidos is not None and not excluidos.empty:
+            linha = excluidos[(excluidos[config.MATRICULA_COL] == matricula).fillna(False).to_numpy(dtype=bool)]
+            if not linha.empty:
+                return {"competencia": estado["periodo"]["competencia"], "elegivel": False, "MATRICULA": matricula, "MOTIVOS": linha["MOTIVOS"].iloc[0]}
+        raise ServiceError(404, f"Matrícula {matricula} não encontrada na competência {estado['periodo']['competencia']}.")
+
+    def month(self, competencia=None, por="SINDICATO"):
+        """Totais da competência (colaboradores, dias, valores), no geral e por `por`."""
+        estado = self.resultado(competencia)
+        df = estado["final_df"]
+        valores = ["DIAS_A_PAGAR", "VALOR_TOTAL_VR", "CUSTO_EMPRESA", "CUSTO_COLABORADOR"]
+        resposta = {
+            "competencia": estado["periodo"]["competencia"],
+            "periodo": {"inicio": str(estado["periodo"]["inicio"]), "fim": str(estado["periodo"]["fim"])},
+            "colaboradores": int(len(df)),
+            "excluidos": int(len(estado["processed"].get("excluidos", []))),
+            "totais": {c: _json_value(df[c].sum()) if c in df.columns else None for c in valores},
+        }
+        if por and por in df.columns:
+            grupos = df.groupby(por, observed=True, dropna=False)[valores].sum()
+            grupos.insert(0, "COLABORADORES", df.groupby(por, observed=True, dropna=False).size())
+            resposta[f"por_{por.lower()}"] = _records(grupos.reset_index())
+        return resposta
+
+    def simulate(self, matricula, competencia=None, ferias=None, desligamento=None):
+        """
+        Recalcula um colaborador com férias e/ou desligamento alterados, sem
+        tocar nas bases carregadas. Só as linhas da matrícula são processadas.
+
+        Args:
+            ferias: {"dias": N} (dias corridos de férias) ou lista de
+                {"inicio": AAAA-MM-DD, "fim": AAAA-MM-DD} (inclusive).
+                Substitui as férias da matrícula; [] remove as férias.
+            desligamento: {"data": AAAA-MM-DD, "comunicado": "OK"} ou None
+                (mantém o que está na base); {} remove o desligamento.
+        """
+        matricula = _matricula(matricula)
+        periodo = self._periodo(competencia)
+        with self._lock:
+            bases = _employee_subset(self._bases(), matricula)
+        if all(bases.get(n) is None or bases[n].empty for n in ("ativos", "admissoes")):
+            raise ServiceError(404, f"Matrícula {matricula} não encontrada nas bases de ativos/admissões.")
+
+        if ferias is not None:
+            bases["ferias"] = self._ferias_simuladas(matricula, ferias)
+        if desligamento is not None:
+            bases["desligados"] = self._desligamento_simulado(matricula, desligamento)
+
+        processed = process_data(bases, periodo)
+        final_df = run_calculations_native(processed, periodo)
+        if final_df.empty:
+            motivos = processed.get("excluidos")
+            motivo = motivos["MOTIVOS"].iloc[0] if motivos is not None and not motivos.empty else None
+            return {"competencia": periodo["competencia"], "simulacao": True, "elegivel": False, "MATRICULA": matricula, "MOTIVOS": motivo}
+        return {"competencia": periodo["competencia"], "simulacao": True, "elegivel": True, **_records(final_df, COLUNAS_RESPOSTA)[0]}
+
+    def _ferias_simuladas(self, matricula, ferias):
+        if isinstance(ferias, dict) and "dias" in ferias:
+            return pd.DataFrame({config.MATRICULA_COL: pd.array([matricula], dtype="Int64"), "DIAS_DE_F_RIAS": [int(ferias["dias"])]})
+        if not isinstance(ferias, list):
+            raise ServiceError(400, "Campo 'ferias' deve ser {\"dias\": N} ou uma lista de {\"inicio\", \"fim\"}.")
+        try:
+            inicios = pd.to_datetime([f["inicio"] for f in ferias])
+            fins = pd.to_datetime([f["fim"] for f in ferias])
+        except (KeyError, TypeError, ValueError):
+            raise ServiceError(400, "Cada período de férias precisa de 'inicio' e 'fim' (AAAA-MM-DD).")
+        return pd.DataFrame({
+            config.MATRICULA_COL: pd.array([matricula] * len(ferias), dtype="Int64"),
+            "DIAS_DE_F_RIAS": [0] * len(ferias),
+            "DATA_INICIO": inicios,
+            "DATA_FIM": fins,
+        })
+
+    def _desligamento_simulado(self, matricula, desligamento):
+        if not desligamento:
+            return pd.DataFrame(columns=[config.MATRICULA_COL, "DATA_DEMISSAO", "COMUNICADO_DE_DESLIGAMENTO"])
+        try:
+            data = pd.to_datetime(desligamento["data"])
+        except (KeyError, TypeError, ValueError):
+            raise ServiceError(400, "Campo 'desligamento' precisa de 'data' (AAAA-MM-DD).")
+        return pd.DataFrame({
+            config.MATRICULA_COL: pd.array([matricula], dtype="Int64"),
+            "DATA_DEMISSAO": [data],
+            "COMUNICADO_DE_DESLIGAMENTO": [desligamento.get("comunicado", "OK")],
+        })
+
+    def health(self):
+        return {
+            "status": "ok",
+            "carregado_em": self.carregado_em.isoformat(timespec="seconds") if self.carregado_em else None,
+            "recargas": self.recargas,
+            "bases": {n: int(len(df)) for n, df in self.dataframes.items()},
+            "competencias_em_memoria": sorted(self._resultados),
+        }
+
+# ------------------------------------------------------------
+def watch_files(service, intervalo=None, parar=None):
+    """
+    Verifica periodicamente (a cada `intervalo` s, padrão
+    `config.SERVICE_POLL_S`) se algum arquivo de entrada mudou e relê só
+    os alterados. Roda até `parar` (threading.Event) ser acionado.
+    """
+    intervalo = config.SERVICE_POLL_S if intervalo is None else intervalo
+    parar = parar or threading.Event()
+    while not parar.wait(intervalo):
+        try:
+            alterados = service.refresh()
+            if alterados:
+                print(f"Bases recarregadas: {', '.join(alterados)}.")
+        except Exception as e:
+            print(f"ERRO: Falha ao recarregar as bases: {e}")
+
+def make_handler(service):
+    """Handler HTTP da API JSON do serviço."""
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "VRService/1.0"
+
+        def _send(self, status, corpo):
+            dados = json.dumps(corpo, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def _handle(self, metodo):
+            inicio = time.perf_counter()
+            url = urlparse(self.path)
+            partes = [p for p in url.path.split("/") if p]
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            competencia = params.get("competencia")
+            try:
+                if metodo == "GET" and partes == ["health"]:
+                    corpo = service.health()
+                elif metodo == "GET" and partes == ["competencia"]:
+                    corpo = service.month(competencia, params.get("por", "SINDICATO"))
+                elif metodo == "GET" and len(partes) == 2 and partes[0] == "colaborador":
+                    corpo = service.employee(partes[1], competencia)
+                elif metodo == "POST" and partes == ["simular"]:
+                    tamanho = int(self.headers.get("Content-Length") or 0)
+                    try:
+                        pedido = json.loads(self.rfile.read(tamanho) or b"{}")
+                    except ValueError:
+                        raise ServiceError(400, "Corpo da requisição não é um JSON válido.")
+                    if "matricula" not in pedido:
+                        raise ServiceError(400, "Campo 'matricula' é obrigatório.")
+                    corpo = service.simulate(pedido["matricula"], pedido.get("competencia", competencia), pedido.get("ferias"), pedido.get("desligamento"))
+                elif metodo == "POST" and partes == ["recarregar"]:
+                    corpo = {"recarregadas": service.refresh()}
+                else:
+                    raise ServiceError(404, f"Rota não encontrada: {metodo} {url.path}")
+                status = 200
+            except ServiceError as e:
+                status, corpo = e.status, {"erro": str(e)}
+            except Exception as e:
+                status, corpo = 500, {"erro": f"{type(e).__name__}: {e}"}
+            corpo["tempo_ms"] = round((time.perf_counter() - inicio) * 1000, 2)
+            self._send(status, corpo)
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def log_message(self, formato, *args):
+            print(f"[{datetime.datetime.now():%H:%M:%S}] {self.address_string()} {formato % args}")
+
+    return Handler
+
+def serve(host=None, port=None, file_paths=None, use_cache=True, competencias=None, watch=True):
+    """
+    Sobe o serviço HTTP/JSON local: carrega as bases uma vez, pré-calcula
+    as `competencias` pedidas (padrão: a configurada) e atende até Ctrl+C.
+
+    Rotas:
+        GET  /health                                  estado e bases carregadas
+        GET  /competencia?competencia=AAAA-MM&por=UF  totais do mês
+        GET  /colaborador/<matricula>?competencia=    resultado de um colaborador
+        POST /simular     {"matricula", "competencia", "ferias", "desligamento"}
+        POST /recarregar  relê os arquivos alterados
+    """
+    host = host or config.SERVICE_HOST
+    port = config.SERVICE_PORT if port is None else port
+    service = CalculationService(file_paths, use_cache)
+    print("--- Carregando bases ---")
+    service.refresh()
+    for competencia in competencias or [None]:
+        service.resultado(competencia)
+
+    parar = threading.Event()
+    if watch:
+        threading.Thread(target=watch_files, args=(service, None, parar), daemon=True).start()
+
+    servidor = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"--- Serviço de cálculo de VR em http://{host}:{servidor.server_port} (Ctrl+C para encerrar) ---")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        parar.set()
+        servidor.server_close()
+        print("--- Serviço encerrado ---")
+
+if __name__ == "__main__":
+    serve()
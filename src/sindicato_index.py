@@ -0,0 +1,181 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from src import config
+
+INDEX_COLUMNS = ["SINDICATO_KEY", "UF", "DIAS_UTEIS", "VALOR_VR_DIARIO", "MATCH"]
+
+# Índices já construídos, por impressão digital das tabelas de referência,
+# do menos ao mais recente (no máximo config.SINDICATO_INDEX_CACHE_MAX).
+# Cada índice cresce à medida que novos nomes de sindicato aparecem.
+_INDEX_CACHE = OrderedDict()
+_INDEX_LOCK = threading.Lock()
+
+# ------------------------------------------------------------
+def normalize_text(value):
+    """Remove acentos, espaços extras e converte para maiúsculas."""
+    if not isinstance(value, str):
+        return None
+    return unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode().strip().upper()
+
+def harmonize_sindicato_name(name):
+    """
+    Gera a chave canônica do sindicato a partir do prefixo em maiúsculas do
+    nome (ex: "SINDPD SP - SIND.TRAB..." -> "SINDPDSP").
+    """
+    if not isinstance(name, str):
+        return None
+    match = re.match(r'([A-Z\s]+)', name)
+    if match:
+        return re.sub(r'[^A-Z]', '', match.group(1)) or None
+    return re.sub(r'[^A-Z]', '', name.split('-')[0]) or None
+
+def get_uf_from_sindicato(name):
+    """Extrai a sigla do estado (UF) do nome do sindicato (ex: "SINDPPD RS" -> "RS")."""
+    if not isinstance(name, str):
+        return None
+    for match in re.finditer(r'\b([A-Z]{2})\b', name):
+        if match.group(1) in config.UF_ESTADOS:
+            return match.group(1)
+    return None
+
+def _reference_tables(dias_uteis_df, sindicatos_df):
+    """
+    Prepara as tabelas de referência: dias úteis por chave canônica (e a UF de
+    cada chave) e valor diário por UF.
+    """
+    dias_por_chave, uf_por_chave = {}, {}
+    if dias_uteis_df is not None and not dias_uteis_df.empty and "SINDICATO" in dias_uteis_df.columns:
+        for nome, dias in zip(dias_uteis_df["SINDICATO"], dias_uteis_df["DIAS_UTEIS"]):
+            chave = harmonize_sindicato_name(nome)
+            if chave and chave not in dias_por_chave and pd.notna(dias):
+                dias_por_chave[chave] = int(dias)
+                uf_por_chave[chave] = get_uf_from_sindicato(nome)
+
+    valor_por_uf = {}
+    if sindicatos_df is not None and not sindicatos_df.empty and "VALOR" in sindicatos_df.columns:
+        estado_col = "UF" if "UF" in sindicatos_df.columns else "ESTADO"
+        # Aceita tanto a sigla quanto o nome por extenso do estado
+        nome_para_uf = {nome: uf for uf, nome in config.UF_ESTADOS.items()}
+        for estado, valor in zip(sindicatos_df[estado_col], sindicatos_df["VALOR"]):
+            estado = normalize_text(estado)
+            uf = estado if estado in config.UF_ESTADOS else nome_para_uf.get(estado)
+            if uf and uf not in valor_por_uf and pd.notna(valor):
+                valor_por_uf[uf] = float(valor)
+    return dias_por_chave, uf_por_chave, valor_por_uf
+
+def _resolve_name(nome, dias_por_chave, uf_por_chave, valor_por_uf):
+    """Resolve um único nome de sindicato -> (chave, UF, dias úteis, valor, encontrado)."""
+    chave = harmonize_sindicato_name(nome)
+    uf = get_uf_from_sindicato(nome)
+
+    if chave not in dias_por_chave:
+        # Correspondência por prefixo (ex: "SINDPD" vs "SINDPDSP") ...
+        candidatos = [k for k in dias_por_chave if chave and (k.startswith(chave) or chave.startswith(k))]
+        # ... ou, em último caso, pela UF quando ela identifica um único sindicato
+        if len(candidatos) != 1 and uf:
+            candidatos = [k for k, k_uf in uf_por_chave.items() if k_uf == uf]
+        chave = candidatos[0] if len(candidatos) == 1 else chave
+
+    dias = dias_por_chave.get(chave)
+    uf = uf or uf_por_chave.get(chave)
+    valor = valor_por_uf.get(uf)
+    return chave, uf, dias, valor, dias is not None and valor is not None
+
+def _fingerprint(dias_uteis_df, sindicatos_df):
+    """
+    Chave das tabelas de referência no cache de índices: os valores das
+    colunas lidas por `_reference_tables` (SINDICATO/DIAS_UTEIS e UF ou
+    ESTADO/VALOR). As tabelas têm poucas linhas, então a chave é a tupla
+    desses valores, sem converter nem hashear as tabelas inteiras.
+    """
+    partes = []
+    for df, colunas in ((dias_uteis_df, ("SINDICATO", "DIAS_UTEIS")), (sindicatos_df, ("UF", "ESTADO", "VALOR"))):
+        presentes = [c for c in colunas if df is not None and c in df.columns]
+        # Nulos viram None: NaN nunca é igual a si mesmo e faria a chave mudar a cada chamada
+        valores = [[None if pd.isna(v) else v for v in df[c].tolist()] for c in presentes]
+        partes.append((tuple(presentes), tuple(zip(*valores))))
+    return tuple(partes)
+
+def build_sindicato_index(nomes, dias_uteis_df, sindicatos_df):
+    """
+    Constrói (ou estende) o índice de resolução de sindicatos: um DataFrame
+    indexado pelo nome bruto do sindicato com as colunas SINDICATO_KEY, UF,
+    DIAS_UTEIS, VALOR_VR_DIARIO e MATCH.
+
+    Cada nome distinto é resolvido uma única vez (nomes sem correspondência
+    são avisados nesse momento); o índice fica em cache para as mesmas tabelas
+    de referência, então o custo acompanha o número de sindicatos distintos e
+    não o número de colaboradores.
+    """
+    key = _fingerprint(dias_uteis_df, sindicatos_df)
+    nomes = pd.unique(pd.Series(list(nomes), dtype="object").dropna())
+    # A extensão também fica sob o lock: duas threads com nomes novos
+    # diferentes não podem sobrescrever o índice uma da outra
+    with _INDEX_LOCK:
+        cached = _INDEX_CACHE.get(key)
+        if cached is None:
+            cached = {"tables": _reference_tables(dias_uteis_df, sindicatos_df), "index": pd.DataFrame(columns=INDEX_COLUMNS)}
+            _INDEX_CACHE[key] = cached
+            while len(_INDEX_CACHE) > config.SINDICATO_INDEX_CACHE_MAX:
+                _INDEX_CACHE.popitem(last=False)
+        else:
+            _INDEX_CACHE.move_to_end(key)
+
+        index = cached["index"]
+        novos = [n for n in nomes if n not in index.index]
+        if novos:
+            linhas = [_resolve_name(n, *cached["tables"]) for n in novos]
+            novos_df = pd.DataFrame(linhas, index=pd.Index(novos, dtype="object"), columns=INDEX_COLUMNS)
+            unmatched = unmatched_sindicatos(novos_df)
+            if unmatched:
+                print(f"AVISO: {len(unmatched)} sindicato(s) sem correspondência: {unmatched}")
+            index = novos_df if index.empty else pd.concat([index, novos_df])
+            cached["index"] = index
+    return index
+
+def unmatched_sindicatos(index):
+    """Lista os nomes de sindicato sem dias úteis ou sem valor diário."""
+    return index.index[~index["MATCH"].astype(bool)].tolist()
+
+def resolve_sindicatos(series, dias_uteis_df, sindicatos_df):
+    """
+    Resolve a coluna SINDICATO de todos os colaboradores de uma vez,
+    retornando um DataFrame alinhado a `series` com as colunas do índice.
+
+    A expansão para as linhas é um único `take` sobre os códigos da
+    categoria, sem regex por linha.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, categorias = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, categorias = pd.factorize(series)
+
+    index = build_sindicato_index(categorias, dias_uteis_df, sindicatos_df)
+    por_categoria = index.reindex(pd.Index(categorias, dtype="object"))
+    # Linha extra ao final para valores nulos (código -1)
+    codes = np.where(codes >= 0, codes, len(categorias))
+
+    def _take(col, fill, dtype):
+        values = por_categoria[col].fillna(fill).to_numpy(dtype=dtype)
+        return np.append(values, np.array([fill], dtype=dtype))[codes]
+
+    def _take_category(col):
+        cat_codes, uniques = pd.factorize(por_categoria[col])
+        return pd.Categorical.from_codes(np.append(cat_codes, -1)[codes], categories=uniques)
+
+    return pd.DataFrame({
+        "SINDICATO_KEY": _take_category("SINDICATO_KEY"),
+        "UF": _take_category("UF"),
+        "DIAS_UTEIS": _take("DIAS_UTEIS", 0, "int64"),
+        "VALOR_VR_DIARIO": _take("VALOR_VR_DIARIO", 0.0, "float64"),
+        "MATCH": _take("MATCH", False, "bool"),
+    }, index=series.index)
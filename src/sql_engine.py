@@ -0,0 +1,398 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import os
+import numpy as np
+import pandas as pd
+from src import config
+from src import instrumentation
+from src.periodo import periodo_padrao
+from src.data_processor import normalize_dataframes, normalize_schema
+from src.data_registry import select
+from src.calendario import CHAVE_NACIONAL, build_business_calendar, generate_dias_uteis, sindicato_locais, use_dias_uteis_sheet
+from src.sindicato_index import build_sindicato_index
+from src.native_engine import ADMISSAO_COLS, DEMISSAO_COLS, FERIAS_COLS
+
+# Bases lidas pelo plano SQL (as de referência, pequenas, ficam no pandas)
+SQL_SOURCES = ["ativos", "admissoes", "funcionarios", "ferias", "afastamentos", "desligados", "estagiarios", "aprendizes", "exterior"]
+
+# Coluna com a ordem original das linhas (o SQL não garante ordem)
+ORDEM_COL = "_ORDEM"
+
+# ------------------------------------------------------------
+def _q(col):
+    """Identificador SQL entre aspas."""
+    return '"' + str(col).replace('"', '""') + '"'
+
+def _literal(valor):
+    """Texto SQL entre aspas simples (ex: caminhos de arquivo)."""
+    return "'" + str(valor).replace("'", "''") + "'"
+
+def _data(valor):
+    return f"DATE '{pd.Timestamp(valor):%Y-%m-%d}'"
+
+def _first(colunas, candidates):
+    for col in candidates:
+        if col in colunas:
+            return col
+    return None
+
+def _connect():
+    """Conexão DuckDB em memória com threads, limite de memória e spill em disco de `config`."""
+    import duckdb
+    con = duckdb.connect()
+    if config.SQL_THREADS:
+        con.execute(f"SET threads = {int(config.SQL_THREADS)}")
+    if config.SQL_MEMORY_LIMIT:
+        con.execute(f"SET memory_limit = '{config.SQL_MEMORY_LIMIT}'")
+    os.makedirs(config.SQL_TEMP_DIR, exist_ok=True)
+    con.execute(f"SET temp_directory = '{config.SQL_TEMP_DIR}'")
+    # A ordem final vem de ORDEM_COL; sem preservar a ordem de inserção o plano paraleliza mais
+    con.execute("SET preserve_insertion_order = false")
+    return con
+
+def export_parquet(dataframes, diretorio):
+    """
+    Grava as bases usadas pelo plano SQL em Parquet (uma por arquivo, com
+    a coluna de ordem), para que o DuckDB as leia do disco sob demanda em
+    vez de mantê-las na memória do pandas.
+
+    Returns:
+        Dicionário nome -> caminho do Parquet.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    paths = {}
+    for name in SQL_SOURCES:
+        df = dataframes.get(name)
+        if df is None or df.empty:
+            continue
+        path = os.path.join(diretorio, f"{name}.parquet")
+        df.assign(**{ORDEM_COL: np.arange(len(df))}).to_parquet(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+        paths[name] = path
+    return paths
+
+def _register_sources(con, dataframes, parquet_paths):
+    """
+    Expõe cada base como uma view `src_<nome>` (DataFrame registrado ou
+    Parquet), com as colunas categóricas convertidas para texto.
+
+    Returns:
+        Dicionário nome -> lista de colunas das bases disponíveis.
+    """
+    colunas = {}
+    for name in SQL_SOURCES:
+        if parquet_paths and name in parquet_paths:
+            origem = f"read_parquet({_literal(parquet_paths[name])})"
+        else:
+            df = dataframes.get(name)
+            if df is None or df.empty:
+                continue
+            con.register(f"df_{name}", df.assign(**{ORDEM_COL: np.arange(len(df))}))
+            origem = f"df_{name}"
+        tipos = dict(con.execute(f"SELECT column_name, column_type FROM (DESCRIBE SELECT * FROM {origem})").fetchall())
+        # ENUMs (categorias do pandas) de bases diferentes não se comparam entre si
+        casts = [f"CAST({_q(c)} AS VARCHAR) AS {_q(c)}" for c, t in tipos.items() if t.startswith("ENUM")]
+        replace = f" REPLACE ({', '.join(casts)})" if casts else ""
+        con.execute(f"CREATE OR REPLACE VIEW src_{name} AS SELECT *{replace} FROM {origem}")
+        colunas[name] = list(tipos)
+    return colunas
+
+def _reference_tables(con, dataframes, colunas, periodo):
+    """
+    Monta as tabelas pequenas de referência no pandas e as registra:
+    `sindicato_ref` (nome do sindicato -> chave, UF, dias úteis, valor e
+    linha do calendário) e `cal` (dias úteis acumulados por chave e dia).
+    """
+    fontes = [n for n in ("ativos", "admissoes", "funcionarios") if "SINDICATO" in colunas.get(n, [])]
+    nomes = []
+    if fontes:
+        sql = " UNION ".join(f"SELECT DISTINCT SINDICATO FROM src_{n} WHERE SINDICATO IS NOT NULL" for n in fontes)
+        nomes = [linha[0] for linha in con.execute(sql).fetchall()]
+
+    dias_uteis_df = dataframes.get("dias_uteis")
+    if dias_uteis_df is not None and "SINDICATO" in dias_uteis_df.columns:
+        nomes_calendario = nomes + list(dias_uteis_df["SINDICATO"].dropna())
+    else:
+        nomes_calendario = list(nomes)
+    calendario = build_business_calendar(periodo, sindicato_locais(nomes_calendario))
+    if not use_dias_uteis_sheet(dias_uteis_df, periodo):
+        print("Gerando dias úteis do mês pelo calendário de feriados...")
+        dias_uteis_df = generate_dias_uteis(periodo, nomes_calendario, calendario)
+
+    sindicatos_df = dataframes.get("sindicatos")
+    com_valor = sindicatos_df is not None and not sindicatos_df.empty and "VALOR" in sindicatos_df.columns
+    if not com_valor:
+        print("ERRO: Planilha de sindicatos não encontrada.")
+    index = build_sindicato_index(nomes, dias_uteis_df, sindicatos_df).reindex(pd.Index(nomes, dtype="object"))
+    chaves = index["SINDICATO_KEY"].astype("object")
+    sindicato_ref = pd.DataFrame({
+        "SINDICATO": pd.Series(nomes, dtype="object"),
+        "SINDICATO_KEY": chaves.to_numpy(),
+        "UF": index["UF"].astype("object").to_numpy() if com_valor else None,
+        "DIAS_UTEIS": index["DIAS_UTEIS"].fillna(0).to_numpy(dtype="int64"),
+        "VALOR_VR_DIARIO": index["VALOR_VR_DIARIO"].fillna(0.0).to_numpy(dtype="float64") if com_valor else 0.0,
+        # Chaves sem calendário próprio usam o nacional (como BusinessCalendar.key_positions)
+        "CAL_KEY": [c if c in calendario.chaves else CHAVE_NACIONAL for c in chaves],
+    })
+    con.register("sindicato_ref", sindicato_ref)
+
+    n_dias = calendario.acumulado.shape[1]
+    cal = pd.DataFrame({
+        "CHAVE": np.repeat(np.array(calendario.chaves, dtype="object"), n_dias),
+        "DIA": np.tile(calendario.origem + np.arange(n_dias).astype("timedelta64[D]"), len(calendario.chaves)).astype("datetime64[s]"),
+        "ACUM": calendario.acumulado.reshape(-1).astype("int64"),
+    })
+    con.register("cal_df", cal)
+    con.execute("CREATE OR REPLACE TEMP TABLE cal AS SELECT CHAVE, CAST(DIA AS DATE) AS DIA, ACUM FROM cal_df")
+    ultimo = calendario.origem + np.timedelta64(n_dias - 1, "D")
+    return pd.Timestamp(calendario.origem), pd.Timestamp(ultimo)
+
+def _interval_sql(name, colunas, inicio, fim_exclusivo):
+    """
+    SQL dos registros com datas de uma base de férias/afastamentos como
+    intervalos [INI, FIM) recortados ao período (ver `leave_intervals`),
+    e a condição "tem datas" da base. (None, None) se a base não tiver datas.
+    """
+    ini_col = _first(colunas, config.INICIO_INTERVALO_COLS)
+    fim_col = _first(colunas, config.FIM_INTERVALO_COLS)
+    retorno_col = _first(colunas, config.RETORNO_INTERVALO_COLS)
+    if ini_col is None or (fim_col is None and retorno_col is None):
+        return None, None
+    fim = f"CAST({_q(fim_col)} AS DATE) + 1" if fim_col else f"CAST({_q(retorno_col)} AS DATE)"
+    com_datas = f"({_q(ini_col)} IS NOT NULL AND {fim} IS NOT NULL AND MATRICULA IS NOT NULL)"
+    sql = (
+        f"SELECT * FROM (SELECT MATRICULA, GREATEST(CAST({_q(ini_col)} AS DATE), {_data(inicio)}) AS INI, "
+        f"LEAST({fim}, {_data(fim_exclusivo)}) AS FIM FROM src_{name} WHERE {com_datas}) WHERE INI < FIM"
+    )
+    return sql, com_datas
+
+def _merge_sql(fonte):
+    """
+    Une os intervalos sobrepostos ou contíguos de cada matrícula (ilhas):
+    começa um grupo novo quando o início passa do maior fim anterior.
+    """
+    return f"""
+        SELECT MATRICULA, MIN(INI) AS INI, MAX(FIM) AS FIM FROM (
+            SELECT *, SUM(CASE WHEN FIM_ANTERIOR IS NULL OR INI > FIM_ANTERIOR THEN 1 ELSE 0 END)
+                OVER (PARTITION BY MATRICULA ORDER BY INI, FIM ROWS UNBOUNDED PRECEDING) AS GRUPO
+            FROM (
+                SELECT *, MAX(FIM) OVER (PARTITION BY MATRICULA ORDER BY INI, FIM ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) AS FIM_ANTERIOR
+                FROM ({fonte})
+            )
+        ) GROUP BY MATRICULA, GRUPO"""
+
+def _rule_sql(rule, colunas, integrais, com_datas):
+    """Condição SQL de uma regra de `config.REGRAS_EXCLUSAO` sobre a base consolidada `c`."""
+    if "base" in rule:
+        base = rule["base"]
+        if base not in colunas:
+            return "FALSE"
+        if config.MATRICULA_COL not in colunas[base]:
+            print(f"AVISO: Coluna '{config.MATRICULA_COL}' não encontrada no arquivo '{base}'.")
+            return "FALSE"
+        if rule.get("periodo_integral") and base in integrais:
+            return (
+                f"(c.MATRICULA IN (SELECT MATRICULA FROM src_{base} WHERE NOT {com_datas[base]} AND MATRICULA IS NOT NULL) "
+                f"OR c.MATRICULA IN (SELECT MATRICULA FROM integral_{base}))"
+            )
+        return f"c.MATRICULA IN (SELECT MATRICULA FROM src_{base} WHERE MATRICULA IS NOT NULL)"
+
+    termos = []
+    for col in rule.get("colunas", []):
+        if col not in colunas["consolidado"]:
+            continue
+        texto = f"CAST(c.{_q(col)} AS VARCHAR)"
+        for valor in rule.get("valores", []):
+            termos.append(f"{texto} = '{str(valor).replace(chr(39), chr(39) * 2)}'")
+        for termo in rule.get("contem", []):
+            termos.append(f"contains(upper({texto}), '{termo.upper().replace(chr(39), chr(39) * 2)}')")
+    return f"({' OR '.join(termos)})" if termos else "FALSE"
+
+def build_plan(colunas, periodo, origem, ultimo, rules=None):
+    """
+    Monta o plano SQL único do pipeline: consolidação (ATIVOS + ADMISSÕES,
+    sem duplicatas), exclusões (`config.REGRAS_EXCLUSAO`), dias úteis,
+    férias e afastamentos por intervalo, regras de desligamento e de
+    proporcionalidade e valor do VR, com o mesmo resultado do motor nativo.
+    """
+    rules = config.REGRAS_EXCLUSAO if rules is None else rules
+    inicio = pd.Timestamp(periodo["inicio"])
+    fim_exclusivo = pd.Timestamp(periodo["fim"]) + pd.Timedelta(days=1)
+    ctes = []
+
+    # 1. Consolidação: ATIVOS e depois ADMISSÕES, mantendo a primeira ocorrência da matrícula
+    fontes = [n for n in ("ativos", "admissoes") if n in colunas] or (["funcionarios"] if "funcionarios" in colunas else [])
+    if not fontes:
+        return None
+    uniao = " UNION ALL BY NAME ".join(f"SELECT *, {i} AS _FONTE FROM src_{n}" for i, n in enumerate(fontes))
+    ctes.append(f"consolidado AS (SELECT * FROM ({uniao}) QUALIFY row_number() OVER (PARTITION BY MATRICULA ORDER BY _FONTE, {ORDEM_COL}) = 1)")
+    colunas_base = [c for n in fontes for c in colunas[n] if c != ORDEM_COL]
+    colunas_base = list(dict.fromkeys(colunas_base))
+    todas = {**colunas, "consolidado": colunas_base}
+
+    # 2. Intervalos de férias/afastamentos com datas (recortados e unidos por matrícula)
+    intervalos, com_datas = {}, {}
+    for name in ("ferias", "afastamentos"):
+        if name in colunas:
+            sql, cond = _interval_sql(name, colunas[name], inicio, fim_exclusivo)
+            if sql is not None:
+                intervalos[name], com_datas[name] = sql, cond
+    integrais = set()
+    for name, sql in intervalos.items():
+        ctes.append(f"unidos_{name} AS ({_merge_sql(sql)})")
+        ctes.append(f"integral_{name} AS (SELECT DISTINCT MATRICULA FROM unidos_{name} WHERE INI <= {_data(inicio)} AND FIM >= {_data(fim_exclusivo)})")
+        integrais.add(name)
+
+    # 3. Exclusões: máscara de bits por regra, como flag_exclusions
+    bits = " + ".join(f"(CASE WHEN COALESCE({_rule_sql(r, todas, integrais, com_datas)}, FALSE) THEN {1 << b} ELSE 0 END)" for b, r in enumerate(rules)) or "0"
+    ctes.append(f"marcado AS (SELECT c.*, {bits} AS {config.EXCLUSAO_COL} FROM consolidado c)")
+    ctes.append(f"funcionarios AS (SELECT * EXCLUDE ({config.EXCLUSAO_COL}) FROM marcado WHERE {config.EXCLUSAO_COL} = 0)")
+
+    # 4. Sindicato (dias úteis, valor) e calendário de cada colaborador
+    ctes.append(
+        "base AS (SELECT f.*, s.SINDICATO_KEY, COALESCE(s.DIAS_UTEIS, 0) AS DIAS_UTEIS_MES, s.UF, "
+        f"COALESCE(s.VALOR_VR_DIARIO, 0.0) AS VALOR_VR_DIARIO, COALESCE(s.CAL_KEY, '{CHAVE_NACIONAL}') AS CAL_KEY "
+        "FROM funcionarios f LEFT JOIN sindicato_ref s ON " + ("CAST(f.SINDICATO AS VARCHAR) = s.SINDICATO)" if "SINDICATO" in colunas_base else "FALSE)")
+    )
+
+    def clip(expr):
+        return f"LEAST(GREATEST({expr}, {_data(origem)}), {_data(ultimo)})"
+
+    # 5. Dias úteis perdidos: intervalos das duas bases unidos e contados no calendário do sindicato
+    if intervalos:
+        uniao = " UNION ALL ".join(f"SELECT MATRICULA, INI, FIM FROM ({sql})" for sql in intervalos.values())
+        ctes.append(f"afastado AS (SELECT MATRICULA, INI, FIM FROM ({_merge_sql(uniao)}))")
+        ctes.append(
+            "dias_afastado AS (SELECT a.MATRICULA, SUM(GREATEST(cf.ACUM - ci.ACUM, 0)) AS DIAS FROM afastado a "
+            f"JOIN base b ON b.MATRICULA = a.MATRICULA "
+            f"JOIN cal ci ON ci.CHAVE = b.CAL_KEY AND ci.DIA = {clip('a.INI')} "
+            f"JOIN cal cf ON cf.CHAVE = b.CAL_KEY AND cf.DIA = {clip('a.FIM')} GROUP BY a.MATRICULA)"
+        )
+    else:
+        ctes.append("dias_afastado AS (SELECT NULL::BIGINT AS MATRICULA, 0 AS DIAS WHERE FALSE)")
+
+    # 6. Dias de férias dos registros sem datas
+    ferias_col = _first(colunas.get("ferias", []), FERIAS_COLS)
+    if ferias_col:
+        filtro = f"NOT {com_datas['ferias']}" if "ferias" in com_datas else "TRUE"
+        ctes.append(f"dias_ferias AS (SELECT MATRICULA, SUM({_q(ferias_col)}) AS DIAS FROM src_ferias WHERE {filtro} AND MATRICULA IS NOT NULL GROUP BY MATRICULA)")
+    else:
+        ctes.append("dias_ferias AS (SELECT NULL::BIGINT AS MATRICULA, 0 AS DIAS WHERE FALSE)")
+
+    # 7. Desligamento: última linha de cada matrícula
+    demissao_col = _first(colunas.get("desligados", []), DEMISSAO_COLS)
+    if demissao_col:
+        comunicado = "upper(trim(CAST(COMUNICADO_DE_DESLIGAMENTO AS VARCHAR))) = 'OK'" if "COMUNICADO_DE_DESLIGAMENTO" in colunas["desligados"] else "FALSE"
+        ctes.append(
+            f"desligamento AS (SELECT MATRICULA, CAST({_q(demissao_col)} AS TIMESTAMP) AS DATA_DEMISSAO, COALESCE({comunicado}, FALSE) AS COMUNICADO_OK "
+            f"FROM src_desligados QUALIFY row_number() OVER (PARTITION BY MATRICULA ORDER BY {ORDEM_COL} DESC) = 1)"
+        )
+    else:
+        if "desligados" in colunas:
+            print("AVISO: Coluna de data de demissão não encontrada na base de desligados.")
+        ctes.append("desligamento AS (SELECT NULL::BIGINT AS MATRICULA, NULL::TIMESTAMP AS DATA_DEMISSAO, FALSE AS COMUNICADO_OK WHERE FALSE)")
+
+    # 8. Dias a pagar: base - férias - afastamentos, corte de desligamento e proporcionalidade
+    admissao_col = _first(colunas_base, ADMISSAO_COLS)
+    admissao = f"CAST(b.{_q(admissao_col)} AS DATE)" if admissao_col else "NULL::DATE"
+    demissao = "CAST(d.DATA_DEMISSAO AS DATE)"
+    ctes.append(f"""dias AS (
+        SELECT b.*, COALESCE(fe.DIAS, 0)::BIGINT AS DIAS_DE_FERIAS, COALESCE(af.DIAS, 0)::BIGINT AS DIAS_AFASTADO_CALENDARIO,
+            d.DATA_DEMISSAO, COALESCE(d.COMUNICADO_OK, FALSE) AS COMUNICADO_OK,
+            {admissao} >= {_data(inicio)} AND {admissao} < {_data(fim_exclusivo)} AS ADMITIDO,
+            COALESCE(day(d.DATA_DEMISSAO) > {config.DIA_LIMITE_DESLIGAMENTO}, FALSE) AS DESLIGADO_APOS,
+            ca.ACUM AS ACUM_ADMISSAO, cd.ACUM AS ACUM_DEMISSAO, ci.ACUM AS ACUM_INICIO, cf.ACUM AS ACUM_FIM,
+            GREATEST(cf.ACUM - ci.ACUM, 0) AS DIAS_PERIODO
+        FROM base b
+        LEFT JOIN dias_ferias fe ON fe.MATRICULA = b.MATRICULA
+        LEFT JOIN dias_afastado af ON af.MATRICULA = b.MATRICULA
+        LEFT JOIN desligamento d ON d.MATRICULA = b.MATRICULA
+        LEFT JOIN cal ca ON ca.CHAVE = b.CAL_KEY AND ca.DIA = {clip(admissao)}
+        LEFT JOIN cal cd ON cd.CHAVE = b.CAL_KEY AND cd.DIA = {clip(f"LEAST({demissao}, {_data(fim_exclusivo)})")}
+        LEFT JOIN cal ci ON ci.CHAVE = b.CAL_KEY AND ci.DIA = {_data(inicio)}
+        LEFT JOIN cal cf ON cf.CHAVE = b.CAL_KEY AND cf.DIA = {clip(_data(fim_exclusivo))}
+    )""")
+    # Dias contados no calendário, na escala de DIAS_UTEIS_MES (native_engine._month_scale)
+    escala = "CASE WHEN DIAS_PERIODO > 0 THEN FLOOR({dias} * DIAS_UTEIS_MES / DIAS_PERIODO + 0.5)::BIGINT ELSE {dias} END"
+    afastado = escala.format(dias="DIAS_AFASTADO_CALENDARIO")
+    ctes.append(f"""regras AS (
+        SELECT *, CASE
+            WHEN COMUNICADO_OK AND day(DATA_DEMISSAO) <= {config.DIA_LIMITE_DESLIGAMENTO} THEN 0
+            ELSE GREATEST(DIAS_UTEIS_MES - DIAS_DE_FERIAS - DIAS_AFASTADO, 0) END AS DIAS_CORTE
+        FROM (SELECT *, {afastado} AS DIAS_AFASTADO FROM dias)
+    )""")
+    admitido = escala.format(dias="GREATEST(ACUM_FIM - ACUM_ADMISSAO, 0)")
+    ctes.append(f"""proporcional AS (
+        SELECT *, CASE WHEN COALESCE(ADMITIDO, FALSE) THEN {admitido} ELSE DIAS_CORTE END AS DIAS_ADMISSAO
+        FROM regras
+    )""")
+    desligado = escala.format(dias="GREATEST(ACUM_DEMISSAO - ACUM_INICIO, 0)")
+
+    # 9. Valor do VR, na mesma ordem de colunas e linhas do motor nativo
+    saida = ", ".join(_q(c) for c in colunas_base)
+    return "WITH " + ",\n".join(ctes) + f"""
+    SELECT {saida}, SINDICATO_KEY, DIAS_UTEIS_MES, DIAS_AFASTADO, DIAS_DE_FERIAS, DIAS_A_PAGAR, DATA_DEMISSAO, UF, VALOR_VR_DIARIO,
+        DIAS_A_PAGAR * VALOR_VR_DIARIO AS VALOR_TOTAL_VR,
+        DIAS_A_PAGAR * VALOR_VR_DIARIO * {config.PERCENTUAL_CUSTO_EMPRESA} AS CUSTO_EMPRESA,
+        DIAS_A_PAGAR * VALOR_VR_DIARIO * {config.PERCENTUAL_CUSTO_COLABORADOR} AS CUSTO_COLABORADOR,
+        TIMESTAMP '{pd.Timestamp(periodo['competencia']):%Y-%m-%d}' AS COMPETENCIA
+    FROM (
+        SELECT *, GREATEST(CASE WHEN DESLIGADO_APOS THEN LEAST(DIAS_ADMISSAO, {desligado}) ELSE DIAS_ADMISSAO END, 0)::BIGINT AS DIAS_A_PAGAR
+        FROM proporcional
+    )
+    ORDER BY _FONTE, {ORDEM_COL}"""
+
+def run_calculations_sql(dataframes: dict, periodo: dict = None, parquet_dir: str = None) -> pd.DataFrame:
+    """
+    Executa consolidação, exclusões e cálculo do VR como um único plano SQL
+    no DuckDB (embutido, multi-thread e com spill em disco além de
+    `config.SQL_MEMORY_LIMIT`), com o mesmo resultado do motor nativo.
+
+    Args:
+        dataframes: Bases carregadas (`load_all_data`) ou já processadas
+            (com "funcionarios" no lugar de ativos/admissões).
+        periodo: Período de apuração. Se None, usa o configurado em `config`.
+        parquet_dir: Se informado, as bases são gravadas em Parquet neste
+            diretório e lidas dali pelo DuckDB (ver `export_parquet`).
+
+    Returns:
+        O dataframe final com os resultados.
+    """
+    print("--- Iniciando motor SQL (DuckDB) para cálculos ---")
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        print("ERRO: O motor SQL requer o pacote 'duckdb' (pip install duckdb).")
+        return pd.DataFrame()
+
+    periodo = periodo or periodo_padrao()
+    with instrumentation.stage("run_calculations_sql", "calculo", rows_in=instrumentation.rows(dataframes)) as span:
+        dataframes = normalize_dataframes(select(dataframes, [*SQL_SOURCES, "dias_uteis", "sindicatos"]))
+        parquet_paths = export_parquet(dataframes, parquet_dir) if parquet_dir else None
+        con = _connect()
+        try:
+            colunas = _register_sources(con, dataframes, parquet_paths)
+            with instrumentation.stage("referencias", "calculo"):
+                origem, ultimo = _reference_tables(con, dataframes, colunas, periodo)
+            sql = build_plan(colunas, periodo, origem, ultimo)
+            if sql is None:
+                print("ERRO: Base de ATIVOS está vazia. Não é possível continuar.")
+                return pd.DataFrame()
+            with instrumentation.stage("plano_sql", "calculo"):
+                df = con.execute(sql).df()
+        finally:
+            con.close()
+
+        # Tipos do motor nativo (Int64, datas, categorias)
+        df = normalize_schema(df)
+        for col in ("SINDICATO_KEY", "UF"):
+            df[col] = df[col].astype("category")
+        df["DATA_DEMISSAO"] = pd.to_datetime(df["DATA_DEMISSAO"])
+        span.set(rows_out=len(df))
+
+    print(f"Motor SQL calculou {len(df)} colaboradores.")
+    print("--- Motor SQL finalizou a execução ---")
+    return df
@@ -0,0 +1,220 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import os
+import json
+import datetime
+import numpy as np
+import pandas as pd
+from src import config
+from src.periodo import periodo_da_competencia
+
+# Incrementar sempre que o layout gerado mudar, para regenerar os conjuntos
+GENERATOR_VERSION = 1
+
+# Sindicatos da amostra (nome completo, estado, dias úteis, valor diário, peso na base de ativos)
+SINDICATOS = [
+    ("SITEPD PR - SIND DOS TRAB EM EMPR PRIVADAS DE PROC DE DADOS DE CURITIBA E REGIAO METROPOLITANA", "Paraná", 22, 35.0, 0.20),
+    ("SINDPPD RS - SINDICATO DOS TRAB. EM PROC. DE DADOS RIO GRANDE DO SUL", "Rio Grande do Sul", 21, 35.0, 0.15),
+    ("SINDPD SP - SIND.TRAB.EM PROC DADOS E EMPR.EMPRESAS PROC DADOS ESTADO DE SP.", "São Paulo", 22, 37.5, 0.55),
+    ("SINDPD RJ - SINDICATO PROFISSIONAIS DE PROC DADOS DO RIO DE JANEIRO", "Rio de Janeiro", 21, 35.0, 0.10),
+]
+
+CARGOS = [
+    "ANALISTA DADOS I", "ANALISTA DADOS II", "ANALISTA CONTABIL-FISCAL II", "ASSISTENTE DE BPO I",
+    "COORDENADOR ADMINISTRATIVO", "COORDENADOR DE OPERACOES III", "TECH RECRUITER II",
+    "DESENVOLVEDOR BACKEND III", "GERENTE DE PROJETOS", "ANALISTA DE SUPORTE I",
+]
+SITUACOES_AFASTAMENTO = ["Licença Maternidade", "Auxílio Doença", "Atestado"]
+DIAS_FERIAS = [5, 10, 15, 20, 30]
+
+# Proporções aproximadas da amostra, relativas ao número de ativos
+PROPORCOES = {
+    "admissoes": 0.045,
+    "afastamentos": 0.011,
+    "aprendizes": 0.018,
+    "desligados": 0.028,
+    "estagiarios": 0.015,
+    "exterior": 0.002,
+    "ferias": 0.045,
+    "diretores": 0.001,
+}
+
+TEMPLATE_HEADER = [
+    "Matricula", "Admissão", "Sindicato do Colaborador", "Competência", "Dias",
+    "VALOR DIÁRIO VR", "TOTAL", "Custo empresa", "Desconto profissional", "OBS GERAL",
+]
+VALIDACOES = [
+    "Afastados / Licenças", "DESLIGADOS GERAL ", "Admitidos mês", "Férias", "ESTAGIARIO", "APRENDIZ",
+    "SINDICATOS x VALOR", "ATENDIMENTOS/OBS", "EXTERIOR", "ATIVOS",
+]
+
+# ------------------------------------------------------------
+def _as_python(values):
+    """Converte valores NumPy/pandas para tipos Python aceitos pelos writers."""
+    if isinstance(values, pd.Series) and pd.api.types.is_datetime64_any_dtype(values):
+        return [v.to_pydatetime() if pd.notna(v) else None for v in values]
+    return [None if v is None or (isinstance(v, float) and np.isnan(v)) else v for v in np.asarray(values, dtype=object).tolist()]
+
+def _write_workbook(path, sheets):
+    """
+    Grava uma planilha com várias abas, linha a linha e com memória
+    constante (xlsxwriter se instalado, senão openpyxl write-only).
+    `sheets` é uma lista de (título, linhas), com as linhas como listas.
+    """
+    try:
+        import xlsxwriter
+    except ImportError:
+        xlsxwriter = None
+
+    if xlsxwriter is not None:
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "default_date_format": "dd/mm/yyyy"})
+        try:
+            for title, rows in sheets:
+                worksheet = workbook.add_worksheet(title)
+                for i, row in enumerate(rows):
+                    worksheet.write_row(i, 0, row)
+        finally:
+            workbook.close()
+    else:
+        import openpyxl
+        workbook = openpyxl.Workbook(write_only=True)
+        for title, rows in sheets:
+            worksheet = workbook.create_sheet(title)
+            for row in rows:
+                worksheet.append(row)
+        workbook.save(path)
+
+def _columns_rows(header, columns):
+    """Cabeçalho + linhas a partir de colunas (listas de mesmo tamanho)."""
+    yield header
+    yield from (list(row) for row in zip(*columns))
+
+def _dates(rng, inicio, fim, n):
+    """`n` datas aleatórias entre `inicio` e `fim` (inclusive)."""
+    inicio, fim = pd.Timestamp(inicio), pd.Timestamp(fim)
+    dias = rng.integers(0, (fim - inicio).days + 1, n)
+    return pd.Series(inicio + pd.to_timedelta(dias, unit="D"))
+
+def generate_dataset(output_dir, n_employees, seed=0, competencia="2025-05"):
+    """
+    Gera um conjunto sintético de planilhas de entrada com `n_employees`
+    ativos, com os mesmos nomes de arquivo, abas e cabeçalhos da amostra em
+    `data/input` (inclusive a linha de título da `Base dias uteis`, lida com
+    header=1, e a linha de totais acima do cabeçalho do template).
+
+    Returns:
+        Dicionário nome da base -> caminho gravado (formato de `config.FILE_PATHS`).
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {name: os.path.join(output_dir, os.path.basename(path)) for name, path in config.FILE_PATHS.items()}
+    periodo = periodo_da_competencia(competencia)
+    inicio, fim = pd.Timestamp(periodo["inicio"]), pd.Timestamp(periodo["fim"])
+
+    def tamanho(base):
+        return max(1, int(round(n_employees * PROPORCOES[base])))
+
+    # ATIVOS: matrículas únicas e embaralhadas
+    matriculas = rng.permutation(np.arange(10_000, 10_000 + n_employees))
+    pesos = np.array([s[4] for s in SINDICATOS])
+    sindicato = rng.choice(len(SINDICATOS), n_employees, p=pesos / pesos.sum())
+    cargos = np.array(CARGOS, dtype=object)[rng.integers(0, len(CARGOS), n_employees)]
+    cargos[rng.random(n_employees) < PROPORCOES["diretores"]] = "DIRETOR DE OPERACOES"
+    situacao = np.where(rng.random(n_employees) < PROPORCOES["ferias"], "Férias", "Trabalhando")
+    nomes_sindicato = np.array([s[0] for s in SINDICATOS], dtype=object)[sindicato]
+    _write_workbook(paths["ativos"], [("ATIVOS", _columns_rows(
+        ["MATRICULA", "EMPRESA", "TITULO DO CARGO", "DESC. SITUACAO", "Sindicato"],
+        [_as_python(matriculas), [1410] * n_employees, _as_python(cargos), _as_python(situacao), _as_python(nomes_sindicato)],
+    ))])
+
+    def amostra(base):
+        return rng.choice(matriculas, min(tamanho(base), n_employees), replace=False)
+
+    # ADMISSÃO: metade já consta em ATIVOS, metade são matrículas novas
+    n = tamanho("admissoes")
+    novas = np.arange(10_000 + n_employees, 10_000 + n_employees + n // 2)
+    admitidos = np.concatenate([amostra("admissoes")[: n - len(novas)], novas])
+    _write_workbook(paths["admissoes"], [("Planilha1", _columns_rows(
+        ["MATRICULA", "Admissão", "Cargo", None],
+        [_as_python(admitidos), _as_python(_dates(rng, inicio - pd.Timedelta(days=15), fim, len(admitidos))),
+         _as_python(np.array(CARGOS, dtype=object)[rng.integers(0, len(CARGOS), len(admitidos))]), [None] * len(admitidos)],
+    ))])
+
+    afastados = amostra("afastamentos")
+    _write_workbook(paths["afastamentos"], [("Planilha1", _columns_rows(
+        ["MATRICULA", "DESC. SITUACAO", "na compra?", None],
+        [_as_python(afastados), _as_python(rng.choice(SITUACOES_AFASTAMENTO, len(afastados))), [None] * len(afastados), [None] * len(afastados)],
+    ))])
+
+    aprendizes = amostra("aprendizes")
+    _write_workbook(paths["aprendizes"], [("Planilha1", _columns_rows(
+        ["MATRICULA", "TITULO DO CARGO"], [_as_python(aprendizes), ["APRENDIZ"] * len(aprendizes)],
+    ))])
+
+    estagiarios = amostra("estagiarios")
+    _write_workbook(paths["estagiarios"], [("Planilha1", _columns_rows(
+        ["MATRICULA", "TITULO DO CARGO", "na compra?"], [_as_python(estagiarios), ["ESTAGIARIO"] * len(estagiarios), [None] * len(estagiarios)],
+    ))])
+
+    # DESLIGADOS: aba e cabeçalho com espaço no final, como na amostra
+    desligados = amostra("desligados")
+    comunicado = np.where(rng.random(len(desligados)) < 0.8, "OK", None)
+    _write_workbook(paths["desligados"], [("DESLIGADOS ", _columns_rows(
+        ["MATRICULA ", "DATA DEMISSÃO", "COMUNICADO DE DESLIGAMENTO"],
+        [_as_python(desligados), _as_python(_dates(rng, inicio, fim + pd.Timedelta(days=15), len(desligados))), _as_python(comunicado)],
+    ))])
+
+    exterior = amostra("exterior")
+    _write_workbook(paths["exterior"], [("Planilha1", _columns_rows(
+        ["Cadastro", "Valor", None],
+        [_as_python(exterior), _as_python(np.round(rng.uniform(20, 700, len(exterior)), 2)), [None] * len(exterior)],
+    ))])
+
+    ferias = amostra("ferias")
+    _write_workbook(paths["ferias"], [("Planilha1", _columns_rows(
+        ["MATRICULA", "DESC. SITUACAO", "DIAS DE FÉRIAS"],
+        [_as_python(ferias), ["Férias"] * len(ferias), _as_python(rng.choice(DIAS_FERIAS, len(ferias)))],
+    ))])
+
+    # Bases de referência: título na primeira linha (header=1) e colunas
+    # com espaços/nbsp no nome, como na amostra
+    titulo = f"BASE DIAS UTEIS DE {inicio:%d/%m/%Y} a {fim:%d/%m/%Y}"
+    _write_workbook(paths["dias_uteis"], [("Planilha1", [[titulo, None], ["SINDICADO", "DIAS UTEIS "]] + [[s[0], s[2]] for s in SINDICATOS])])
+    _write_workbook(paths["sindicatos"], [("Planilha1", [["ESTADO" + "\xa0" * 53, "VALOR"]] + [[s[1], s[3]] for s in SINDICATOS])])
+
+    # Template: linha de totais acima do cabeçalho e aba de validações
+    competencia_ts = pd.Timestamp(periodo["competencia"])
+    total = [None] * len(TEMPLATE_HEADER)
+    _write_workbook(paths["template_vr"], [
+        (f"VR MENSAL {competencia_ts:%m.%Y}", [total, TEMPLATE_HEADER]),
+        ("Validações", [["Validações", "Check"]] + [[v, None] for v in VALIDACOES]),
+    ])
+    return paths
+
+def _meta_path(output_dir):
+    return os.path.join(output_dir, ".synthetic.json")
+
+def ensure_dataset(n_employees, base_dir=None, seed=0, regenerate=False):
+    """
+    Retorna os caminhos de um conjunto sintético de `n_employees` em
+    `base_dir/<n_employees>`, gerando-o apenas se ainda não existir (ou com
+    outra semente).
+    """
+    output_dir = os.path.join(base_dir or config.SYNTHETIC_DIR, str(n_employees))
+    meta = {"n_employees": n_employees, "seed": seed, "generator_version": GENERATOR_VERSION}
+    try:
+        with open(_meta_path(output_dir), "r", encoding="utf-8") as f:
+            atual = {k: v for k, v in json.load(f).items() if k in meta}
+    except (OSError, ValueError):
+        atual = None
+
+    paths = {name: os.path.join(output_dir, os.path.basename(path)) for name, path in config.FILE_PATHS.items()}
+    if regenerate or atual != meta or not all(os.path.exists(p) for p in paths.values()):
+        print(f"Gerando dados sintéticos com {n_employees} colaboradores em '{output_dir}'...")
+        paths = generate_dataset(output_dir, n_employees, seed)
+        with open(_meta_path(output_dir), "w", encoding="utf-8") as f:
+            json.dump({**meta, "gerado_em": datetime.datetime.now().isoformat(timespec="seconds")}, f, indent=2)
+    return paths
@@ -0,0 +1,57 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import pytest
+from langchain_core.language_models import FakeListChatModel
+from src import config
+from src.data_registry import DataRegistry, select
+from src.data_processor import process_data
+from src.periodo import periodo_padrao
+
+# Colunas comparadas entre os motores (uma linha por matrícula)
+COLUNAS_RESULTADO = [config.MATRICULA_COL, "DIAS_A_PAGAR", "VALOR_VR_DIARIO", "VALOR_TOTAL_VR", "CUSTO_EMPRESA", "CUSTO_COLABORADOR"]
+
+# ------------------------------------------------------------
+def ordenado(df):
+    """Colunas de COLUNAS_RESULTADO ordenadas por matrícula, para comparar resultados."""
+    return df[COLUNAS_RESULTADO].sort_values(config.MATRICULA_COL).reset_index(drop=True)
+
+def scripted_llm(frame_names, periodo):
+    """
+    LLM local e determinístico para testar a infraestrutura do agente
+    (shards, cache, replay) sem rede: a primeira resposta executa o motor
+    nativo sobre as bases da ferramenta Python e guarda o resultado em
+    `final_df`; a segunda encerra. Não testa as regras que o modelo real
+    escreveria, só o caminho até e a partir da ferramenta.
+    """
+    bases = ", ".join(f"'{name}': {name}" for name in frame_names)
+    codigo = (
+        "from src.native_engine import run_calculations_native\n"
+        f"final_df = run_calculations_native({{{bases}}}, {periodo!r})"
+    )
+    return FakeListChatModel(responses=[
+        f"Thought: Vou aplicar as regras sobre as bases disponíveis.\nAction: python_repl\nAction Input: {codigo}",
+        "Thought: Eu completei todos os passos e agora tenho o dataframe final.\nFinal Answer: final_df",
+    ])
+
+@pytest.fixture(scope="session")
+def periodo():
+    return periodo_padrao()
+
+@pytest.fixture(scope="session")
+def processados(periodo):
+    """Bases da amostra de data/input processadas (sem o cache em disco)."""
+    return select(process_data(DataRegistry(use_cache=False), periodo), config.AGENT_SOURCES)
+
+@pytest.fixture(scope="session")
+def llm_prompt():
+    with open("llm_prompt.txt", "r", encoding="utf-8") as f:
+        return f.read()
+
+@pytest.fixture
+def agent_cache_dir(tmp_path, monkeypatch):
+    """Cache do agente (resultados, completions e sessões) em um diretório temporário."""
+    monkeypatch.setattr(config, "AGENT_CACHE_DIR", str(tmp_path / "agent"))
+    return tmp_path / "agent"
@@ -0,0 +1,40 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import socket
+import pandas as pd
+import pytest
+from src.agent_cache import load_session
+from src.agent_llm import DiskLLMCache, replay_llm
+from src.calculation_engine import run_calculations
+from conftest import ordenado, scripted_llm
+
+# ------------------------------------------------------------
+@pytest.fixture
+def sem_rede(monkeypatch):
+    """Qualquer conexão de rede falha durante o teste."""
+    def bloqueado(*args, **kwargs):
+        raise OSError("rede desativada no teste")
+    monkeypatch.setattr(socket.socket, "connect", bloqueado)
+
+def test_replay_session_offline_hits_result_cache(processados, periodo, llm_prompt, agent_cache_dir, tmp_path, sem_rede, capsys):
+    # 1. Grava a sessão com o cache de completions em disco, como `_default_llm`
+    sessao = tmp_path / "sessao.jsonl"
+    gravador = scripted_llm(list(processados), periodo)
+    gravador.cache = DiskLLMCache(session_file=str(sessao))
+    gravado = run_calculations(processados, llm_prompt, llm=gravador, use_cache=False, periodo=periodo, isolated=False)
+    assert len(load_session(sessao)) == 2
+
+    # 2. Reproduz a sessão sem rede e guarda o resultado no cache do agente
+    reproduzido = run_calculations(processados, llm_prompt, llm=replay_llm(sessao), use_cache=True, periodo=periodo, isolated=False)
+    pd.testing.assert_frame_equal(ordenado(reproduzido), ordenado(gravado))
+
+    # 3. Mesmos dados, prompt e modelo: o resultado vem do cache, sem chamar o modelo
+    capsys.readouterr()
+    replay = replay_llm(sessao)
+    em_cache = run_calculations(processados, llm_prompt, llm=replay, use_cache=True, periodo=periodo, isolated=False)
+    assert "Resultado do agente recuperado do cache." in capsys.readouterr().out
+    assert replay.i == 0
+    pd.testing.assert_frame_equal(ordenado(em_cache), ordenado(gravado))
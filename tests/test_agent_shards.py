@@ -0,0 +1,25 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import pandas as pd
+from src.calculation_engine import run_calculations, run_calculations_sharded
+from src.native_engine import run_calculations_native
+from conftest import ordenado, scripted_llm
+
+# ------------------------------------------------------------
+def test_sharded_matches_unsharded_and_native(processados, periodo, llm_prompt, agent_cache_dir):
+    # O modelo local aplica o motor nativo em cada sessão: o teste cobre a
+    # divisão das bases, as sessões simultâneas e a combinação dos shards
+    # (nenhuma linha de férias, desligados etc. pode ficar no shard errado).
+    nativo = run_calculations_native(processados, periodo)
+    unico = run_calculations(processados, llm_prompt, llm=scripted_llm(list(processados), periodo), use_cache=False, periodo=periodo, isolated=False)
+    shards = run_calculations_sharded(
+        processados, llm_prompt, 4, llm_factory=lambda bases: scripted_llm(list(bases), periodo),
+        concurrency=4, use_cache=False, periodo=periodo,
+    )
+
+    assert len(shards) == len(nativo) > 0
+    pd.testing.assert_frame_equal(ordenado(shards), ordenado(unico))
+    pd.testing.assert_frame_equal(ordenado(shards), ordenado(nativo))
@@ -0,0 +1,34 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import pandas as pd
+from src import config
+from src import data_loader
+from src.data_registry import DataRegistry
+from src.data_processor import process_data
+from src.native_engine import run_calculations_native
+from src.periodo import periodo_da_competencia
+from conftest import ordenado
+
+# ------------------------------------------------------------
+def test_cached_sheet_period_with_parallel_load(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(config, "CACHE_DIR", str(tmp_path))
+    DataRegistry().preload(workers=1)  # grava o cache no diretório temporário
+    periodo = periodo_da_competencia("2025-07")
+
+    def reaberta(path):
+        raise AssertionError(f"planilha reaberta em um acerto de cache: {path}")
+    monkeypatch.setattr(data_loader, "sheet_title", reaberta)
+
+    resultados = {}
+    for workers in (1, 2):
+        capsys.readouterr()
+        registro = DataRegistry().preload(workers=workers)
+        assert registro["dias_uteis"].attrs["titulo"] == "BASE DIAS UTEIS DE 15/04 a 15/05"
+        resultados[workers] = run_calculations_native(process_data(registro, periodo), periodo)
+        # A planilha de 15/04 a 15/05 não vale para julho: dias úteis do calendário
+        assert "AVISO: A planilha de dias úteis é de 15/04/2025 a 15/05/2025" in capsys.readouterr().out
+
+    pd.testing.assert_frame_equal(ordenado(resultados[2]), ordenado(resultados[1]))
@@ -0,0 +1,21 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import pandas as pd
+from src.data_loader import load_all_data
+from src.data_processor import process_data
+
+# ------------------------------------------------------------
+def test_process_data_does_not_alter_its_input(periodo):
+    bases = load_all_data(use_cache=False, workers=1)
+    copias = {name: df.copy() for name, df in bases.items()}
+
+    processados = process_data(bases, periodo)
+
+    assert "funcionarios" in processados and "funcionarios" not in bases
+    assert list(bases) == list(copias)
+    for name, df in bases.items():
+        # Inclusive os tipos que `normalize_schema` converte (matrícula, datas, categorias)
+        pd.testing.assert_frame_equal(df, copias[name])
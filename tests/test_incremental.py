@@ -0,0 +1,53 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import pandas as pd
+from src import config
+from src.data_registry import DataRegistry
+from src.data_processor import process_data
+from src.incremental import run_incremental
+from src.native_engine import run_calculations_native
+
+# ------------------------------------------------------------
+def test_incremental_matches_full_recalculation(periodo, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "RUNS_DIR", str(tmp_path / "runs"))
+    changelog = tmp_path / "alteracoes.csv"
+    registro = DataRegistry(use_cache=False)
+
+    # 1. Primeira execução (completa) e uma segunda sem alterações
+    primeira = run_incremental(registro, periodo, changelog_file=str(changelog))
+    segunda = run_incremental(registro, periodo, changelog_file=str(changelog))
+    pd.testing.assert_frame_equal(segunda, primeira)
+    assert pd.read_csv(changelog, sep=";", encoding="utf-8-sig").empty
+
+    # 2. Uma linha de ativos editada (outro sindicato), uma removida e uma linha de férias removida
+    ativos, ferias = registro["ativos"], registro["ferias"]
+    sem_ferias = set(ativos[config.MATRICULA_COL]) - set(ferias[config.MATRICULA_COL])
+    calculados = primeira.set_index(config.MATRICULA_COL)
+    editada, removida = [m for m in ativos[config.MATRICULA_COL] if m in sem_ferias and m in calculados.index][:2]
+    de_ferias = next(m for m in ferias[config.MATRICULA_COL] if m in calculados.index)
+    outro_sindicato = next(s for s in ativos["SINDICATO"].unique() if s != ativos.loc[ativos[config.MATRICULA_COL] == editada, "SINDICATO"].iloc[0])
+
+    ativos = ativos.copy()
+    ativos.loc[ativos[config.MATRICULA_COL] == editada, "SINDICATO"] = outro_sindicato
+    ativos = ativos[ativos[config.MATRICULA_COL] != removida]
+    ferias = ferias[ferias[config.MATRICULA_COL] != de_ferias]
+    alterado = registro.derive(ativos=ativos, ferias=ferias)
+
+    incremental = run_incremental(alterado, periodo, changelog_file=str(changelog))
+    completo = run_calculations_native(process_data(alterado, periodo), periodo)
+
+    assert len(incremental) == len(primeira) - 1
+    pd.testing.assert_frame_equal(incremental.reset_index(drop=True), completo.reset_index(drop=True))
+
+    # 3. Log de alterações: uma linha por matrícula afetada
+    log = pd.read_csv(changelog, sep=";", encoding="utf-8-sig").set_index(config.MATRICULA_COL)
+    assert sorted(log.index) == sorted([editada, removida, de_ferias])
+    assert log.loc[editada, "SITUACAO"] == "ALTERADO"
+    assert log.loc[editada, "COLUNAS"] == "ativos.SINDICATO"
+    assert log.loc[removida, "SITUACAO"] == "REMOVIDO"
+    assert log.loc[de_ferias, "SITUACAO"] == "ALTERADO"
+    assert log.loc[de_ferias, "FONTES"] == "ferias:removido"
+    assert log.loc[de_ferias, "DIAS_A_PAGAR_DEPOIS"] > log.loc[de_ferias, "DIAS_A_PAGAR_ANTES"]
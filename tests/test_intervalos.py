@@ -0,0 +1,74 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import numpy as np
+import pandas as pd
+import pytest
+from src import config
+from src.calendario import BusinessCalendar
+from src.intervalos import business_days_lost, leave_intervals, merge_intervals
+
+# ------------------------------------------------------------
+def datas(*valores):
+    return np.array(valores, dtype="datetime64[D]")
+
+@pytest.fixture(scope="module")
+def calendario(periodo):
+    """Calendário nacional do período (feriados 18/04, 21/04 e 01/05 em 2025-05)."""
+    return BusinessCalendar(periodo["inicio"], periodo["fim"])
+
+def test_merge_joins_overlapping_and_contiguous_intervals():
+    # Fora de ordem e com matrículas intercaladas
+    matriculas = np.array([2, 1, 2, 1, 2], dtype="int64")
+    inicios = datas("2025-04-20", "2025-04-18", "2025-04-16", "2025-04-16", "2025-04-28")
+    fins = datas("2025-04-23", "2025-04-25", "2025-04-20", "2025-04-21", "2025-05-01")
+
+    matriculas, inicios, fins = merge_intervals(matriculas, inicios, fins)
+
+    # 1: [16/04, 21/04) e [18/04, 25/04) se sobrepõem
+    # 2: [16/04, 20/04) e [20/04, 23/04) são contíguos; [28/04, 01/05) fica separado
+    assert matriculas.tolist() == [1, 2, 2]
+    assert inicios.tolist() == datas("2025-04-16", "2025-04-16", "2025-04-28").tolist()
+    assert fins.tolist() == datas("2025-04-25", "2025-04-23", "2025-05-01").tolist()
+
+def test_merge_keeps_contained_interval_inside_the_longer_one():
+    matriculas, inicios, fins = merge_intervals(
+        np.array([7, 7], dtype="int64"), datas("2025-04-16", "2025-04-22"), datas("2025-05-10", "2025-04-24"),
+    )
+    assert matriculas.tolist() == [7]
+    assert (inicios[0], fins[0]) == (np.datetime64("2025-04-16"), np.datetime64("2025-05-10"))
+
+def test_leave_intervals_clip_to_the_period(periodo):
+    df = pd.DataFrame({
+        config.MATRICULA_COL: [1, 2, 3, 4],
+        "DATA_INICIO": pd.to_datetime(["2025-03-01", "2025-05-10", "2025-04-01", "2025-04-20"]),
+        "DATA_FIM": pd.to_datetime(["2025-03-31", "2025-06-30", "2025-04-20", None]),
+    })
+
+    matriculas, inicios, fins, com_datas = leave_intervals(df, periodo)
+
+    # 1 termina antes do período; 2 e 3 são recortados (fim exclusivo)
+    assert matriculas.tolist() == [2, 3]
+    assert inicios.tolist() == datas("2025-05-10", "2025-04-16").tolist()
+    assert fins.tolist() == datas("2025-05-16", "2025-04-21").tolist()
+    # 4 não tem fim: não é um intervalo e segue a regra dos registros sem datas
+    assert com_datas.tolist() == [True, True, True, False]
+
+def test_business_days_lost_sums_merged_intervals_per_matricula(calendario):
+    matriculas, inicios, fins = merge_intervals(
+        np.array([1, 2, 1], dtype="int64"),
+        datas("2025-04-16", "2025-04-28", "2025-05-12"),
+        datas("2025-04-25", "2025-05-03", "2025-05-16"),
+    )
+
+    dias = business_days_lost(matriculas, inicios, fins, calendario)
+
+    # 1: 16/04 a 24/04 (sem 18/04 e 21/04) = 5, mais 12/05 a 15/05 = 4
+    # 2: 28/04 a 02/05 (sem 01/05) = 4
+    assert dias.to_dict() == {1: 9, 2: 4}
+
+def test_business_days_lost_without_intervals(calendario):
+    vazio = np.array([], dtype="int64")
+    assert business_days_lost(vazio, datas(), datas(), calendario).empty
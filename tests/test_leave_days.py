@@ -0,0 +1,46 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+import pandas as pd
+import pytest
+from src import config
+from src.data_registry import DataRegistry
+from src.data_processor import process_data
+from src.native_engine import run_calculations_native
+from src.sql_engine import run_calculations_sql
+
+# ------------------------------------------------------------
+@pytest.fixture(scope="module")
+def registro():
+    return DataRegistry(use_cache=False)
+
+@pytest.fixture(scope="module")
+def matriculas_sp(registro, periodo):
+    """Duas matrículas de SINDPDSP (22 dias úteis na planilha) sem férias, desligamento ou admissão."""
+    resultado = run_calculations_native(process_data(registro, periodo), periodo)
+    cheios = resultado[(resultado["SINDICATO_KEY"] == "SINDPDSP") & (resultado["DIAS_A_PAGAR"] == 22) & resultado["DATA_DEMISSAO"].isna()]
+    return [int(m) for m in cheios[config.MATRICULA_COL].iloc[:2]]
+
+@pytest.mark.parametrize("motor", ["native", "sql"])
+def test_dated_leave_uses_the_month_basis(registro, periodo, matriculas_sp, motor):
+    integral, metade = matriculas_sp
+    ferias = pd.DataFrame({
+        config.MATRICULA_COL: pd.array([integral, metade], dtype="Int64"),
+        "DIAS_DE_F_RIAS": [0, 0],
+        "DATA_INICIO": pd.to_datetime(["2025-04-16", "2025-04-16"]),
+        "DATA_FIM": pd.to_datetime(["2025-05-15", "2025-04-30"]),
+    })
+    bases = registro.derive(ferias=ferias)
+    if motor == "native":
+        resultado = run_calculations_native(process_data(bases, periodo), periodo)
+    else:
+        resultado = run_calculations_sql(bases, periodo)
+    dias = resultado.set_index(config.MATRICULA_COL)["DIAS_A_PAGAR"]
+
+    # Férias no período inteiro: nada a pagar (19 dias do calendário = 22 da planilha)
+    assert dias[integral] == 0
+    # 16/04 a 30/04: 9 dias úteis no calendário de SP (feriados 18/04 e 21/04),
+    # 9 × 22 / 19 ≈ 10 na escala da planilha, restando 12 a pagar
+    assert dias[metade] == 12
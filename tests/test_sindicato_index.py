@@ -0,0 +1,26 @@
+# ------------------------------------------------------------
+# Code developed by: Thiago Piovesan
+# Created on: 2025-08-17
+# ------------------------------------------------------------
+# Libs:
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from src import sindicato_index
+from src.sindicato_index import build_sindicato_index
+
+# ------------------------------------------------------------
+DIAS_UTEIS = pd.DataFrame({"SINDICATO": ["SINDPD SP - SINDICATO", "SINDPPD RS - SINDICATO"], "DIAS_UTEIS": [22, 21]})
+SINDICATOS = pd.DataFrame({"ESTADO": ["São Paulo", "Rio Grande do Sul", None], "VALOR": [37.5, 35.0, None]})
+
+def test_concurrent_extensions_keep_every_name(monkeypatch):
+    monkeypatch.setattr(sindicato_index, "_INDEX_CACHE", type(sindicato_index._INDEX_CACHE)())
+    lotes = [[f"SINDPD SP - FILIAL {i}-{j}" for j in range(20)] for i in range(8)]
+
+    # Cópias novas das tabelas a cada chamada, como as devolvidas pelo DataRegistry
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda nomes: build_sindicato_index(nomes, DIAS_UTEIS.copy(), SINDICATOS.copy()), lotes))
+
+    assert len(sindicato_index._INDEX_CACHE) == 1
+    index = build_sindicato_index([], DIAS_UTEIS, SINDICATOS)
+    assert sorted(index.index) == sorted(n for nomes in lotes for n in nomes)
+    assert index["MATCH"].all()